@@ -13,7 +13,10 @@ G_CONST = 6.67430e-11     # m^3 kg^-1 s^-2, gravitational constant
 # Earth
 MU_EARTH = 3.986004418e5  # km^3/s^2
 R_EARTH = 6371.0           # km, mean radius
+R_EARTH_EQ = 6378.137      # km, equatorial radius (J2 reference radius)
 J2_EARTH = 1.08263e-3      # Earth oblateness
+OMEGA_EARTH = 7.2921150e-5 # rad/s, sidereal rotation rate
+F_EARTH = 1 / 298.257223563  # WGS-84 flattening
 
 # Sun
 MU_SUN = 1.32712440018e11 # km^3/s^2
@@ -44,6 +47,18 @@ SMA = {
     "neptune": 4.4951e9,
 }
 
+# Planetary equatorial radii (km)
+RADIUS = {
+    "mercury": 2439.7,
+    "venus": 6051.8,
+    "earth": 6378.137,
+    "mars": 3396.2,
+    "jupiter": 71492.0,
+    "saturn": 60268.0,
+    "uranus": 25559.0,
+    "neptune": 24764.0,
+}
+
 # Speed of light
 C = 299792.458  # km/s
 
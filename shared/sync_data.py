@@ -13,25 +13,35 @@ How it works:
     3. Claude runs web searches, updates JSON, then runs --stamp
     4. Old version backed up to data/vehicles_YYYY-MM-DD.json
 """
+import copy
 import json
 import shutil
 import sys
 from datetime import datetime
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).parent / "tools"))
+from catalog import VehicleCatalog
+
 DATA_DIR = Path(__file__).parent / "data"
 DATA_FILES = {
     "vehicles": {"file": "vehicles.json", "interval_days": 90},
     "engines": {"file": "vehicles.json", "interval_days": 90, "section": "engines"},
+    "fairings": {"file": "vehicles.json", "interval_days": 90, "section": "fairings"},
 }
 
 
+_CATALOGS = {}
+
+
 def load_json(filename):
+    """Parsed data file, read once per process and again only when it changes."""
     filepath = DATA_DIR / filename
     if not filepath.exists():
         return None
-    with open(filepath, "r", encoding="utf-8") as f:
-        return json.load(f)
+    if filename not in _CATALOGS:
+        _CATALOGS[filename] = VehicleCatalog(filepath)
+    return _CATALOGS[filename].data
 
 
 def check_freshness():
@@ -78,9 +88,11 @@ def stamp_file(filename):
     filepath = DATA_DIR / filename
     data = load_json(filename)
     if data and "_meta" in data:
+        data = copy.deepcopy(data)  # the catalog's parsed data is shared and read-only
         data["_meta"]["last_updated"] = datetime.now().strftime("%Y-%m-%d")
         with open(filepath, "w", encoding="utf-8") as f:
             json.dump(data, f, indent=2, ensure_ascii=False)
+        _CATALOGS[filename].invalidate()
         return data["_meta"]["last_updated"]
     return None
 
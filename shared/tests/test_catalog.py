@@ -0,0 +1,102 @@
+import json
+import os
+
+import pytest
+
+from catalog import VehicleCatalog, normalize_key
+
+DATA = {
+    "_meta": {"last_updated": "2026-01-01"},
+    "vehicles": {
+        "falcon9": {"name": "Falcon 9", "payload_leo_kg": 22800},
+        "new_glenn": {"name": "New Glenn", "payload_leo_kg": 45000},
+    },
+    "engines": {"merlin_1d": {"name": "Merlin 1D"}},
+}
+
+
+@pytest.fixture
+def path(tmp_path):
+    p = tmp_path / "vehicles.json"
+    p.write_text(json.dumps(DATA))
+    return p
+
+
+def rewrite(p, data, bump_ns=10 ** 9):
+    st = os.stat(p)
+    p.write_text(json.dumps(data))
+    os.utime(p, ns=(st.st_atime_ns, st.st_mtime_ns + bump_ns))
+
+
+def test_parsed_once_on_first_use(path):
+    catalog = VehicleCatalog(path)
+    assert catalog.loads == 0
+    for _ in range(5):
+        catalog.vehicles()
+        catalog.resolve_vehicle("Falcon 9")
+    assert catalog.loads == 1 and catalog.version == 1
+
+
+def test_mtime_change_reloads(path):
+    catalog = VehicleCatalog(path)
+    assert catalog.vehicle("falcon9")["payload_leo_kg"] == 22800
+    changed = json.loads(json.dumps(DATA))
+    changed["vehicles"]["falcon9"]["payload_leo_kg"] = 17500
+    rewrite(path, changed)
+    assert catalog.vehicle("falcon9")["payload_leo_kg"] == 17500
+    assert catalog.loads == 2 and catalog.version == 2
+
+
+def test_touch_without_change_keeps_version(path):
+    catalog = VehicleCatalog(path)
+    catalog.vehicles()
+    rewrite(path, DATA)
+    catalog.vehicles()
+    assert catalog.loads == 1 and catalog.version == 1
+
+
+def test_invalidate_catches_same_tick_writes(path):
+    catalog = VehicleCatalog(path)
+    catalog.vehicles()
+    changed = json.loads(json.dumps(DATA))
+    changed["vehicles"]["falcon9"]["payload_leo_kg"] = 22801  # same size
+    rewrite(path, changed, bump_ns=0)
+    assert catalog.vehicle("falcon9")["payload_leo_kg"] == 22800  # same mtime and size: not seen
+    catalog.invalidate()
+    assert catalog.vehicle("falcon9")["payload_leo_kg"] == 22801
+    assert catalog.version == 2
+
+
+@pytest.mark.parametrize("name", ["falcon9", "Falcon 9", "falcon-9", "FALCON_9", " Falcon9 "])
+def test_vehicle_aliases(path, name):
+    assert VehicleCatalog(path).resolve_vehicle(name) == "falcon9"
+
+
+def test_engine_aliases_and_unknown_names(path):
+    catalog = VehicleCatalog(path)
+    assert catalog.resolve_engine("Merlin 1D") == "merlin_1d"
+    assert catalog.resolve_engine("merlin1d") == "merlin_1d"
+    assert catalog.resolve_vehicle("Saturn V") is None
+    assert catalog.vehicle("Saturn V") is None
+
+
+def test_exact_keys_win_over_name_aliases(tmp_path):
+    p = tmp_path / "vehicles.json"
+    p.write_text(json.dumps({"vehicles": {"a": {"name": "B"}, "b": {"name": "Other"}}}))
+    assert VehicleCatalog(p).resolve_vehicle("b") == "b"
+
+
+def test_missing_file_is_empty(tmp_path):
+    catalog = VehicleCatalog(tmp_path / "absent.json")
+    assert catalog.vehicles() == {}
+    assert catalog.info()["counts"] == {"vehicles": 0, "engines": 0, "fairings": 0}
+
+
+def test_info_reports_meta(path):
+    info = VehicleCatalog(path).info()
+    assert info["last_updated"] == "2026-01-01"
+    assert info["counts"]["vehicles"] == 2
+
+
+def test_normalize_key():
+    assert normalize_key(" Long March-5 ") == "long_march_5"
@@ -0,0 +1,44 @@
+import pytest
+
+import staging
+
+
+@pytest.fixture(scope="module")
+def ranked():
+    return staging.engine_search(9.4, 2, 5000, top=3)
+
+
+def test_ranked_by_objective(ranked):
+    glows = [r["glow_kg"] for r in ranked["ranked"]]
+    assert ranked["best"] == ranked["ranked"][0]
+    assert len(glows) == 3 and glows == sorted(glows)
+    assert all(r["feasible"] for r in ranked["ranked"])
+
+
+def test_branch_and_bound_matches_exhaustive_search(ranked):
+    engines = staging._load_engines()
+    sfs = [staging.DEFAULT_STRUCTURAL_FRACTION] * 2
+    options = [[k for k in engines if staging._stage_isp(engines[k], i) is not None] for i in range(2)]
+    results = [staging._evaluate_assignment(((a, b), engines, sfs, 9.4, 5000, staging.MIN_LIFTOFF_TWR,
+                                             staging.MIN_UPPER_TWR, staging.MAX_ENGINES_PER_STAGE))
+               for a in options[0] for b in options[1]]
+    best = sorted(r["glow_kg"] for r in results if r["feasible"])[:3]
+    assert [r["glow_kg"] for r in ranked["ranked"]] == best
+    assert ranked["search"]["evaluated"] <= ranked["search"]["combinations"]
+
+
+def test_cost_objective_ranks_by_cost():
+    result = staging.engine_search(9.4, 2, 5000, objective="cost", top=3)
+    costs = [r["vehicle_cost_m"] for r in result["ranked"]]
+    assert costs == sorted(costs)
+
+
+@pytest.mark.parametrize("kw", [
+    {"top": 0},
+    {"top": -2},
+    {"objective": "speed"},
+    {"candidates": ["warp_drive"]},
+    {"sfs": [0.07]},
+])
+def test_rejects_bad_inputs(kw):
+    assert "error" in staging.engine_search(9.4, 2, 5000, **kw)
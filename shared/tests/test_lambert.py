@@ -0,0 +1,67 @@
+import math
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+import lambert
+from trajectory import AU_KM, MU_SUN
+
+MU_EARTH = 398600.0
+
+
+def test_curtis_example():
+    # Curtis, Orbital Mechanics for Engineering Students, Example 5.2
+    v1, v2, ok = lambert.lambert([5000, 10000, 2100], [-14600, 2500, 7000], 3600, mu=MU_EARTH)
+    assert ok
+    assert v1 == pytest.approx([-5.9925, 1.9254, 3.2456], abs=1e-3)
+    assert v2 == pytest.approx([-3.3125, -4.1966, -0.38529], abs=1e-3)
+
+
+def test_conserves_energy_and_angular_momentum():
+    rng = np.random.default_rng(7)
+    r1 = rng.uniform(-2e4, 2e4, (50, 3))
+    r2 = rng.uniform(-2e4, 2e4, (50, 3))
+    tof = rng.uniform(1800, 20000, 50)
+    v1, v2, ok = lambert.lambert(r1, r2, tof, mu=MU_EARTH)
+    assert ok.sum() > 40
+    h1, h2 = np.cross(r1, v1)[ok], np.cross(r2, v2)[ok]
+    assert np.allclose(h1, h2, rtol=1e-6)
+    energy1 = (v1 ** 2).sum(-1) / 2 - MU_EARTH / np.linalg.norm(r1, axis=-1)
+    energy2 = (v2 ** 2).sum(-1) / 2 - MU_EARTH / np.linalg.norm(r2, axis=-1)
+    assert np.allclose(energy1[ok], energy2[ok], rtol=1e-6)
+
+
+def test_near_hohmann_transfer():
+    r_mars = 1.524 * AU_KM
+    a = (AU_KM + r_mars) / 2
+    tof = math.pi * math.sqrt(a ** 3 / MU_SUN)
+    theta = math.radians(179)
+    v1, _, ok = lambert.lambert([AU_KM, 0, 0], [r_mars * math.cos(theta), r_mars * math.sin(theta), 0], tof)
+    assert ok
+    hohmann_dv1 = math.sqrt(MU_SUN * (2 / AU_KM - 1 / a)) - math.sqrt(MU_SUN / AU_KM)
+    assert np.linalg.norm(v1) - math.sqrt(MU_SUN / AU_KM) == pytest.approx(hohmann_dv1, rel=1e-3)
+
+
+def test_porkchop_finds_2026_mars_window():
+    result = lambert.porkchop("Earth", "Mars", "2026-09-01", "2027-01-31", 120, 400, n_depart=60, n_tof=60)
+    best = result["min_c3"]
+    assert "2026-10" <= best["departure_date"] <= "2026-11-30"
+    assert 8 < best["c3_km2s2"] < 12
+    assert result["grid"]["valid_cells"] == 3600
+
+
+def test_porkchop_grid_independent_of_workers():
+    dep = np.linspace(lambert.date_to_jd("2026-09-01"), lambert.date_to_jd("2027-01-31"), 9)
+    tof = np.linspace(150, 300, 7)
+    c3_a, vinf_a = lambert.porkchop_grid("Earth", "Mars", dep, tof)
+    c3_b, vinf_b = lambert.porkchop_grid("Earth", "Mars", dep, tof, workers=2)
+    assert c3_a.shape == (9, 7)
+    assert np.array_equal(c3_a, c3_b, equal_nan=True)
+    assert np.array_equal(vinf_a, vinf_b, equal_nan=True)
+
+
+def test_porkchop_rejects_bad_requests():
+    assert "error" in lambert.porkchop("Earth", "Earth", "2026-09-01", "2027-01-31", 120, 400)
+    assert "error" in lambert.porkchop("Earth", "Mars", "2026-09-01", "2027-01-31", 400, 120)
+    assert "error" in lambert.porkchop("Earth", "Vulcan", "2026-09-01", "2027-01-31", 120, 400)
@@ -0,0 +1,89 @@
+import math
+import random
+
+import pytest
+
+pytest.importorskip("numpy")  # fairing checks go through geometry
+
+import cost_estimator
+
+VEHICLES = ["falcon9", "falcon_heavy", "electron", "neutron", "h3"]
+
+
+def payload(name, mass, orbit="LEO", diameter=None, height=None):
+    return {"name": name, "mass_kg": float(mass), "diameter_m": diameter, "height_m": height, "orbit": orbit}
+
+
+def partitions(items):
+    if not items:
+        yield []
+        return
+    first, rest = items[0], items[1:]
+    for part in partitions(rest):
+        yield [[first]] + part
+        for k in range(len(part)):
+            yield part[:k] + [[first] + part[k]] + part[k + 1:]
+
+
+def brute_force_cost(masses, vehicles):
+    table, _ = cost_estimator._load_vehicles()
+    options = sorted((table[k]["launch_cost_m"], table[k]["payload_leo_kg"]) for k in vehicles)
+
+    def launch(mass):
+        return next((cost for cost, cap in options if cap >= mass), math.inf)
+
+    return min(sum(launch(sum(block)) for block in part) for part in partitions(list(masses)))
+
+
+@pytest.mark.parametrize("seed", range(6))
+def test_branch_and_bound_is_optimal(seed):
+    rng = random.Random(seed)
+    masses = [rng.choice([rng.uniform(100, 300), rng.uniform(1000, 20000)]) for _ in range(7)]
+    result = cost_estimator.manifest_pack([payload(f"p{i}", m) for i, m in enumerate(masses)], VEHICLES)
+    assert result["orbits"]["LEO"]["method"] == "branch-and-bound"
+    assert result["orbits"]["LEO"]["optimal"]
+    assert result["total_cost_m"] == pytest.approx(brute_force_cost(masses, VEHICLES))
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_first_fit_decreasing_is_feasible_and_not_better_than_exact(seed):
+    rng = random.Random(100 + seed)
+    payloads = [payload(f"p{i}", rng.uniform(200, 15000)) for i in range(10)]
+    heuristic = cost_estimator.manifest_pack(payloads, VEHICLES, exact_max=0)
+    exact = cost_estimator.manifest_pack(payloads, VEHICLES)
+    assert heuristic["orbits"]["LEO"]["method"] == "first-fit decreasing"
+    assert heuristic["total_cost_m"] >= exact["total_cost_m"] - 1e-9
+    flown = [name for launch in heuristic["manifest"] for name in launch["payloads"]]
+    assert sorted(flown) == sorted(p["name"] for p in payloads)
+    for launch in heuristic["manifest"]:
+        assert launch["mass_kg"] <= launch["capacity_kg"]
+
+
+def test_orbits_are_packed_separately():
+    payloads = [payload("leo", 1000), payload("gto", 1000, "GTO")]
+    result = cost_estimator.manifest_pack(payloads, VEHICLES)
+    assert {launch["orbit"] for launch in result["manifest"]} == {"LEO", "GTO"}
+    assert result["launches"] == 2
+
+
+def test_unfit_payloads_are_unassigned():
+    payloads = [payload("wide", 1000, diameter=12.0, height=5.0), payload("heavy", 500000)]
+    result = cost_estimator.manifest_pack(payloads)
+    assert sorted(result["unassigned"]) == ["heavy", "wide"]
+    assert result["launches"] == 0
+
+
+@pytest.mark.parametrize("payloads, vehicles", [
+    ([payload("a", 0)], None),
+    ([payload("a", 100, "PLUTO")], None),
+    ([payload("a", 100)], ["no_such_rocket"]),
+])
+def test_rejects_bad_manifests(payloads, vehicles):
+    assert "error" in cost_estimator.manifest_pack(payloads, vehicles)
+
+
+def test_read_manifest_reports_non_numeric_cells(tmp_path):
+    path = tmp_path / "manifest.csv"
+    path.write_text("name,mass_kg,orbit\ncubesat,heavy,LEO\n")
+    result = cost_estimator._read_manifest(str(path))
+    assert result == {"error": "Payload cubesat (row 1): mass_kg is not numeric ('heavy')"}
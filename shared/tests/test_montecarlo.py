@@ -0,0 +1,72 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+import staging
+from batch_io import QuantileSketch
+
+NOMINAL = dict(total_dv_kms=9.4, isps=[282, 348], sfs=[0.06, 0.08], payload_kg=22800)
+
+
+def run(**kw):
+    args = dict(NOMINAL, isp_sd=[3, 3], sf_sd=[0.005, 0.005], samples=20000, chunk=4096)
+    args.update(kw)
+    return staging.montecarlo_staging(**args)
+
+
+def test_seed_reproducible_across_workers():
+    serial = run(seed=42, workers=1)
+    pooled = run(seed=42, workers=2)
+    assert serial["chunks"] == 5
+    for key in ("glow_quantiles_kg", "glow_mean_kg", "glow_min_kg", "glow_max_kg", "infeasible_fraction"):
+        assert serial[key] == pooled[key]
+
+
+def test_seed_changes_samples():
+    assert run(seed=1)["glow_mean_kg"] != run(seed=2)["glow_mean_kg"]
+
+
+def test_zero_scatter_reproduces_nominal():
+    result = run(isp_sd=[0, 0], sf_sd=[0, 0], samples=1000)
+    nominal = result["glow_nominal_kg"]
+    for value in result["glow_quantiles_kg"].values():
+        assert value == pytest.approx(nominal, rel=staging.SKETCH_ACCURACY)
+    assert result["infeasible_fraction"] == 0
+
+
+@pytest.mark.parametrize("dist", staging.MONTE_CARLO_DISTS)
+def test_quantiles_are_ordered(dist):
+    q = run(dist=dist)["glow_quantiles_kg"]
+    values = [q[k] for k in ("p5", "p10", "p50", "p90", "p95", "p99")]
+    assert values == sorted(values)
+
+
+def test_infeasible_samples_rank_above_feasible_ones():
+    result = run(total_dv_kms=14.3, payload_kg=1000, isp_sd=[10, 10], sf_sd=[0.01, 0.01])
+    assert 0.01 < result["infeasible_fraction"] < 0.05
+    assert result["glow_quantiles_kg"]["p99"] is None
+    assert result["glow_quantiles_kg"]["p50"] is not None
+
+
+def test_sketch_matches_exact_quantiles():
+    values = np.random.default_rng(3).lognormal(12, 0.5, 50000)
+    sketch = QuantileSketch(0.001)
+    for part in np.array_split(values, 7):
+        other = QuantileSketch(0.001)
+        other.add(part)
+        sketch.merge(other)
+    for q in (0.05, 0.5, 0.9, 0.99):
+        assert sketch.quantile(q) == pytest.approx(np.quantile(values, q, method="lower"), rel=0.002)
+    assert sketch.quantile(0.99, above=1000) == float("inf")
+
+
+@pytest.mark.parametrize("kw", [
+    {"isp_sd": [-1, 3]},
+    {"sf_sd": [0.005, -0.001]},
+    {"dist": "lognormal"},
+    {"samples": 0},
+    {"chunk": 0},
+    {"isp_sd": [3]},
+])
+def test_rejects_bad_inputs(kw):
+    assert "error" in run(**kw)
@@ -0,0 +1,94 @@
+import copy
+import math
+
+import pytest
+
+pytest.importorskip("numpy")
+
+import staging
+
+SPEC = {
+    "core": {"isp": 300, "thrust_kn": 7600, "propellant_kg": 400000, "structural_fraction": 0.06},
+    "booster": {"isp": 300, "thrust_kn": 7600, "propellant_kg": 400000, "count": 2},
+    "upper": [{"isp": 348, "thrust_kn": 934, "propellant_kg": 100000, "structural_fraction": 0.08}],
+    "payload_kg": 15000,
+}
+
+
+def spec_with(path, value):
+    spec = copy.deepcopy(SPEC)
+    *parents, key = path
+    node = spec
+    for p in parents:
+        node = node[p]
+    node[key] = value
+    return spec
+
+
+def test_core_only_matches_series_staging():
+    row = staging.evaluate_parallel(SPEC, counts=[0])["results"]
+    upper_wet = 100000 / (1 - 0.08)
+    core_wet = 400000 / (1 - 0.06)
+    m0 = 15000 + upper_wet + core_wet
+    dv_core = 300 * staging.G0 * math.log(m0 / (m0 - 400000)) / 1000
+    dv_upper = 348 * staging.G0 * math.log((15000 + upper_wet) / (15000 + upper_wet - 100000)) / 1000
+    assert row["glow_kg"][0] == pytest.approx(m0, abs=1e-3)
+    assert row["delta_v_kms"][0] == pytest.approx(dv_core + dv_upper, abs=1e-3)
+    assert row["liftoff_twr"][0] == pytest.approx(7600e3 / (m0 * staging.G0), abs=1e-3)
+
+
+def test_empty_boosters_add_no_thrust():
+    rows = staging.evaluate_parallel(SPEC, counts=[0, 4], booster_props=[0])["results"]
+    assert rows["liftoff_twr"][0] == rows["liftoff_twr"][1]
+    assert rows["delta_v_kms"][0] == rows["delta_v_kms"][1]
+    assert rows["parallel_burn_s"] == [0.0, 0.0]
+
+
+def test_boosters_and_crossfeed_add_delta_v():
+    plain = staging.evaluate_parallel(SPEC, counts=[0, 2, 4])["results"]["delta_v_kms"]
+    assert plain[0] < plain[1] < plain[2]
+    crossfeed = staging.evaluate_parallel(dict(SPEC, crossfeed=True), counts=[2])["results"]["delta_v_kms"]
+    assert crossfeed[0] > plain[1]
+
+
+def test_optimize_boosters_closes_target():
+    result = staging.optimize_boosters(SPEC, 11.0)
+    best = result["best"]
+    assert best["delta_v_kms"] == pytest.approx(11.0, abs=1e-3)
+    assert best["liftoff_twr"] >= staging.MIN_LIFTOFF_TWR
+    assert best["glow_kg"] == min(o["glow_kg"] for o in result["options"])
+    assert all(o["delta_v_kms"] >= 11.0 - 1e-6 for o in result["options"])
+
+
+def test_optimize_boosters_reports_unreachable_target():
+    assert "error" in staging.optimize_boosters(SPEC, 20.0)
+
+
+def test_booster_count_is_an_int():
+    _, booster, _, _, _ = staging.parse_parallel_spec(spec_with(("booster", "count"), 2.0))
+    assert booster["count"] == 2 and isinstance(booster["count"], int)
+
+
+@pytest.mark.parametrize("spec", [
+    [1],
+    spec_with(("booster", "count"), "two"),
+    spec_with(("booster", "count"), 1.5),
+    spec_with(("booster", "count"), -1),
+    spec_with(("booster", "propellant_kg"), -1000),
+    spec_with(("core", "structural_fraction"), 1),
+    spec_with(("core", "structural_fraction"), 0),
+    spec_with(("upper", 0, "structural_fraction"), 1.2),
+    spec_with(("booster", "isp"), 0),
+    spec_with(("core", "thrust_kn"), 0),
+    '{"core": ',
+])
+def test_rejects_bad_specs(spec):
+    assert "error" in staging.evaluate_parallel(spec)
+    assert "error" in staging.optimize_boosters(spec, 9.0)
+
+
+def test_rejects_negative_counts_and_loads():
+    assert "error" in staging.evaluate_parallel(SPEC, counts=[-1])
+    assert "error" in staging.evaluate_parallel(SPEC, booster_props=[-1])
+    assert "error" in staging.optimize_boosters(SPEC, 9.0, max_boosters=-1)
+    assert "error" in staging.optimize_boosters(SPEC, 9.0, max_booster_prop_kg=0)
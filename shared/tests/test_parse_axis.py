@@ -0,0 +1,35 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+import geometry
+import lowthrust
+from batch_io import parse_axis
+
+
+def test_list_and_range_axes():
+    assert parse_axis("1,2.5,4").tolist() == [1.0, 2.5, 4.0]
+    assert parse_axis("3:6:4").tolist() == [3.0, 4.0, 5.0, 6.0]
+    assert parse_axis("7").tolist() == [7.0]
+
+
+@pytest.mark.parametrize("text", ["3:6:0", "3:6:-2", "3:6", "a,b", "3:6:2.5", ""])
+def test_bad_axes_name_the_text(text):
+    with pytest.raises(ValueError, match=f"Bad axis '{text}'"):
+        parse_axis(text)
+
+
+def test_tools_share_the_parser():
+    assert lowthrust.parse_axis is parse_axis
+    assert geometry.parse_axis is parse_axis
+
+
+def test_cli_reports_bad_axes(capsys):
+    with pytest.raises(SystemExit):
+        lowthrust.main(["sweep", "--alt0", "400", "--alt1", "35786", "--mass", "2000",
+                        "--isp", "1000:3000:0", "--power-kw", "5"])
+    assert "Bad axis '1000:3000:0'" in capsys.readouterr().out
+    with pytest.raises(SystemExit):
+        geometry.main(["tank-trade", "--propellant-kg", "1000", "--fuel", "lox-rp1",
+                       "--diameters", "3:4:0", "--pressures", "2,3"])
+    assert "Bad axis '3:4:0'" in capsys.readouterr().out
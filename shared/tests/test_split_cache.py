@@ -0,0 +1,59 @@
+import pytest
+
+import staging
+
+ISPS, SFS = [282, 348], [0.06, 0.08]
+
+
+@pytest.fixture(autouse=True)
+def empty_split_cache():
+    staging._SPLIT_CACHE.clear()
+    yield
+    staging._SPLIT_CACHE.clear()
+
+
+def test_hit_rescales_to_payload_without_solving():
+    first = staging.optimize_staging(9.4, 2, ISPS, SFS, 22800)
+    again = staging.optimize_staging(9.4, 2, ISPS, SFS, 5000)
+    assert first["split_cache"] == "miss" and first["iterations"] > 0
+    assert again["split_cache"] == "hit" and again["iterations"] == 0
+    assert again["glow_kg"] == pytest.approx(first["glow_kg"] * 5000 / 22800, abs=0.2)
+    assert [s["delta_v_kms"] for s in again["stages"]] == [s["delta_v_kms"] for s in first["stages"]]
+    info = staging.split_cache_info()
+    assert (info["hits"], info["misses"], info["warm_starts"], info["size"]) == (1, 1, 0, 1)
+
+
+def test_warm_start_from_nearest_delta_v():
+    staging.optimize_staging(9.4, 2, ISPS, SFS, 22800)
+    cold_split, _, cold_iterations = staging.lagrange_split(9.45, ISPS, SFS)
+    warm = staging.optimize_staging(9.45, 2, ISPS, SFS, 22800)
+    assert warm["split_cache"] == "warm-start"
+    assert warm["iterations"] <= cold_iterations
+    assert [s["delta_v_kms"] for s in warm["stages"]] == [round(dv, 3) for dv in cold_split]
+    assert staging.split_cache_info()["warm_starts"] == 1
+
+
+def test_other_stages_do_not_warm_start():
+    staging.optimize_staging(9.4, 2, ISPS, SFS, 22800)
+    other = staging.optimize_staging(9.4, 2, [300, 450], SFS, 22800)
+    assert other["split_cache"] == "miss"
+    assert staging.split_cache_info()["warm_starts"] == 0
+
+
+def test_infeasible_miss_is_not_a_warm_start():
+    staging.optimize_staging(9.4, 2, ISPS, SFS, 22800)
+    assert "error" in staging.optimize_staging(30.0, 2, ISPS, SFS, 22800)
+    info = staging.split_cache_info()
+    assert info["warm_starts"] == 0 and info["size"] == 1
+
+
+def test_lru_eviction_keeps_delta_v_index_consistent():
+    cache = staging._SplitCache(maxsize=2)
+    config = (tuple(ISPS), tuple(SFS))
+    for dv, eta in ((9.0, 1.0), (9.4, 2.0), (9.8, 3.0)):
+        cache.put((dv,) + config, {"eta": eta})
+    assert cache.get((9.0,) + config) is None
+    assert cache.nearest_eta((9.1,) + config) == 2.0
+    assert cache.info()["size"] == 2
+    cache.clear()
+    assert cache.nearest_eta((9.4,) + config) is None
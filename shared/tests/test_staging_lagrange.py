@@ -0,0 +1,83 @@
+import math
+
+import pytest
+
+import staging
+
+
+CASES = [
+    # (delta-v km/s, Isps, structural fractions, payload kg)
+    (9.4, [300, 300], [0.08, 0.08], 5000),
+    (9.4, [282, 348], [0.06, 0.08], 22800),
+    (9.4, [300, 450], [0.06, 0.10], 5000),
+    (9.4, [320, 320, 320], [0.07, 0.07, 0.07], 5000),
+    (9.4, [290, 340, 450], [0.05, 0.08, 0.12], 5000),
+    (11.0, [290, 340, 450], [0.06, 0.08, 0.10], 5000),
+]
+
+
+@pytest.fixture(autouse=True)
+def empty_split_cache():
+    staging._SPLIT_CACHE.clear()
+    yield
+    staging._SPLIT_CACHE.clear()
+
+
+@pytest.mark.parametrize("dv, isps, sfs, payload", CASES)
+def test_lagrange_matches_slsqp(dv, isps, sfs, payload):
+    pytest.importorskip("scipy")
+    result = staging.optimize_staging(dv, len(isps), isps, sfs, payload, verify=True)
+    check = result["verification"]
+    assert check["method"] == "numerical (SLSQP)"
+    # SLSQP can only match the closed form, never beat it
+    assert -1e-6 <= check["relative_difference"] <= 1e-5
+    for ours, theirs in zip(result["stages"], check["delta_v_split_kms"]):
+        assert ours["delta_v_kms"] == pytest.approx(theirs, abs=0.02)
+
+
+@pytest.mark.parametrize("dv, isps, sfs, payload", CASES)
+def test_split_sums_to_delta_v(dv, isps, sfs, payload):
+    split, eta, iterations = staging.lagrange_split(dv, isps, sfs)
+    assert sum(split) == pytest.approx(dv, rel=1e-9)
+    assert eta > 0 and 1 <= iterations <= 100
+
+
+def test_equal_stages_split_equally():
+    split, _, _ = staging.lagrange_split(9.4, [320, 320, 320], [0.07, 0.07, 0.07])
+    assert split == pytest.approx([9.4 / 3] * 3, rel=1e-9)
+
+
+def test_optimum_beats_equal_split():
+    result = staging.optimize_staging(9.4, 2, [282, 348], [0.06, 0.08], 22800)
+    assert result["comparison"]["mass_saved_pct"] > 0
+
+
+def test_matches_grid_search():
+    pytest.importorskip("numpy")
+    lagrange = staging.optimize_staging(9.4, 3, [290, 340, 450], [0.05, 0.08, 0.12], 5000)
+    grid = staging.optimize_staging(9.4, 3, [290, 340, 450], [0.05, 0.08, 0.12], 5000, method="grid")
+    assert grid["glow_kg"] == pytest.approx(lagrange["glow_kg"], rel=1e-4)
+
+
+def test_infeasible_delta_v():
+    assert staging.lagrange_split(20.0, [300, 300], [0.08, 0.08]) is None
+    result = staging.optimize_staging(20.0, 2, [300, 300], [0.08, 0.08], 5000)
+    assert "error" in result and "Infeasible" in result["error"]
+
+
+def test_infeasible_at_zero_payload_limit():
+    c = [300 * staging.G0 / 1000] * 2
+    limit = sum(ci * math.log(1 / 0.08) for ci in c)
+    assert staging.lagrange_split(limit, [300, 300], [0.08, 0.08]) is None
+    assert staging.lagrange_split(limit * 0.99, [300, 300], [0.08, 0.08]) is not None
+
+
+@pytest.mark.parametrize("args", [
+    (9.4, 2, [300], [0.08], 5000),
+    (9.4, 2, [300, 300], [0.08, 0.08], 0),
+    (0.0, 2, [300, 300], [0.08, 0.08], 5000),
+    (9.4, 2, [300, -1], [0.08, 0.08], 5000),
+    (9.4, 2, [300, 300], [0.08, 1.0], 5000),
+])
+def test_rejects_bad_inputs(args):
+    assert "error" in staging.optimize_staging(*args)
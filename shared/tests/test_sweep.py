@@ -0,0 +1,52 @@
+import csv
+import json
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+import staging
+
+SPEC = {"delta_v_kms": [9.0, 9.4], "payload_kg": [1000, 2000], "isp": [[282, 348], [290, 340, 450]]}
+
+
+def test_inline_rows_match_optimize_staging():
+    result = staging.sweep_staging(SPEC)
+    rows = result["results"]
+    assert result["points"] == 8 and result["feasible"] == 8
+    assert rows["config"] == [0, 0, 0, 0, 1, 1, 1, 1]
+    assert rows["stages"] == [2, 2, 2, 2, 3, 3, 3, 3]
+    single = staging.optimize_staging(9.4, 3, [290, 340, 450], [staging.DEFAULT_STRUCTURAL_FRACTION] * 3, 2000)
+    assert rows["glow_kg"][7] == pytest.approx(single["glow_kg"], abs=0.1)
+    assert rows["dv_stage3_kms"][0] is None
+
+
+def test_csv_and_ndjson_write_integer_columns(tmp_path):
+    staging.sweep_staging(SPEC, str(tmp_path / "s.csv"))
+    with open(tmp_path / "s.csv", newline="") as f:
+        first = next(csv.DictReader(f))
+    assert (first["config"], first["stages"]) == ("0", "2")
+    staging.sweep_staging(SPEC, str(tmp_path / "s.ndjson"))
+    with open(tmp_path / "s.ndjson") as f:
+        first = json.loads(f.readline())
+    assert first["config"] == 0 and isinstance(first["stages"], int)
+
+
+def test_npy_output_and_workers(tmp_path):
+    serial = staging.sweep_staging(SPEC, str(tmp_path / "a.npy"), chunk_points=2)
+    pooled = staging.sweep_staging(SPEC, str(tmp_path / "b.npy"), workers=2, chunk_points=2)
+    a, b = np.load(tmp_path / "a.npy"), np.load(tmp_path / "b.npy")
+    assert a.dtype == np.float64 and a.shape == (8, len(serial["columns"]))
+    assert serial["chunks"] == pooled["chunks"] == 4
+    assert np.array_equal(a, b, equal_nan=True)
+
+
+@pytest.mark.parametrize("spec", [
+    {"delta_v_kms": [9.4], "payload_kg": [1000]},
+    {"delta_v_kms": [], "payload_kg": [1000], "isp": [[300, 350]]},
+    {"delta_v_kms": [-1], "payload_kg": [1000], "isp": [[300, 350]]},
+    {"delta_v_kms": [9.4], "payload_kg": [1000], "isp": [[300, 350]], "structural_fraction": 1.0},
+    "not json",
+])
+def test_rejects_bad_specs(spec):
+    assert "error" in staging.sweep_staging(spec)
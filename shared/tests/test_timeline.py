@@ -0,0 +1,47 @@
+import pytest
+
+import timeline
+
+
+def test_plan_does_no_window_lookup_by_default(monkeypatch):
+    def fail(*args):
+        raise AssertionError("window lookup without launch_window")
+
+    monkeypatch.setattr(timeline, "_next_launch_window", fail)
+    plan = timeline.mission_plan("2027-03-15", "Mars")
+    assert plan["launch_date"] == "2027-03-15"
+    assert plan["phases"][0]["start"] == "2027-03-15"
+    assert "launch_window" not in plan
+
+
+def test_launch_window_shifts_every_phase(monkeypatch):
+    window = {"departure_date": "2029-01-06", "days_after_requested_date": 663}
+    monkeypatch.setattr(timeline, "_next_launch_window", lambda destination, date: window)
+    plan = timeline.mission_plan("2027-03-15", "Mars", launch_window=True)
+    assert plan["launch_date"] == "2029-01-06"
+    assert plan["requested_launch_date"] == "2027-03-15"
+    assert plan["launch_window"] == window
+    cruise = next(p for p in plan["phases"] if p["name"] == "Cruise")
+    assert cruise["start"] == "2029-01-06"
+    assert all(p["start"] >= "2029-01-06" for p in plan["phases"])
+
+
+def test_launch_window_from_ephemeris(monkeypatch, tmp_path):
+    pytest.importorskip("numpy")
+    import ephemeris
+
+    monkeypatch.setattr(ephemeris, "CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(ephemeris, "_TABLE", None)
+    plan = timeline.mission_plan("2027-03-15", "Mars", launch_window=True)
+    assert plan["launch_window"]["departure_date"] == plan["launch_date"]
+    assert plan["launch_date"] > "2027-03-15"
+
+
+def test_earth_orbit_and_moon_plans_have_no_window():
+    assert timeline.mission_plan("2027-03-15", "LEO", launch_window=True)["launch_window"] is None
+    moon = timeline.mission_plan("2027-03-15", "Moon", launch_window=True)
+    assert moon["launch_window"] is None and moon["launch_date"] == "2027-03-15"
+
+
+def test_bad_date():
+    assert "error" in timeline.mission_plan("15/03/2027", "Mars")
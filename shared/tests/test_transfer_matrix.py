@@ -0,0 +1,42 @@
+import pytest
+
+import trajectory
+
+
+def test_hohmann_to_a_moon_keeps_the_parent_result():
+    result = trajectory.hohmann_transfer("Earth", "Moon")
+    assert "error" not in result
+    assert result["delta_v_total_kms"] == 0.0
+    assert "moon_note" in result
+
+
+def test_matrix_leaves_parent_moon_cells_empty():
+    m = trajectory.transfer_matrix()
+    i, j = m["index"]["Earth"], m["index"]["Moon"]
+    assert m["delta_v_total_kms"][i][j] is None
+    assert m["delta_v_total_kms"][i][i] is None
+    assert "Moon" in m["moon_notes"]
+
+
+def test_matrix_matches_direct_calls():
+    m = trajectory.transfer_matrix()
+    for a, b in (("Earth", "Mars"), ("Venus", "Jupiter"), ("Earth", "Titan")):
+        direct = trajectory.hohmann_transfer(a, b)
+        i, j = m["index"][a], m["index"][b]
+        for q in trajectory.TRANSFER_QUANTITIES:
+            assert m[q][i][j] == direct[q]
+
+
+def test_matrix_copies_are_independent():
+    m = trajectory.transfer_matrix()
+    m["delta_v_total_kms"][0][1] = -1
+    assert trajectory.transfer_matrix()["delta_v_total_kms"][0][1] != -1
+
+
+def test_lookup_falls_back_to_direct_call():
+    lookup = trajectory.transfer_lookup("earth", "moon")
+    assert lookup["delta_v_total_kms"] == 0.0 and "moon_note" in lookup
+    assert "error" in trajectory.transfer_lookup("Earth", "Earth")
+    assert "error" in trajectory.transfer_lookup("Earth", "Vulcan")
+    assert trajectory.transfer_lookup("Earth", "Mars")["transfer_time_days"] == pytest.approx(
+        trajectory.hohmann_transfer("Earth", "Mars")["transfer_time_days"])
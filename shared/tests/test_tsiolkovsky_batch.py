@@ -0,0 +1,88 @@
+import csv
+import math
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+import trajectory
+
+
+def test_batch_matches_scalar():
+    isp = [282, 311, 348, 450]
+    m_i = [549054, 120000, 96570, 30000]
+    m_f = [25600, 40000, 4500, 12000]
+    res = trajectory.tsiolkovsky_batch(isp, m_i, m_f)
+    assert res["feasible"].all()
+    for k in range(len(isp)):
+        one = trajectory.tsiolkovsky(isp[k], m_i[k], m_f[k])
+        assert res["delta_v_ms"][k] == pytest.approx(one["delta_v_ms"], abs=0.05)
+        assert res["mass_ratio"][k] == pytest.approx(one["mass_ratio"], abs=5e-4)
+
+
+def test_batch_feasibility_mask():
+    # valid, m_final == m_initial, m_final > m_initial, m_final == 0, m_initial < 0
+    m_i, m_f = [1000, 1000, 1000, 1000, -5], [500, 1000, 2000, 0, 1]
+    res = trajectory.tsiolkovsky_batch(300, m_i, m_f)
+    assert res["feasible"].tolist() == [True, False, False, False, False]
+    assert math.isfinite(res["delta_v_ms"][0])
+    assert np.isnan(res["delta_v_ms"][1:]).all()
+    for k in range(1, 5):
+        assert "error" in trajectory.tsiolkovsky(300, m_i[k], m_f[k])
+
+
+def test_inverse_batch_matches_scalar_and_mask():
+    dv = np.array([3.0, 9.4, 12.0])
+    res = trajectory.inverse_tsiolkovsky_batch(350, dv, [1000, 1000, 1000], 0.08)
+    for k, expected in enumerate(trajectory.inverse_tsiolkovsky(350, float(d), 1000, 0.08) for d in dv):
+        if "error" in expected:
+            assert not res["feasible"][k]
+            assert np.isnan(res["propellant_kg"][k])
+        else:
+            assert res["feasible"][k]
+            assert res["propellant_kg"][k] == pytest.approx(expected["propellant_kg"], abs=0.05)
+            assert res["stage_wet_kg"][k] == pytest.approx(expected["stage_wet_kg"], abs=0.05)
+    assert res["feasible"].tolist() == [True, False, False]
+
+
+def test_inverse_batch_rejects_non_positive_payload():
+    res = trajectory.inverse_tsiolkovsky_batch(350, 3.0, [1000, 0, -1])
+    assert res["feasible"].tolist() == [True, False, False]
+
+
+def test_run_batch_csv_and_ndjson(tmp_path):
+    csv_path = tmp_path / "in.csv"
+    csv_path.write_text("isp,m_initial,m_final\n300,1000,500\n300,1000,2000\n")
+    summary = trajectory._run_batch("tsiolkovsky", str(csv_path))
+    assert summary["results"]["feasible"] == [True, False]
+    assert summary["results"]["delta_v_ms"][1] is None
+
+    nd_path = tmp_path / "in.ndjson"
+    nd_path.write_text('{"isp": 350, "delta_v": 3.0, "payload": 1000}\n'
+                       '{"isp": 350, "delta_v": 12.0, "payload": 1000, "structural_fraction": 0.08}\n')
+    out = tmp_path / "out.csv"
+    summary = trajectory._run_batch("inverse", str(nd_path), str(out))
+    assert summary["output"] == str(out)
+    with open(out, newline="") as f:
+        assert [row["feasible"] for row in csv.DictReader(f)] == ["True", "False"]
+
+
+def test_run_batch_blank_structural_fraction_uses_default(tmp_path):
+    path = tmp_path / "in.csv"
+    path.write_text("isp,delta_v,payload,structural_fraction\n350,3.0,1000,\n350,3.0,1000,0.08\n")
+    cols = trajectory._run_batch("inverse", str(path))["results"]
+    assert cols["feasible"] == [True, True]
+    assert cols["propellant_kg"][0] == pytest.approx(cols["propellant_kg"][1])
+
+
+def test_run_batch_reports_bad_cells(tmp_path):
+    path = tmp_path / "bad.csv"
+    path.write_text("isp,m_initial,m_final\n300,abc,500\n")
+    result = trajectory._run_batch("tsiolkovsky", str(path))
+    assert result == {"error": "Column 'm_initial' row 1 is not numeric ('abc')"}
+
+
+def test_run_batch_reports_missing_columns(tmp_path):
+    path = tmp_path / "short.csv"
+    path.write_text("isp,m_initial\n300,1000\n")
+    assert "Missing columns" in trajectory._run_batch("tsiolkovsky", str(path))["error"]
@@ -0,0 +1,74 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+import geometry
+import staging
+
+
+@pytest.fixture(scope="module")
+def sized():
+    return {accel: geometry.vehicle_size_closed_loop(5000, accel=accel) for accel in ("anderson", "aitken", "none")}
+
+
+def test_all_accelerations_converge_to_the_same_vehicle(sized):
+    glows = {accel: r["estimated_glow_kg"] for accel, r in sized.items()}
+    assert all(r["converged"] for r in sized.values())
+    assert glows["anderson"] == pytest.approx(glows["none"], rel=1e-6)
+    assert glows["aitken"] == pytest.approx(glows["none"], rel=1e-6)
+    assert sized["anderson"]["iterations"] <= sized["none"]["iterations"]
+
+
+def test_result_is_a_fixed_point(sized):
+    result = sized["anderson"]
+    sfs = [st["structural_fraction"] for st in result["stages"]]
+    for st in result["stages"]:
+        assert st["structural_fraction"] == pytest.approx(
+            st["structure_kg"] / (st["structure_kg"] + st["propellant_kg"]), abs=1e-5)
+    isps = [st["isp_s"] for st in result["stages"]]
+    _, masses = staging.optimal_stage_masses(result["total_delta_v_kms"], isps, sfs, 5000)
+    assert masses[0]["wet_kg"] == pytest.approx(result["estimated_glow_kg"], rel=1e-4)
+    for st, mass in zip(result["stages"], masses):
+        assert mass["propellant_kg"] == pytest.approx(st["propellant_kg"], rel=1e-4)
+
+
+def test_tank_terms_are_reused_across_passes():
+    geometry._tank_terms.cache_clear()
+    result = geometry.vehicle_size_closed_loop(5000, diameter_m=3.7)
+    assert result["memo"]["tank_terms_misses"] == 1
+    assert result["memo"]["tank_terms_hits"] >= result["sizing_passes"]
+
+
+@pytest.mark.parametrize("fuel, material", [("lox-rp1", "aluminum"), ("lox-lh2", "cfrp"), ("lox-ch4", "steel")])
+def test_tank_mass_matches_tank_sizing_batch(fuel, material):
+    props = [20000.0, 150000.0, 400000.0]
+    batch = geometry.tank_sizing_batch(props, fuel, 3.7, material, meop_bar=3.0)
+    for prop, expected in zip(props, batch["total_tank_mass_kg"]):
+        mass, _, design_bar = geometry._tank_mass_kg(prop, fuel, 3.7, material, 3.0, 0.0)
+        assert mass == pytest.approx(expected, rel=1e-12)
+        assert design_bar == 3.0
+
+
+def test_hydrostatic_head_raises_design_pressure():
+    mass_0g, _, bar_0g = geometry._tank_mass_kg(400000.0, "lox-rp1", 3.7, "aluminum", 3.0, 0.0)
+    mass_4g, _, bar_4g = geometry._tank_mass_kg(400000.0, "lox-rp1", 3.7, "aluminum", 3.0, 4.0)
+    assert bar_4g > bar_0g and mass_4g >= mass_0g
+
+
+def test_heavier_payload_needs_a_heavier_vehicle():
+    light = geometry.vehicle_size_closed_loop(5000, diameter_m=3.7)
+    heavy = geometry.vehicle_size_closed_loop(15000, diameter_m=3.7)
+    assert heavy["estimated_glow_kg"] > light["estimated_glow_kg"]
+
+
+@pytest.mark.parametrize("kw", [
+    {"payload_kg": 0},
+    {"payload_kg": 5000, "orbit": "PLUTO"},
+    {"payload_kg": 5000, "propellant": "h2o2"},
+    {"payload_kg": 5000, "wall_material": "wood"},
+    {"payload_kg": 5000, "isps": [300]},
+    {"payload_kg": 5000, "accel": "magic"},
+    {"payload_kg": 5000, "orbit": "MARS", "propellant": "n2o4-udmh"},
+])
+def test_reports_errors(kw):
+    assert "error" in geometry.vehicle_size_closed_loop(**kw)
@@ -0,0 +1,220 @@
+"""Ascent Trajectory Simulator — Shared tool for space-engineering pack.
+
+2-D point-mass ascent over a spherical, non-rotating Earth: vertical rise,
+pitch kick, then a gravity turn with constant thrust, linear mass flow and an
+exponential atmosphere. Integrated with an adaptive Dormand–Prince 5(4)
+scheme where every profile in a batch carries its own step size, so thousands
+of (TWR, burn time, Isp) cases advance together as state arrays.
+
+Usage:
+    python ascent.py simulate --twr 1.3 --burn-time 162 --isp 300
+    python ascent.py batch --input profiles.csv --output losses.csv
+"""
+import argparse
+import json
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(__file__))
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from batch_io import np, NUMPY_MISSING, read_columns, require_columns, write_columns, summarize_columns
+from constants import G0, R_EARTH
+
+R0_M = R_EARTH * 1000
+RHO0 = 1.225               # kg/m³, sea-level density
+SCALE_HEIGHT_M = 8500.0    # m
+BALLISTIC_COEFF = 20000.0  # kg/m², liftoff m/(Cd·A) — large liquid launchers
+KICK_SPEED_MS = 100.0      # m/s, end of vertical rise
+KICK_DEG = 2.0             # deg, pitch kick at KICK_SPEED_MS
+
+# Dormand–Prince 5(4) tableau
+_A = (
+    (),
+    (1 / 5,),
+    (3 / 40, 9 / 40),
+    (44 / 45, -56 / 15, 32 / 9),
+    (19372 / 6561, -25360 / 2187, 64448 / 6561, -212 / 729),
+    (9017 / 3168, -355 / 33, 46732 / 5247, 49 / 176, -5103 / 18656),
+    (35 / 384, 0, 500 / 1113, 125 / 192, -2187 / 6784, 11 / 84),
+)
+_B5 = (35 / 384, 0, 500 / 1113, 125 / 192, -2187 / 6784, 11 / 84, 0)
+_B4 = (5179 / 57600, 0, 7571 / 16695, 393 / 640, -92097 / 339200, 187 / 2100, 1 / 40)
+_E = tuple(b5 - b4 for b5, b4 in zip(_B5, _B4))
+
+# State rows: speed, flight-path angle, altitude, downrange, mass/m0, gravity loss, drag loss
+_ATOL = np.array([1e-3, 1e-8, 1e-2, 1e-2, 1e-9, 1e-3, 1e-3])[:, None] if np is not None else None
+_RTOL = 1e-7
+
+
+def _derivatives(y, accel0, mdot, inv_beta, kicked):
+    v, gamma, h, _, m = y[0], y[1], y[2], y[3], y[4]
+    r = R0_M + h
+    g = G0 * (R0_M / r) ** 2
+    rho = RHO0 * np.exp(-np.maximum(h, 0) / SCALE_HEIGHT_M)
+    drag = 0.5 * rho * v * v * inv_beta / m
+    sin_g, cos_g = np.sin(gamma), np.cos(gamma)
+    dy = np.empty_like(y)
+    dy[0] = accel0 / m - drag - g * sin_g
+    with np.errstate(divide="ignore", invalid="ignore"):
+        dy[1] = np.where(kicked, -(g / np.maximum(v, 1e-3) - v / r) * cos_g, 0.0)
+    dy[2] = v * sin_g
+    dy[3] = v * cos_g * R0_M / r
+    dy[4] = -mdot
+    dy[5] = g * sin_g
+    dy[6] = drag
+    return dy
+
+
+def simulate_ascent_batch(twr, burn_time_s, isp, ballistic_coeff=BALLISTIC_COEFF,
+                          kick_speed_ms=KICK_SPEED_MS, kick_deg=KICK_DEG, max_steps=20000):
+    """Integrate many ascent profiles at once; returns columnar arrays.
+
+    All inputs broadcast together. Rows whose propellant would run out before
+    ``burn_time_s`` (twr·t_burn ≥ Isp) or whose trajectory falls back to the
+    ground are flagged False in ``feasible``.
+    """
+    if np is None:
+        return dict(NUMPY_MISSING)
+    twr, burn, isp, beta, v_kick, kick = np.broadcast_arrays(*(
+        np.asarray(x, dtype=float).ravel() if np.ndim(x) else np.asarray([x], dtype=float)
+        for x in (twr, burn_time_s, isp, ballistic_coeff, kick_speed_ms, kick_deg)))
+    n = twr.size
+    mdot = twr / isp                       # fraction of liftoff mass per second
+    feasible = (twr > 1.0) & (burn > 0) & (mdot * burn < 1.0)
+    accel0 = twr * G0
+    inv_beta = 1 / beta
+    kick_rad = np.radians(kick)
+
+    y = np.zeros((7, n))
+    y[1] = np.pi / 2
+    y[4] = 1.0
+    t = np.zeros(n)
+    dt = np.full(n, 0.5)
+    kicked = np.zeros(n, dtype=bool)
+    active = feasible.copy()
+    steps = np.zeros(n, dtype=int)
+
+    for _ in range(max_steps):
+        if not active.any():
+            break
+        # Short steps during the vertical rise so the kick lands near kick_speed_ms
+        h_step = np.where(active, np.minimum(np.where(kicked, dt, np.minimum(dt, 0.5)), burn - t), 0.0)
+        k = []
+        for stage in range(7):
+            yi = y.copy()
+            for coeff, kj in zip(_A[stage], k):
+                if coeff:
+                    yi += (coeff * h_step) * kj
+            k.append(_derivatives(yi, accel0, mdot, inv_beta, kicked))
+        y5 = y + h_step * sum(b * kj for b, kj in zip(_B5, k) if b)
+        err_vec = h_step * sum(e * kj for e, kj in zip(_E, k) if e)
+        scale = _ATOL + _RTOL * np.maximum(np.abs(y), np.abs(y5))
+        err = np.max(np.abs(err_vec) / scale, axis=0)
+        accept = active & (err <= 1.0)
+
+        y[:, accept] = y5[:, accept]
+        t = np.where(accept, t + h_step, t)
+        steps += accept
+        factor = np.clip(0.9 * np.power(np.maximum(err, 1e-12), -0.2), 0.2, 5.0)
+        dt = np.where(active, np.maximum(h_step * factor, 1e-4), dt)
+
+        kick_now = accept & ~kicked & (y[0] >= v_kick)
+        y[1] = np.where(kick_now, y[1] - kick_rad, y[1])
+        kicked |= kick_now
+        crashed = accept & (y[2] < 0) & (t > 1.0)
+        feasible &= ~crashed
+        active &= ~crashed & (t < burn - 1e-9)
+
+    feasible &= ~active  # did not finish within max_steps
+    nan = np.where(feasible, 1.0, np.nan)
+    ideal = isp * G0 * np.log(1 / y[4])
+    return {
+        "twr": twr,
+        "burn_time_s": burn,
+        "isp_s": isp,
+        "gravity_loss_ms": y[5] * nan,
+        "drag_loss_ms": y[6] * nan,
+        "ideal_delta_v_ms": ideal * nan,
+        "burnout_velocity_ms": y[0] * nan,
+        "burnout_altitude_km": y[2] / 1000 * nan,
+        "burnout_flight_path_deg": np.degrees(y[1]) * nan,
+        "downrange_km": y[3] / 1000 * nan,
+        "burnout_mass_fraction": y[4] * nan,
+        "steps": steps,
+        "feasible": feasible,
+    }
+
+
+def simulate_ascent(twr, burn_time_s, isp, **kwargs):
+    """Single ascent profile (same integrator as the batch mode), rounded dict."""
+    if np is None:
+        return dict(NUMPY_MISSING)
+    if twr <= 1.0:
+        return {"error": "TWR must be > 1.0 for launch"}
+    if twr * burn_time_s >= isp:
+        return {"error": f"Burn time {burn_time_s}s exceeds propellant: at TWR {twr} and Isp {isp}s "
+                         f"the vehicle is empty after {isp / twr:.0f}s"}
+    res = simulate_ascent_batch(twr, burn_time_s, isp, **kwargs)
+    if not res["feasible"][0]:
+        return {"error": "Vehicle falls back before burnout (TWR/kick too low)"}
+    out = {k: round(float(v[0]), 3) for k, v in res.items() if k not in ("feasible", "steps")}
+    out["steps"] = int(res["steps"][0])
+    return out
+
+
+def run_batch(input_path, output_path=None):
+    try:
+        columns = read_columns(input_path)
+    except ValueError as exc:
+        return {"error": str(exc)}
+    names = ["twr", "burn_time", "isp"]
+    picked, missing = require_columns(columns, names, {"burn_time": ["burn_time_s"], "isp": ["isp_s"]})
+    if missing:
+        return {"error": f"Missing columns {missing}. Expected: {names} (+ optional ballistic_coeff)"}
+    beta = columns.get("ballistic_coeff", BALLISTIC_COEFF)
+    result = simulate_ascent_batch(*picked, ballistic_coeff=beta)
+    summary = summarize_columns({k: v for k, v in result.items() if k != "steps"})
+    if output_path:
+        write_columns(output_path, result)
+        summary["output"] = output_path
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Ascent Trajectory Simulator")
+    sub = parser.add_subparsers(dest="command")
+
+    p_s = sub.add_parser("simulate", help="Integrate one gravity-turn ascent")
+    p_s.add_argument("--twr", type=float, required=True)
+    p_s.add_argument("--burn-time", type=float, required=True, help="s")
+    p_s.add_argument("--isp", type=float, default=300, help="Average Isp over the burn (s)")
+    p_s.add_argument("--ballistic-coeff", type=float, default=BALLISTIC_COEFF, help="kg/m² at liftoff")
+    p_s.add_argument("--kick-deg", type=float, default=KICK_DEG)
+    p_s.add_argument("--kick-speed", type=float, default=KICK_SPEED_MS, help="m/s")
+
+    p_b = sub.add_parser("batch", help="Integrate a CSV/NDJSON table of profiles")
+    p_b.add_argument("--input", required=True, help="Columns: twr, burn_time, isp [, ballistic_coeff]")
+    p_b.add_argument("--output", default=None, help="CSV/NDJSON path for per-profile results")
+
+    args = parser.parse_args(argv)
+    if np is None and args.command:
+        print(json.dumps(NUMPY_MISSING))
+        sys.exit(1)
+    if args.command == "simulate":
+        result = simulate_ascent(args.twr, args.burn_time, args.isp,
+                                 ballistic_coeff=args.ballistic_coeff, kick_deg=args.kick_deg,
+                                 kick_speed_ms=args.kick_speed)
+    elif args.command == "batch":
+        result = run_batch(args.input, args.output)
+    else:
+        parser.print_help()
+        sys.exit(0)
+    if "error" in result:
+        print(json.dumps(result, indent=2, ensure_ascii=False))
+        sys.exit(1)
+    print(json.dumps(result, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,262 @@
+"""Columnar Batch I/O — Shared helpers for the space-engineering pack batch subcommands.
+
+Batch subcommands read a table of inputs (CSV with a header row, or NDJSON with
+one JSON object per line) and write columnar results back out. Columns are
+returned as NumPy arrays so tools can evaluate whole columns at once.
+
+Usage from any tool:
+    from batch_io import read_columns, write_columns
+    cols = read_columns("inputs.csv")            # {"isp": array([...]), ...}
+    write_columns("results.ndjson", {"delta_v_ms": dv, "feasible": ok})
+    sketch = QuantileSketch(); sketch.add(chunk); sketch.merge(other); sketch.quantile(0.9)
+"""
+import csv
+import json
+import math
+import os
+import sys
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+NUMPY_MISSING = {"error": "numpy not installed. Run: pip install numpy"}
+
+
+def _detect_format(path, fmt=None):
+    if fmt:
+        return fmt.lower()
+    ext = os.path.splitext(str(path))[1].lower()
+    if ext in (".ndjson", ".jsonl"):
+        return "ndjson"
+    return "csv"
+
+
+def _number(key, row, value):
+    if value in ("", None):
+        return float("nan")
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"Column '{key}' row {row} is not numeric ({value!r})") from None
+
+
+def read_columns(path, fmt=None):
+    """Read a CSV or NDJSON table into a dict of float arrays keyed by column name.
+
+    Raises ValueError naming the column and (1-based) row of a non-numeric cell.
+    """
+    fmt = _detect_format(path, fmt)
+    rows = {}
+    if fmt == "ndjson":
+        with open(path, "r", encoding="utf-8") as f:
+            records = [json.loads(line) for line in f if line.strip()]
+        for rec in records:
+            for key in rec:
+                rows.setdefault(key, [])
+        for i, rec in enumerate(records, 1):
+            for key, col in rows.items():
+                col.append(_number(key, i, rec.get(key)))
+    else:
+        with open(path, "r", encoding="utf-8", newline="") as f:
+            reader = csv.DictReader(f)
+            for key in reader.fieldnames or []:
+                rows[key.strip()] = []
+            for i, rec in enumerate(reader, 1):
+                for key, value in rec.items():
+                    rows[key.strip()].append(_number(key.strip(), i, value))
+    return {key: np.asarray(col, dtype=float) for key, col in rows.items()}
+
+
+def require_columns(columns, names, aliases=None):
+    """Pick required columns (accepting aliases); return (arrays, missing_names)."""
+    aliases = aliases or {}
+    picked, missing = [], []
+    for name in names:
+        for candidate in [name] + aliases.get(name, []):
+            if candidate in columns:
+                picked.append(columns[candidate])
+                break
+        else:
+            missing.append(name)
+    return picked, missing
+
+
+def parse_axis(text):
+    """Sweep axis from "a,b,c" or "start:stop:num"; raises ValueError naming the bad axis."""
+    try:
+        if ":" in text:
+            start, stop, num = text.split(":")
+            if int(num) < 1:
+                raise ValueError
+            return np.linspace(float(start), float(stop), int(num))
+        return np.array([float(x) for x in text.split(",")])
+    except ValueError:
+        raise ValueError(f"Bad axis '{text}'. Use 'a,b,c' or 'start:stop:num', e.g. 3:6:31") from None
+
+
+def _to_python(value):
+    if isinstance(value, (bool, np.bool_)):
+        return bool(value)
+    if isinstance(value, str):
+        return value
+    if isinstance(value, (int, np.integer)):
+        return int(value)
+    value = float(value)
+    if value != value:  # NaN → null
+        return None
+    return value
+
+
+def iter_records(columns):
+    """Yield one dict per row from a dict of equal-length arrays."""
+    keys = list(columns.keys())
+    arrays = [np.asarray(columns[k]) for k in keys]
+    n = len(arrays[0]) if arrays else 0
+    for i in range(n):
+        yield {k: _to_python(a[i]) for k, a in zip(keys, arrays)}
+
+
+def columns_to_lists(columns):
+    """Convert a dict of arrays to JSON-friendly lists (NaN → null)."""
+    return {k: [_to_python(x) for x in np.asarray(v).ravel()] for k, v in columns.items()}
+
+
+class ColumnWriter:
+    """Streaming CSV/NDJSON writer: append column chunks as they complete."""
+
+    def __init__(self, path, fmt=None):
+        self.path = path
+        self.fmt = _detect_format(path, fmt)
+        self.rows_written = 0
+        self._header = None
+        if path in (None, "-"):
+            self._f = sys.stdout
+            self._close = False
+        else:
+            self._f = open(path, "w", encoding="utf-8", newline="")
+            self._close = True
+        self._csv = csv.writer(self._f) if self.fmt == "csv" else None
+
+    def write(self, columns):
+        if self._header is None:
+            self._header = list(columns.keys())
+            if self._csv:
+                self._csv.writerow(self._header)
+        for rec in iter_records({k: columns[k] for k in self._header}):
+            if self._csv:
+                self._csv.writerow(["" if rec[k] is None else rec[k] for k in self._header])
+            else:
+                self._f.write(json.dumps(rec) + "\n")
+            self.rows_written += 1
+
+    def close(self):
+        if self._close:
+            self._f.close()
+        else:
+            self._f.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def write_columns(path, columns, fmt=None):
+    """Write a dict of equal-length arrays as CSV or NDJSON. Returns row count."""
+    with ColumnWriter(path, fmt) as writer:
+        writer.write(columns)
+        return writer.rows_written
+
+
+def summarize_columns(columns, feasible_key="feasible"):
+    """Compact JSON-friendly summary (count, feasible count, min/max per column)."""
+    n = len(next(iter(columns.values()))) if columns else 0
+    summary = {"rows": n}
+    if feasible_key in columns:
+        summary["feasible"] = int(np.count_nonzero(columns[feasible_key]))
+    stats = {}
+    for key, arr in columns.items():
+        if key == feasible_key:
+            continue
+        arr = np.asarray(arr, dtype=float)
+        finite = arr[np.isfinite(arr)]
+        if finite.size:
+            stats[key] = {"min": round(float(finite.min()), 4), "max": round(float(finite.max()), 4)}
+    summary["columns"] = stats
+    return summary
+
+
+class QuantileSketch:
+    """Mergeable log-bucket quantile sketch (DDSketch-style) for positive values.
+
+    Values land in buckets of geometric width gamma = (1 + a) / (1 - a), so any
+    quantile comes back within relative error ``a`` while memory grows with the
+    log of the value range rather than the sample count. Sketches built in
+    separate chunks or processes merge by adding bucket counts.
+    """
+
+    def __init__(self, relative_accuracy=0.005):
+        if not 0 < relative_accuracy < 1:
+            raise ValueError("relative_accuracy must be in (0, 1)")
+        self.relative_accuracy = relative_accuracy
+        self._gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self._gamma)
+        self.buckets = {}
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, values):
+        """Add an array of values; non-finite and non-positive values are ignored."""
+        values = np.asarray(values, dtype=float).ravel()
+        values = values[np.isfinite(values) & (values > 0)]
+        if not values.size:
+            return
+        index, counts = np.unique(np.ceil(np.log(values) / self._log_gamma).astype(np.int64),
+                                  return_counts=True)
+        for i, c in zip(index.tolist(), counts.tolist()):
+            self.buckets[i] = self.buckets.get(i, 0) + c
+        self.count += values.size
+        self.total += float(values.sum())
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+
+    def merge(self, other):
+        """Fold another sketch with the same accuracy into this one."""
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("Cannot merge sketches with different relative accuracy")
+        for i, c in other.buckets.items():
+            self.buckets[i] = self.buckets.get(i, 0) + c
+        self.count += other.count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    def quantile(self, q, above=0):
+        """Value at quantile ``q`` in [0, 1] (None when empty).
+
+        ``above`` counts samples that were not added but rank above every
+        sketched value (e.g. infeasible cases); quantiles falling among them
+        are ``math.inf``.
+        """
+        if not self.count:
+            return math.inf if above else None
+        rank = q * (self.count + above - 1)
+        if rank > self.count - 1:
+            return math.inf
+        seen = 0
+        for i in sorted(self.buckets):
+            seen += self.buckets[i]
+            if seen > rank:
+                value = 2 * self._gamma ** i / (self._gamma + 1)
+                return min(max(value, self.min), self.max)
+        return self.max
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else None
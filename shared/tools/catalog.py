@@ -0,0 +1,158 @@
+"""Vehicle Catalog — Shared data access for the space-engineering pack.
+
+Every tool reads vehicles.json through the process-wide CATALOG: the file is
+parsed on first use, kept in memory, and re-read only when its mtime/size
+changes and its content hash differs. Vehicle, engine and fairing records are
+indexed by normalized key and name aliases, so lookups like "Falcon 9",
+"falcon-9" and "falcon9" all resolve to the same entry.
+
+Usage from any tool:
+    from catalog import CATALOG, normalize_key
+    CATALOG.vehicles()                 # {"falcon9": {...}, ...}
+    CATALOG.resolve_vehicle("Falcon 9")   # "falcon9"
+    CATALOG.engine("Merlin 1D")        # record or None
+"""
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+
+SHARED_DATA = Path(__file__).resolve().parent.parent / "data"
+LOCAL_DATA = Path(__file__).parent / "data"  # fallback when the shared data dir is absent
+CATALOG_FILE = "vehicles.json"
+INDEXED_SECTIONS = ("vehicles", "engines", "fairings")
+
+
+def normalize_key(name):
+    """Canonical lookup key: lower case, spaces and hyphens to underscores."""
+    return str(name).strip().lower().replace(" ", "_").replace("-", "_")
+
+
+def _aliases(key, record):
+    names = [key, record.get("name", key)] if isinstance(record, dict) else [key]
+    out = []
+    for name in names:
+        norm = normalize_key(name)
+        out += [norm, norm.replace("_", "").replace(".", "")]
+    return out
+
+
+class VehicleCatalog:
+    """Lazily loaded, change-aware view of vehicles.json with alias indexes.
+
+    Sections are returned as the parsed dicts themselves; treat them as
+    read-only. ``version`` increments on every real reload so callers can
+    cache views derived from the catalog.
+    """
+
+    def __init__(self, path=None):
+        if path is None:
+            path = SHARED_DATA / CATALOG_FILE
+            if not path.exists() and (LOCAL_DATA / CATALOG_FILE).exists():
+                path = LOCAL_DATA / CATALOG_FILE
+        self.path = Path(path)
+        self.version = 0
+        self.loads = 0
+        self._data = None
+        self._stamp = None
+        self._digest = None
+        self._index = {}
+        self._lock = threading.Lock()
+
+    def _refresh(self):
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            if self._data is None or self._stamp is not None:
+                self._install({}, None, None)
+            return self._data
+        stamp = (st.st_mtime_ns, st.st_size)
+        if self._data is not None and stamp == self._stamp:
+            return self._data
+        with self._lock:
+            if self._data is not None and stamp == self._stamp:
+                return self._data
+            raw = self.path.read_bytes()
+            digest = hashlib.sha256(raw).hexdigest()
+            if self._data is not None and digest == self._digest:
+                self._stamp = stamp  # touched but unchanged
+                return self._data
+            self._install(json.loads(raw), stamp, digest)
+            self.loads += 1
+        return self._data
+
+    def _install(self, data, stamp, digest):
+        index = {}
+        for section in INDEXED_SECTIONS:
+            aliases = {}
+            entries = data.get(section, {})
+            for key, record in entries.items():
+                aliases.setdefault(normalize_key(key), key)  # exact keys win over name aliases
+            for key, record in entries.items():
+                for alias in _aliases(key, record):
+                    aliases.setdefault(alias, key)
+            index[section] = aliases
+        self._data, self._stamp, self._digest, self._index = data, stamp, digest, index
+        self.version += 1
+
+    @property
+    def data(self):
+        """The whole parsed file (read-only by convention)."""
+        return self._refresh()
+
+    def section(self, name):
+        return self._refresh().get(name, {})
+
+    def meta(self):
+        return self.section("_meta")
+
+    def vehicles(self):
+        return self.section("vehicles")
+
+    def engines(self):
+        return self.section("engines")
+
+    def fairings(self):
+        return self.section("fairings")
+
+    def _resolve(self, section, name):
+        self._refresh()
+        aliases = self._index.get(section, {})
+        norm = normalize_key(name)
+        return aliases.get(norm) or aliases.get(norm.replace("_", "").replace(".", ""))
+
+    def resolve_vehicle(self, name):
+        """Catalog key for a vehicle key or name alias, else None."""
+        return self._resolve("vehicles", name)
+
+    def resolve_engine(self, name):
+        """Catalog key for an engine key or name alias, else None."""
+        return self._resolve("engines", name)
+
+    def vehicle(self, name):
+        key = self.resolve_vehicle(name)
+        return self.vehicles()[key] if key else None
+
+    def engine(self, name):
+        key = self.resolve_engine(name)
+        return self.engines()[key] if key else None
+
+    def invalidate(self):
+        """Force a re-read on next access (e.g. after writing the file in the same mtime tick)."""
+        with self._lock:
+            self._stamp = None
+            self._digest = None
+
+    def info(self):
+        data = self._refresh()
+        return {
+            "path": str(self.path),
+            "loads": self.loads,
+            "version": self.version,
+            "last_updated": data.get("_meta", {}).get("last_updated"),
+            "counts": {s: len(data.get(s, {})) for s in INDEXED_SECTIONS},
+        }
+
+
+CATALOG = VehicleCatalog()
@@ -0,0 +1,63 @@
+"""Resident Tool Client — Shared tool for space-engineering pack.
+
+Thin client for server.py that keeps the existing CLI syntax: the first
+argument names the tool, everything after it is passed through unchanged.
+If no server is listening the tool runs in this process instead (set
+SPACE_TOOLS_AUTOSTART=1 to launch a background server on first use).
+
+Usage:
+    python client.py trajectory hohmann Earth Mars
+    python client.py staging.py optimize --delta-v 9.4 --stages 2 --isp 282,348 --payload-kg 22800
+    python client.py cost launch --payload-kg 150 --orbit LEO
+"""
+import os
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(__file__))
+from server import DEFAULT_SOCKET, call, run_tool
+
+AUTOSTART_WAIT_S = 10.0
+
+
+def _start_server(path):
+    subprocess.Popen([sys.executable, os.path.join(os.path.dirname(__file__), "server.py"),
+                      "serve", "--socket", path],
+                     stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                     start_new_session=True)
+    deadline = time.time() + AUTOSTART_WAIT_S
+    while time.time() < deadline:
+        if os.path.exists(path):
+            try:
+                call("ping", path=path, timeout=1)
+                return True
+            except OSError:
+                pass
+        time.sleep(0.05)
+    return False
+
+
+def run(tool, argv, path=DEFAULT_SOCKET):
+    params = {"tool": tool, "argv": argv, "cwd": os.getcwd()}
+    try:
+        return call("run", params, path=path)["result"]
+    except OSError:
+        if os.environ.get("SPACE_TOOLS_AUTOSTART") == "1" and _start_server(path):
+            return call("run", params, path=path)["result"]
+        return run_tool(tool, argv)
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv or argv[0] in ("-h", "--help"):
+        print(__doc__.strip())
+        sys.exit(0)
+    result = run(argv[0], argv[1:])
+    sys.stdout.write(result["stdout"])
+    sys.stderr.write(result["stderr"])
+    sys.exit(result["exit_code"])
+
+
+if __name__ == "__main__":
+    main()
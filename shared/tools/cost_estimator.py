@@ -6,53 +6,67 @@ Usage:
     python cost_estimator.py vehicle --glow-tonnes 550 --stages 2 --reusable --flights-per-year 15
     python cost_estimator.py launch --payload-kg 22800 --orbit LEO --vehicle falcon9
     python cost_estimator.py compare --vehicles falcon9 electron starship
+    python cost_estimator.py manifest --input rideshare.csv
+    python cost_estimator.py launch-batch --input quotes.csv --orbit GTO --top 3
+    python cost_estimator.py fleet --glow-tonnes 550 --stages 2 --vehicle falcon9 --years 10 --scenarios 10000
 """
 import argparse
+import bisect
+import csv
+import functools
+import heapq
 import json
 import math
+import os
 import sys
-from pathlib import Path
 
-# Shared data: ../data/vehicles.json (sibling directory)
-SHARED_DATA = Path(__file__).resolve().parent.parent / "data"
-# Fallback: local data/ if shared not found
-LOCAL_DATA = Path(__file__).parent / "data"
+sys.path.insert(0, os.path.dirname(__file__))
+from catalog import CATALOG, normalize_key
 
-
-def _find_data_file(filename):
-    shared = SHARED_DATA / filename
-    if shared.exists():
-        return shared
-    local = LOCAL_DATA / filename
-    if local.exists():
-        return local
-    return None
+_FALLBACK_VEHICLES = {
+    "falcon9": {"name": "Falcon 9", "launch_cost_m": 67, "payload_leo_kg": 22800, "payload_gto_kg": 8300, "payload_mars_kg": 4020, "reusable": True, "flights_per_year": 90, "cost_per_kg_leo": 2940},
+}
+_VIEW = {"version": None, "vehicles": None, "date": None}
 
 
 def _load_vehicles():
-    filepath = _find_data_file("vehicles.json")
-    if filepath:
-        with open(filepath, "r", encoding="utf-8") as f:
-            data = json.load(f)
-        meta = data.get("_meta", {})
+    """Cost view of the catalog vehicles, rebuilt only when vehicles.json changes."""
+    source = CATALOG.vehicles()  # re-reads the file only if it changed
+    if _VIEW["vehicles"] is not None and _VIEW["version"] == CATALOG.version:
+        return _VIEW["vehicles"], _VIEW["date"]
+    if not source:
+        vehicles, date = _FALLBACK_VEHICLES, "fallback"
+    else:
         vehicles = {}
-        for key, v in data.get("vehicles", {}).items():
+        for key, v in source.items():
             vehicles[key] = {
                 "name": v.get("name", key),
                 "launch_cost_m": v.get("launch_cost_m", 0),
                 "payload_leo_kg": v.get("payload_leo_kg", 0),
                 "payload_gto_kg": v.get("payload_gto_kg", 0),
+                "payload_mars_kg": v.get("payload_mars_kg", 0),
                 "reusable": v.get("reusable", False),
                 "flights_per_year": v.get("flights_2025", v.get("flights_per_year", 1)),
                 "cost_per_kg_leo": round(v["launch_cost_m"] * 1e6 / v["payload_leo_kg"], 0) if v.get("payload_leo_kg", 0) > 0 else 0,
             }
-        return vehicles, meta.get("last_updated", "unknown")
-    return {
-        "falcon9": {"name": "Falcon 9", "launch_cost_m": 67, "payload_leo_kg": 22800, "payload_gto_kg": 8300, "reusable": True, "flights_per_year": 90, "cost_per_kg_leo": 2940},
-    }, "fallback"
+        date = CATALOG.meta().get("last_updated", "unknown")
+    _VIEW.update(version=CATALOG.version, vehicles=vehicles, date=date)
+    return vehicles, date
+
+
+def __getattr__(name):
+    # VEHICLES / _DATA_DATE stay importable but are read from the catalog on access
+    if name == "VEHICLES":
+        return _load_vehicles()[0]
+    if name == "_DATA_DATE":
+        return _load_vehicles()[1]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
+def _resolve_vehicle(name):
+    """Catalog key for a vehicle key or name alias (normalized name if unknown)."""
+    return CATALOG.resolve_vehicle(name) or normalize_key(name)
 
-VEHICLES, _DATA_DATE = _load_vehicles()
 
 ENGINE_DEV_BASE = {
     "pressure_fed": 0.5e9,
@@ -111,7 +125,242 @@ def vehicle_cost(glow_tonnes, stages, reusable=False, flights_per_year=10):
     }
 
 
-KNOWN_ORBITS = ["LEO", "GTO", "GEO"]
+FLEET_LEARNING_RATE = 0.85   # Wright curve: each doubling of units built costs 85 %
+FLEET_MAX_REUSES = 20        # flight life of a reusable vehicle without catalog data
+FLEET_REFURB_FRACTION = 0.05  # light turnaround per reflight, fraction of first-unit cost
+FLEET_OVERHAUL_INTERVAL = 5   # flights between major overhauls
+FLEET_OVERHAUL_FRACTION = 0.15
+FLEET_SPREAD = 0.15           # +/- relative spread of sampled scenario inputs
+
+
+def _wright_cumulative(units, learning_rate):
+    """Sum of n**b for n = 1..units (b = log2 of the learning rate), midpoint closed form."""
+    from batch_io import np
+    e = np.log2(learning_rate) + 1
+    return ((units + 0.5) ** e - 0.5 ** e) / e
+
+
+def fleet_cost_batch(glow_tonnes, stages, reusable=False, years=10, learning_rate=FLEET_LEARNING_RATE,
+                     cadence_start=5, cadence_target=20, ramp_years=3, max_reuses=FLEET_MAX_REUSES,
+                     refurb_fraction=FLEET_REFURB_FRACTION, overhaul_interval=FLEET_OVERHAUL_INTERVAL,
+                     overhaul_fraction=FLEET_OVERHAUL_FRACTION, loss_rate=0.0, discount_rate=0.08):
+    """Year-by-year fleet cost for every scenario at once.
+
+    Scenario inputs broadcast to shape (S,); yearly outputs are (S, years).
+    Flights ramp linearly from ``cadence_start`` to ``cadence_target`` over
+    ``ramp_years``. Vehicles are built as flights exhaust their flight life
+    (``max_reuses``, one flight if expendable) plus expected losses, and each
+    unit costs the TRANSCOST-style first unit scaled along a Wright curve.
+    Reflights pay a light refurbishment, with a major overhaul every
+    ``overhaul_interval`` flights of a vehicle's life.
+    """
+    from batch_io import np
+    S = np.broadcast_shapes(*(np.shape(a) for a in (glow_tonnes, stages, reusable, learning_rate, cadence_start,
+                                                   cadence_target, ramp_years, max_reuses, refurb_fraction,
+                                                   overhaul_interval, overhaul_fraction, loss_rate, discount_rate)))
+
+    def col(a):
+        return np.broadcast_to(np.asarray(a, dtype=float), S).reshape(-1, 1)
+
+    glow, stages, reusable = col(glow_tonnes), col(stages), col(reusable) > 0
+    lr, loss, rate = col(learning_rate), col(loss_rate), col(discount_rate)
+    year = np.arange(int(years), dtype=float)
+
+    ramp = np.clip(year / np.maximum(col(ramp_years), 1), 0, 1)
+    flights = col(cadence_start) + (col(cadence_target) - col(cadence_start)) * ramp
+    flights = np.maximum(flights, 0)
+    cum_flights = np.cumsum(flights, axis=1)
+
+    life = np.where(reusable, np.maximum(np.round(col(max_reuses)), 1), 1)
+    units = np.ceil(cum_flights / life + np.where(reusable, loss, 0) * cum_flights - 1e-9)
+    first_unit = glow ** 0.65 * 2e6 * stages * 0.8 * np.where(reusable, 1.3, 1.0)
+    built = _wright_cumulative(units, lr)
+    production = first_unit * np.diff(built, axis=1, prepend=0.0)
+
+    interval = np.maximum(np.round(col(overhaul_interval)), 1)
+    reflight_share = np.where(reusable, (life - 1) / life, 0)
+    overhaul_share = np.where(reusable, np.floor((life - 1) / interval) / life, 0)
+    refurb = flights * first_unit * (reflight_share * col(refurb_fraction) + overhaul_share * col(overhaul_fraction))
+    ops = flights * (2e6 + glow * 500)
+    total = production + refurb + ops
+
+    discount = (1 + rate) ** -year
+    total_flights = cum_flights[:, -1]
+    feasible = (lr > 0.5).ravel() & (lr <= 1).ravel() & (total_flights > 0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return {
+            "flights": flights,
+            "vehicles_built": np.diff(units, axis=1, prepend=0.0),
+            "production_usd": production,
+            "refurb_usd": refurb,
+            "ops_usd": ops,
+            "total_usd": total,
+            "cost_per_flight_usd": total / flights,
+            "total_flights": total_flights,
+            "fleet_units": units[:, -1],
+            "lifecycle_cost_usd": total.sum(axis=1),
+            "npv_usd": (total * discount).sum(axis=1),
+            "avg_cost_per_flight_usd": np.where(feasible, total.sum(axis=1) / total_flights, np.nan),
+            "feasible": feasible,
+        }
+
+
+def fleet_cost(glow_tonnes, stages, reusable=None, vehicle=None, years=10, learning_rate=FLEET_LEARNING_RATE,
+               cadence_start=5, cadence_target=None, ramp_years=3, max_reuses=None,
+               refurb_fraction=FLEET_REFURB_FRACTION, overhaul_interval=FLEET_OVERHAUL_INTERVAL,
+               overhaul_fraction=FLEET_OVERHAUL_FRACTION, loss_rate=0.0, discount_rate=0.08,
+               scenarios=1, spread=FLEET_SPREAD, seed=0):
+    """Multi-year fleet cost: nominal yearly table plus P10/P50/P90 over sampled scenarios.
+
+    ``vehicle`` takes reusability, ``max_reuses`` and the current flight rate
+    (as the cadence target) from vehicles.json for any of them left as None. With
+    ``scenarios`` > 1, learning rate, cadence target, flight life and refurb
+    fractions are drawn uniformly within +/- ``spread`` of nominal.
+    """
+    from batch_io import np
+    if glow_tonnes <= 0 or stages < 1 or years < 1:
+        return {"error": "glow_tonnes must be > 0, stages >= 1 and years >= 1"}
+    if not 0.5 < learning_rate <= 1:
+        return {"error": f"learning_rate must be in (0.5, 1] (got {learning_rate})"}
+    if vehicle:
+        v = CATALOG.vehicle(vehicle)
+        if v is None:
+            return {"error": f"Unknown vehicle. Available: {list(CATALOG.vehicles().keys())}"}
+        if reusable is None:
+            reusable = v.get("reusable", False)
+        if max_reuses is None:
+            max_reuses = v.get("max_reuses")
+        if cadence_target is None:
+            cadence_target = v.get("flights_2025", v.get("flights_per_year"))
+    if reusable is None:
+        reusable = False
+    if max_reuses is None:
+        max_reuses = FLEET_MAX_REUSES
+    if cadence_target is None:
+        cadence_target = 10
+    nominal = dict(learning_rate=learning_rate, cadence_target=cadence_target, max_reuses=max_reuses,
+                   refurb_fraction=refurb_fraction, overhaul_fraction=overhaul_fraction)
+    sampled = {k: np.array([float(x)]) for k, x in nominal.items()}
+    if scenarios > 1:
+        rng = np.random.default_rng(seed)
+        for k, x in nominal.items():
+            draws = x * rng.uniform(1 - spread, 1 + spread, scenarios - 1)
+            sampled[k] = np.concatenate([sampled[k], draws])  # row 0 stays nominal
+        sampled["learning_rate"] = np.clip(sampled["learning_rate"], 0.51, 1.0)
+        sampled["max_reuses"] = np.maximum(np.round(sampled["max_reuses"]), 1)
+
+    r = fleet_cost_batch(glow_tonnes, stages, reusable, years, cadence_start=cadence_start, ramp_years=ramp_years,
+                         overhaul_interval=overhaul_interval, loss_rate=loss_rate, discount_rate=discount_rate,
+                         **sampled)
+
+    def m(usd):
+        usd = float(usd)
+        return round(usd / 1e6, 1) if math.isfinite(usd) else None
+
+    table = [{
+        "year": y + 1,
+        "flights": round(float(r["flights"][0, y]), 1),
+        "vehicles_built": int(r["vehicles_built"][0, y]),
+        "production_m": m(r["production_usd"][0, y]),
+        "refurb_m": m(r["refurb_usd"][0, y]),
+        "ops_m": m(r["ops_usd"][0, y]),
+        "total_m": m(r["total_usd"][0, y]),
+        "cost_per_flight_m": m(r["cost_per_flight_usd"][0, y]) if r["flights"][0, y] > 0 else None,
+    } for y in range(int(years))]
+    flat = vehicle_cost(glow_tonnes, stages, bool(reusable), cadence_target)
+    result = {
+        "glow_tonnes": glow_tonnes,
+        "stages": stages,
+        "reusable": bool(reusable),
+        "years": int(years),
+        "inputs": {**nominal, "cadence_start": cadence_start, "ramp_years": ramp_years,
+                   "overhaul_interval": overhaul_interval, "loss_rate": loss_rate, "discount_rate": discount_rate},
+        "yearly": table,
+        "total_flights": round(float(r["total_flights"][0]), 1),
+        "fleet_units": int(r["fleet_units"][0]),
+        "lifecycle_cost_m": m(r["lifecycle_cost_usd"][0]),
+        "npv_m": m(r["npv_usd"][0]),
+        "avg_cost_per_flight_m": m(r["avg_cost_per_flight_usd"][0]),
+        "flat_model_cost_per_flight_m": flat["cost_per_flight_m"],
+        "note": "Wright learning on the TRANSCOST-style first unit; ops cost per flight as in vehicle_cost, +/-30% accuracy",
+    }
+    if scenarios > 1:
+        ok = r["feasible"]
+
+        def pct(a, scale=m):
+            return {f"p{q}": scale(np.percentile(a[ok], q)) if ok.any() else None for q in (10, 50, 90)}
+
+        result["scenarios"] = {
+            "count": int(scenarios),
+            "spread": spread,
+            "avg_cost_per_flight_m": pct(r["avg_cost_per_flight_usd"]),
+            "npv_m": pct(r["npv_usd"]),
+            "fleet_units": pct(r["fleet_units"], float),
+        }
+    return result
+
+
+KNOWN_ORBITS = ["LEO", "GTO", "GEO", "MARS"]
+EXACT_MAX_PAYLOADS = 12       # per orbit; larger groups are packed by first-fit decreasing
+EXACT_NODE_LIMIT = 500000
+
+
+def _capacity(v, orbit):
+    """Payload capacity of a vehicle to an orbit (GTO figure for GTO/GEO, TMI figure for MARS)."""
+    orbit = orbit.upper()
+    if orbit == "LEO":
+        return v["payload_leo_kg"]
+    if orbit == "MARS":
+        return v.get("payload_mars_kg", 0)
+    return v.get("payload_gto_kg", 0)
+
+
+class OrbitIndex:
+    """Vehicles that reach one orbit, sorted by capacity, with a launch-cost rank.
+
+    The vehicles able to lift a payload are the suffix of the capacity column
+    starting at ``bisect_left(caps, payload)``. For a fixed payload, cost per kg
+    orders vehicles exactly as launch price does, so the cheapest options are a
+    heap selection of that suffix by (launch cost, catalog order).
+    """
+
+    def __init__(self, vehicles, orbit):
+        rows = sorted((_capacity(v, orbit), i, key) for i, (key, v) in enumerate(vehicles.items())
+                      if _capacity(v, orbit) > 0)
+        self.orbit = orbit.upper()
+        self.table = vehicles
+        self.caps = [cap for cap, _, _ in rows]
+        self.keys = [key for _, _, key in rows]
+        self.cost = [vehicles[key]["launch_cost_m"] for key in self.keys]
+        self.rank = [(vehicles[key]["launch_cost_m"], i) for _, i, key in rows]
+        self.by_cost = sorted(range(len(rows)), key=self.rank.__getitem__)
+
+    def __len__(self):
+        return len(self.keys)
+
+    def start(self, payload_kg):
+        """Position of the smallest vehicle that can lift ``payload_kg``."""
+        return bisect.bisect_left(self.caps, payload_kg)
+
+    def top_from(self, start, k):
+        """Positions of the ``k`` cheapest vehicles among ``caps[start:]``."""
+        if k >= len(self.keys) - start:
+            return [j for j in self.by_cost if j >= start]
+        return heapq.nsmallest(k, range(start, len(self.keys)), key=self.rank.__getitem__)
+
+    def top(self, payload_kg, k=5):
+        return self.top_from(self.start(payload_kg), k)
+
+
+def orbit_index(orbit):
+    """OrbitIndex for ``orbit``, built once per catalog version."""
+    _load_vehicles()  # refreshes the catalog version if vehicles.json changed
+    return _orbit_index(orbit.upper(), CATALOG.version)
+
+
+@functools.lru_cache(maxsize=None)
+def _orbit_index(orbit, version):
+    return OrbitIndex(_load_vehicles()[0], orbit)
 
 
 def launch_cost(payload_kg, orbit="LEO", vehicle=None):
@@ -119,12 +368,12 @@ def launch_cost(payload_kg, orbit="LEO", vehicle=None):
         return {"error": f"Payload must be > 0 kg (got {payload_kg})"}
     if orbit.upper() not in KNOWN_ORBITS:
         return {"error": f"Unknown orbit '{orbit}'. Available: {KNOWN_ORBITS}"}
+    vehicles, _ = _load_vehicles()
     if vehicle:
-        v = VEHICLES.get(vehicle.lower().replace(" ", "_").replace("-", "_"))
+        v = vehicles.get(_resolve_vehicle(vehicle))
         if not v:
-            return {"error": f"Unknown vehicle. Available: {list(VEHICLES.keys())}"}
-        key = "payload_leo_kg" if orbit.upper() == "LEO" else "payload_gto_kg"
-        max_payload = v[key]
+            return {"error": f"Unknown vehicle. Available: {list(vehicles.keys())}"}
+        max_payload = _capacity(v, orbit)
         if payload_kg > max_payload:
             return {"error": f"Payload {payload_kg}kg exceeds {v['name']} capacity of {max_payload}kg to {orbit}"}
         cost_per_kg = v["launch_cost_m"] * 1e6 / payload_kg
@@ -136,39 +385,320 @@ def launch_cost(payload_kg, orbit="LEO", vehicle=None):
             "cost_per_kg": round(cost_per_kg, 0),
             "utilization_pct": round(payload_kg / max_payload * 100, 1),
         }
+    index = orbit_index(orbit)
     results = []
-    for key, v in VEHICLES.items():
-        cap = v["payload_leo_kg"] if orbit.upper() == "LEO" else v.get("payload_gto_kg", 0)
-        if cap >= payload_kg and cap > 0:
-            cpk = v["launch_cost_m"] * 1e6 / payload_kg
-            results.append({
-                "vehicle": v["name"],
-                "launch_cost_m": v["launch_cost_m"],
-                "cost_per_kg": round(cpk, 0),
-                "utilization_pct": round(payload_kg / cap * 100, 1),
-            })
-    results.sort(key=lambda x: x["cost_per_kg"])
+    for j in index.top(payload_kg, 5):
+        v = index.table[index.keys[j]]
+        results.append({
+            "vehicle": v["name"],
+            "launch_cost_m": v["launch_cost_m"],
+            "cost_per_kg": round(v["launch_cost_m"] * 1e6 / payload_kg, 0),
+            "utilization_pct": round(payload_kg / index.caps[j] * 100, 1),
+        })
     return {
         "payload_kg": payload_kg,
         "orbit": orbit.upper(),
-        "options": results[:5],
+        "options": results,
         "cheapest": results[0]["vehicle"] if results else "No vehicle found",
     }
 
 
+def launch_batch(payload_kg, orbit="LEO", top=5):
+    """Cheapest launch options for every payload mass in one pass.
+
+    Feasibility is a vectorized bisect into the orbit's capacity index; the
+    top-``top`` options depend only on where a payload lands in that index, so
+    they are selected once per position and gathered for every row.
+    """
+    from batch_io import np
+    if orbit.upper() not in KNOWN_ORBITS:
+        return {"error": f"Unknown orbit '{orbit}'. Available: {KNOWN_ORBITS}"}
+    if top < 1:
+        return {"error": f"--top must be >= 1 (got {top})"}
+    payload = np.asarray(payload_kg, dtype=float).ravel()
+    index = orbit_index(orbit)
+    n = len(index)
+    valid = np.isfinite(payload) & (payload > 0)
+    start = np.searchsorted(np.asarray(index.caps, dtype=float), np.where(valid, payload, np.inf))
+    feasible = valid & (start < n)
+
+    picks = [index.top_from(s, top) for s in range(n + 1)]
+    cheapest_pos = np.array([p[0] if p else -1 for p in picks])[start]
+    names = np.array([index.table[k]["name"] for k in index.keys] + [""], dtype=object)
+    options = np.array(["; ".join(names[j] for j in p) for p in picks], dtype=object)
+    cost = np.append(np.asarray(index.cost, dtype=float), np.nan)[cheapest_pos]
+    cap = np.append(np.asarray(index.caps, dtype=float), np.nan)[cheapest_pos]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cost_per_kg = np.where(feasible, cost * 1e6 / payload, np.nan)
+        utilization = np.where(feasible, payload / cap * 100, np.nan)
+    return {
+        "payload_kg": payload,
+        "cheapest": names[cheapest_pos],
+        "launch_cost_m": np.where(feasible, cost, np.nan),
+        "cost_per_kg": np.round(cost_per_kg, 0),
+        "utilization_pct": np.round(utilization, 1),
+        "feasible_vehicles": np.where(valid, n - start, 0),
+        "options": options[start],
+        "feasible": feasible,
+    }
+
+
+def run_launch_batch(input_path=None, payloads=None, orbit="LEO", top=5, output_path=None, fmt=None):
+    """Quote a payload_kg column (or a list of masses) against one orbit's index."""
+    from batch_io import (np, NUMPY_MISSING, read_columns, require_columns, write_columns, summarize_columns,
+                          columns_to_lists)
+    if np is None:
+        return dict(NUMPY_MISSING)
+    if input_path:
+        try:
+            columns = read_columns(input_path, fmt)
+        except ValueError as exc:
+            return {"error": str(exc)}
+        picked, missing = require_columns(columns, ["payload_kg"], {"payload_kg": ["mass_kg", "payload"]})
+        if missing:
+            return {"error": f"Missing columns {missing}. Expected: ['payload_kg']"}
+        payloads = picked[0]
+    elif not payloads:
+        return {"error": "Give --input or --payload-kg"}
+    result = launch_batch(payloads, orbit, top)
+    if "error" in result:
+        return result
+    summary = summarize_columns({k: v for k, v in result.items() if k not in ("cheapest", "options")})
+    summary["orbit"] = orbit.upper()
+    if output_path:
+        write_columns(output_path, result, fmt)
+        summary["output"] = output_path
+    else:
+        summary["results"] = columns_to_lists(result)
+    return summary
+
+
 def compare_vehicles(vehicle_names):
+    vehicles, _ = _load_vehicles()
     rows = []
     for name in vehicle_names:
-        key = name.lower().replace(" ", "_").replace("-", "_")
-        v = VEHICLES.get(key)
+        v = vehicles.get(_resolve_vehicle(name))
         if v:
             rows.append(v)
         else:
             rows.append({"name": name, "error": "Not found"})
-    return {"comparison": rows, "available_vehicles": list(VEHICLES.keys())}
+    return {"comparison": rows, "available_vehicles": list(vehicles.keys())}
 
 
-if __name__ == "__main__":
+def _read_manifest(path):
+    """Payload list from JSON (list), NDJSON or CSV: name, mass_kg, diameter_m, height_m, orbit."""
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        if path.endswith(".json"):
+            records = json.load(f)
+        elif path.endswith((".ndjson", ".jsonl")):
+            records = [json.loads(line) for line in f if line.strip()]
+        else:
+            records = [{k.strip(): v for k, v in row.items()} for row in csv.DictReader(f)]
+    payloads = []
+    for i, rec in enumerate(records):
+        name = str(rec.get("name") or f"payload_{i + 1}")
+        payload = {"name": name}
+        for key in ("mass_kg", "diameter_m", "height_m"):
+            value = rec.get(key)
+            try:
+                payload[key] = float(value) if value not in (None, "") else None
+            except (TypeError, ValueError):
+                return {"error": f"Payload {name} (row {i + 1}): {key} is not numeric ({value!r})"}
+        payload["orbit"] = str(rec.get("orbit") or "LEO").upper()
+        payloads.append(payload)
+    return payloads
+
+
+class _Packer:
+    """Packs one orbit's payloads into launches; a launch flies the cheapest vehicle that carries it.
+
+    Vehicles compatible with a payload (capacity and fairing fit) are a bitmask,
+    so a launch's vehicle options are the AND of its payloads' masks.
+    """
+
+    def __init__(self, payloads, vehicles, orbit):
+        self.table, _ = _load_vehicles()
+        self.types = sorted(vehicles, key=lambda k: self.table[k]["launch_cost_m"])
+        self.cost = [self.table[k]["launch_cost_m"] for k in self.types]
+        self.cap = [_capacity(self.table[k], orbit) for k in self.types]
+        self.min_cost_per_kg = min(c / cap for c, cap in zip(self.cost, self.cap))
+        self.all_mask = (1 << len(self.types)) - 1
+        self.items = sorted(payloads, key=lambda p: -p["mass_kg"])
+        self.masks = [self._mask(p) for p in self.items]
+        self.nodes = 0
+
+    def _mask(self, p):
+        from geometry import fairing_index  # only manifest packing needs geometry (and numpy)
+        mask = 0
+        for t, key in enumerate(self.types):
+            if p["mass_kg"] > self.cap[t]:
+                continue
+            if p["diameter_m"] is not None and p["height_m"] is not None:
+                index = fairing_index(key)
+                if not index.fairings or not index.fit(p["diameter_m"], p["height_m"])[0]:
+                    continue  # no fairing data for this vehicle: only bare-mass payloads
+            mask |= 1 << t
+        return mask
+
+    def cheapest(self, mask, mass):
+        """(type index, cost) of the cheapest vehicle in ``mask`` carrying ``mass``, else (None, inf)."""
+        for t in range(len(self.types)):
+            if mask >> t & 1 and self.cap[t] >= mass:
+                return t, self.cost[t]
+        return None, math.inf
+
+    def _max_cap(self, mask):
+        return max((self.cap[t] for t in range(len(self.types)) if mask >> t & 1), default=0.0)
+
+    def first_fit_decreasing(self, limit):
+        """FFD with launches capped at ``limit`` kg (a payload heavier than the cap flies alone)."""
+        bins = []  # [mask, mass, item indices]
+        for i, (p, mask) in enumerate(zip(self.items, self.masks)):
+            for b in bins:
+                m, mass = b[0] & mask, b[1] + p["mass_kg"]
+                if mass <= limit and self.cheapest(m, mass)[0] is not None:
+                    b[0], b[1] = m, mass
+                    b[2].append(i)
+                    break
+            else:
+                bins.append([mask, p["mass_kg"], [i]])
+        return sum(self.cheapest(b[0], b[1])[1] for b in bins), [b[2] for b in bins]
+
+    def heuristic(self):
+        best = (math.inf, None)
+        for limit in sorted(set(self.cap)) + [math.inf]:
+            best = min(best, self.first_fit_decreasing(limit), key=lambda r: r[0])
+        return best
+
+    def exact(self, incumbent):
+        """Branch and bound over set partitions, heaviest payload first.
+
+        Each payload joins an open launch or opens a new one; the bound is the
+        open launches' cost plus remaining mass beyond their slack at the best
+        cost per kg. Returns (cost, groups, proven_optimal).
+        """
+        best_cost, best_groups = incumbent
+        n = len(self.items)
+        suffix_mass = [0.0] * (n + 1)
+        for i in range(n - 1, -1, -1):
+            suffix_mass[i] = suffix_mass[i + 1] + self.items[i]["mass_kg"]
+        bins = []  # [mask, mass, cost, items]
+
+        def descend(i, cost):
+            nonlocal best_cost, best_groups
+            self.nodes += 1
+            if self.nodes > EXACT_NODE_LIMIT:
+                return
+            if i == n:
+                if cost < best_cost:
+                    best_cost, best_groups = cost, [list(b[3]) for b in bins]
+                return
+            slack = sum(self._max_cap(b[0]) - b[1] for b in bins)
+            if cost + max(0.0, suffix_mass[i] - slack) * self.min_cost_per_kg >= best_cost - 1e-9:
+                return
+            p, mask = self.items[i], self.masks[i]
+            for b in bins:
+                m, mass = b[0] & mask, b[1] + p["mass_kg"]
+                _, c = self.cheapest(m, mass)
+                if c == math.inf:
+                    continue
+                saved = b[:3]
+                delta = c - b[2]
+                b[0], b[1], b[2] = m, mass, c
+                b[3].append(i)
+                descend(i + 1, cost + delta)
+                b[3].pop()
+                b[0], b[1], b[2] = saved
+            _, c = self.cheapest(mask, p["mass_kg"])
+            bins.append([mask, p["mass_kg"], c, [i]])
+            descend(i + 1, cost + c)
+            bins.pop()
+
+        descend(0, 0.0)
+        return best_cost, best_groups, self.nodes <= EXACT_NODE_LIMIT
+
+    def launches(self, groups, orbit):
+        rows = []
+        for g in groups:
+            mask, mass = self.all_mask, 0.0
+            for i in g:
+                mask &= self.masks[i]
+                mass += self.items[i]["mass_kg"]
+            t, cost = self.cheapest(mask, mass)
+            key = self.types[t]
+            rows.append({
+                "vehicle": key,
+                "vehicle_name": self.table[key]["name"],
+                "orbit": orbit,
+                "payloads": [self.items[i]["name"] for i in g],
+                "mass_kg": round(mass, 1),
+                "capacity_kg": self.cap[t],
+                "utilization_pct": round(mass / self.cap[t] * 100, 1),
+                "launch_cost_m": cost,
+            })
+        rows.sort(key=lambda r: (-r["launch_cost_m"], -r["mass_kg"]))
+        return rows
+
+
+def manifest_pack(payloads, vehicles=None, exact_max=EXACT_MAX_PAYLOADS):
+    """Pack payloads into launches per target orbit, minimizing total launch cost.
+
+    Each payload must fit the vehicle's fairing on its own (dispensers and
+    stacking are not modelled) and each launch's total mass must be within the
+    vehicle's capacity to that orbit. Orbits with up to ``exact_max`` payloads
+    are solved exactly by branch and bound; larger ones by first-fit
+    decreasing at every vehicle capacity as the load cap, keeping the cheapest.
+    """
+    table, _ = _load_vehicles()
+    keys = [_resolve_vehicle(k) for k in vehicles] if vehicles else list(table)
+    unknown = [k for k in keys if k not in table]
+    if unknown:
+        return {"error": f"Unknown vehicles {unknown}. Available: {list(table.keys())}"}
+    bad = [p["name"] for p in payloads if not p.get("mass_kg") or p["mass_kg"] <= 0]
+    if bad:
+        return {"error": f"Payload mass must be > 0 kg: {bad[:10]}"}
+    orbits = {}
+    for p in payloads:
+        if p["orbit"] not in KNOWN_ORBITS:
+            return {"error": f"Unknown orbit '{p['orbit']}' for {p['name']}. Available: {KNOWN_ORBITS}"}
+        orbits.setdefault(p["orbit"], []).append(p)
+
+    launches, unassigned, methods = [], [], {}
+    for orbit, group in orbits.items():
+        usable = [k for k in keys if table[k]["launch_cost_m"] > 0 and _capacity(table[k], orbit) > 0]
+        if not usable:
+            unassigned += [p["name"] for p in group]
+            continue
+        packer = _Packer(group, usable, orbit)
+        fits = [p for p, m in zip(packer.items, packer.masks) if m]
+        unassigned += [p["name"] for p, m in zip(packer.items, packer.masks) if not m]
+        if not fits:
+            continue
+        packer = _Packer(fits, usable, orbit)
+        cost, groups = packer.heuristic()
+        if len(fits) <= exact_max:
+            cost, groups, optimal = packer.exact((cost, groups))
+            methods[orbit] = {"method": "branch-and-bound", "optimal": optimal, "nodes": packer.nodes}
+        else:
+            methods[orbit] = {"method": "first-fit decreasing", "optimal": False}
+        launches += packer.launches(groups, orbit)
+
+    total = sum(l["launch_cost_m"] for l in launches)
+    mass = sum(l["mass_kg"] for l in launches)
+    return {
+        "payloads": len(payloads),
+        "launches": len(launches),
+        "total_cost_m": round(total, 1),
+        "cost_per_kg": round(total * 1e6 / mass, 0) if mass else None,
+        "orbits": methods,
+        "unassigned": unassigned,
+        "manifest": launches,
+        "note": "Each envelope must fit the fairing alone; vehicles without fairing data only take "
+                "payloads given without dimensions",
+    }
+
+
+def main(argv=None):
     parser = argparse.ArgumentParser(description="Rocket Cost Estimator")
     sub = parser.add_subparsers(dest="command")
 
@@ -191,8 +721,70 @@ if __name__ == "__main__":
     p_c = sub.add_parser("compare")
     p_c.add_argument("--vehicles", nargs="+", required=True)
 
-    args = parser.parse_args()
-    if args.command == "engine":
+    p_m = sub.add_parser("manifest", help="Pack rideshare payloads into launches at minimum cost")
+    p_m.add_argument("--input", required=True,
+                     help="JSON/NDJSON/CSV with name, mass_kg, diameter_m, height_m, orbit")
+    p_m.add_argument("--vehicles", nargs="+", default=None, help="Restrict to these vehicles")
+    p_m.add_argument("--exact-max", type=int, default=EXACT_MAX_PAYLOADS,
+                     help="Largest per-orbit group solved exactly by branch and bound")
+
+    p_lb = sub.add_parser("launch-batch", help="Quote many payload masses against one orbit at once")
+    p_lb.add_argument("--input", default=None, help="CSV/NDJSON with a payload_kg (or mass_kg) column")
+    p_lb.add_argument("--payload-kg", type=float, nargs="+", default=None)
+    p_lb.add_argument("--orbit", default="LEO")
+    p_lb.add_argument("--top", type=int, default=5, help="Cheapest options listed per payload")
+    p_lb.add_argument("--output", default=None, help="Write per-payload rows here instead of stdout")
+    p_lb.add_argument("--format", choices=["csv", "ndjson"], default=None)
+
+    p_f = sub.add_parser("fleet", help="Multi-year fleet cost with learning curve, reuse and cadence ramp")
+    p_f.add_argument("--glow-tonnes", type=float, required=True)
+    p_f.add_argument("--stages", type=int, required=True)
+    reuse = p_f.add_mutually_exclusive_group()
+    reuse.add_argument("--reusable", action="store_true", default=None)
+    reuse.add_argument("--expendable", dest="reusable", action="store_false",
+                       help="Cost a reusable catalog vehicle as expendable")
+    p_f.add_argument("--vehicle", default=None, help="Take reusability, max_reuses and flight rate from vehicles.json")
+    p_f.add_argument("--years", type=int, default=10)
+    p_f.add_argument("--learning-rate", type=float, default=FLEET_LEARNING_RATE)
+    p_f.add_argument("--cadence-start", type=float, default=5, help="Flights in year 1 of the ramp")
+    p_f.add_argument("--cadence-target", type=float, default=None, help="Flights per year after the ramp")
+    p_f.add_argument("--ramp-years", type=float, default=3)
+    p_f.add_argument("--max-reuses", type=int, default=None, help="Flight life of a reusable vehicle")
+    p_f.add_argument("--refurb-fraction", type=float, default=FLEET_REFURB_FRACTION)
+    p_f.add_argument("--overhaul-interval", type=int, default=FLEET_OVERHAUL_INTERVAL)
+    p_f.add_argument("--overhaul-fraction", type=float, default=FLEET_OVERHAUL_FRACTION)
+    p_f.add_argument("--loss-rate", type=float, default=0.0, help="Expected vehicle losses per flight")
+    p_f.add_argument("--discount-rate", type=float, default=0.08)
+    p_f.add_argument("--scenarios", type=int, default=1, help="Sampled scenarios for P10/P50/P90")
+    p_f.add_argument("--spread", type=float, default=FLEET_SPREAD)
+    p_f.add_argument("--seed", type=int, default=0)
+
+    args = parser.parse_args(argv)
+    if args.command in ("launch-batch", "fleet"):
+        from batch_io import np, NUMPY_MISSING  # numpy only for the vectorized commands
+        if np is None:
+            print(json.dumps(NUMPY_MISSING, indent=2))
+            sys.exit(1)
+    if args.command == "launch-batch":
+        result = run_launch_batch(args.input, args.payload_kg, args.orbit, args.top, args.output, args.format)
+        if "error" in result:
+            print(json.dumps(result, indent=2, ensure_ascii=False))
+            sys.exit(1)
+    elif args.command == "fleet":
+        result = fleet_cost(args.glow_tonnes, args.stages, args.reusable, args.vehicle, args.years,
+                            args.learning_rate, args.cadence_start, args.cadence_target, args.ramp_years,
+                            args.max_reuses, args.refurb_fraction, args.overhaul_interval, args.overhaul_fraction,
+                            args.loss_rate, args.discount_rate, args.scenarios, args.spread, args.seed)
+        if "error" in result:
+            print(json.dumps(result, indent=2, ensure_ascii=False))
+            sys.exit(1)
+    elif args.command == "manifest":
+        payloads = _read_manifest(args.input)
+        result = payloads if isinstance(payloads, dict) else manifest_pack(payloads, args.vehicles, args.exact_max)
+        if "error" in result:
+            print(json.dumps(result, indent=2, ensure_ascii=False))
+            sys.exit(1)
+    elif args.command == "engine":
         result = engine_cost(args.thrust_kn, args.cycle, args.heritage)
     elif args.command == "vehicle":
         result = vehicle_cost(args.glow_tonnes, args.stages, args.reusable, args.flights_per_year)
@@ -207,3 +799,7 @@ if __name__ == "__main__":
         parser.print_help()
         sys.exit(0)
     print(json.dumps(result, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,291 @@
+"""Planetary Ephemeris & Launch Windows — Shared tool for space-engineering pack.
+
+Analytic heliocentric ephemeris from JPL mean orbital elements (Standish,
+"Keplerian Elements for Approximate Positions of the Major Planets", valid
+1800–2050 AD, J2000 ecliptic). Daily positions are precomputed once into a
+memory-mappable .npy table so repeated window searches just slice it.
+
+Usage:
+    python ephemeris.py position Mars --date 2026-11-01
+    python ephemeris.py launch-windows Earth Mars --start 2026-01-01 --end 2046-01-01
+    python ephemeris.py launch-windows Earth Jupiter --start 2026-01-01 --end 2040-01-01 --refine
+    python ephemeris.py build-table
+"""
+import argparse
+import json
+import math
+import os
+import sys
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(__file__))
+from batch_io import np, NUMPY_MISSING
+from trajectory import PLANETS, MOONS, MU_SUN, AU_KM, hohmann_transfer
+
+J2000_JD = 2451545.0
+J2000 = datetime(2000, 1, 1, 12, 0, 0)
+
+# Mean elements at J2000 and rates per Julian century:
+# a (AU), e, I (deg), L mean longitude (deg), long. perihelion (deg), long. asc. node (deg)
+ELEMENTS = {
+    "Mercury": ((0.38709927, 0.20563593, 7.00497902, 252.25032350, 77.45779628, 48.33076593),
+                (0.00000037, 0.00001906, -0.00594749, 149472.67411175, 0.16047689, -0.12534081)),
+    "Venus":   ((0.72333566, 0.00677672, 3.39467605, 181.97909950, 131.60246718, 76.67984255),
+                (0.00000390, -0.00004107, -0.00078890, 58517.81538729, 0.00268329, -0.27769418)),
+    "Earth":   ((1.00000261, 0.01671123, -0.00001531, 100.46457166, 102.93768193, 0.0),
+                (0.00000562, -0.00004392, -0.01294668, 35999.37244981, 0.32327364, 0.0)),
+    "Mars":    ((1.52371034, 0.09339410, 1.84969142, -4.55343205, -23.94362959, 49.55953891),
+                (0.00001847, 0.00007882, -0.00813131, 19140.30268499, 0.44441088, -0.29257343)),
+    "Jupiter": ((5.20288700, 0.04838624, 1.30439695, 34.39644051, 14.72847983, 100.47390909),
+                (-0.00011607, -0.00013253, -0.00183714, 3034.74612775, 0.21252668, 0.20469106)),
+    "Saturn":  ((9.53667594, 0.05386179, 2.48599187, 49.95424423, 92.59887831, 113.66242448),
+                (-0.00125060, -0.00050991, 0.00193609, 1222.49362201, -0.41897216, -0.28867794)),
+    "Uranus":  ((19.18916464, 0.04725744, 0.77263783, 313.23810451, 170.95427630, 74.01692503),
+                (-0.00196176, -0.00004397, -0.00242939, 428.48202785, 0.40805281, 0.04240589)),
+    "Neptune": ((30.06992276, 0.00859048, 1.77004347, -55.12002969, 44.96476227, 131.78422574),
+                (0.00026291, 0.00005105, 0.00035372, 218.45945325, -0.32241464, -0.00508664)),
+}
+BODIES = list(ELEMENTS.keys())
+
+# Cached daily position table: 1950-01-01 .. 2100-01-01, shape (days, bodies, 3) in km
+TABLE_START = "1950-01-01"
+TABLE_END = "2100-01-01"
+CACHE_DIR = os.environ.get("SPACE_EPHEMERIS_CACHE",
+                           os.path.join(os.path.dirname(__file__), "..", "data", "cache"))
+
+_TABLE = None  # (start_jd, array) once loaded in this process
+
+
+def date_to_jd(date_str):
+    """'YYYY-MM-DD' → Julian date (noon-based, matches J2000_JD)."""
+    d = datetime.strptime(date_str, "%Y-%m-%d")
+    return J2000_JD + (d - J2000).total_seconds() / 86400
+
+
+def jd_to_date(jd):
+    return (J2000 + timedelta(days=float(jd) - J2000_JD)).strftime("%Y-%m-%d")
+
+
+def resolve_body(name):
+    """Normalize a planet/moon name to an ephemeris body (moons → parent), or None."""
+    name = name.title()
+    if name in MOONS:
+        name = MOONS[name]["parent"]
+    return name if name in ELEMENTS else None
+
+
+def _solve_kepler(M, e, iterations=8):
+    E = M + e * np.sin(M)
+    for _ in range(iterations):
+        E = E - (E - e * np.sin(E) - M) / (1 - e * np.cos(E))
+    return E
+
+
+def body_state(body, jd):
+    """Heliocentric ecliptic position (km) and velocity (km/s) from mean elements.
+
+    ``jd`` may be any array shape; returns arrays of shape ``jd.shape + (3,)``.
+    """
+    jd = np.asarray(jd, dtype=float)
+    base, rate = ELEMENTS[body]
+    T = (jd - J2000_JD) / 36525
+    a, e, inc, L, varpi, node = (b + r * T for b, r in zip(base, rate))
+    a = a * AU_KM
+    inc, L, varpi, node = (np.radians(x) for x in (inc, L, varpi, node))
+    argp = varpi - node
+    M = np.remainder(L - varpi + np.pi, 2 * np.pi) - np.pi
+    E = _solve_kepler(M, e)
+    root = np.sqrt(1 - e ** 2)
+    xp = a * (np.cos(E) - e)
+    yp = a * root * np.sin(E)
+    edot = np.sqrt(MU_SUN / a ** 3) / (1 - e * np.cos(E))
+    vxp = -a * np.sin(E) * edot
+    vyp = a * root * np.cos(E) * edot
+
+    cw, sw = np.cos(argp), np.sin(argp)
+    cO, sO = np.cos(node), np.sin(node)
+    ci, si = np.cos(inc), np.sin(inc)
+    # Perifocal → ecliptic rotation rows
+    r11, r12 = cw * cO - sw * sO * ci, -sw * cO - cw * sO * ci
+    r21, r22 = cw * sO + sw * cO * ci, -sw * sO + cw * cO * ci
+    r31, r32 = sw * si, cw * si
+    r_vec = np.stack([r11 * xp + r12 * yp, r21 * xp + r22 * yp, r31 * xp + r32 * yp], axis=-1)
+    v_vec = np.stack([r11 * vxp + r12 * vyp, r21 * vxp + r22 * vyp, r31 * vxp + r32 * vyp], axis=-1)
+    return r_vec, v_vec
+
+
+def _table_path():
+    return os.path.join(CACHE_DIR, f"ephemeris_{TABLE_START}_{TABLE_END}.npy")
+
+
+def build_table(path=None):
+    """Propagate every body once per day over the table span and save it as .npy."""
+    path = path or _table_path()
+    start_jd, end_jd = date_to_jd(TABLE_START), date_to_jd(TABLE_END)
+    jd = start_jd + np.arange(int(end_jd - start_jd) + 1, dtype=float)
+    table = np.empty((len(jd), len(BODIES), 3))
+    for k, body in enumerate(BODIES):
+        table[:, k, :], _ = body_state(body, jd)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + ".tmp.npy"
+    np.save(tmp, table)
+    os.replace(tmp, path)
+    return path
+
+
+def position_table():
+    """(start_jd, table) with the daily table memory-mapped; built on first use."""
+    global _TABLE
+    if _TABLE is None:
+        path = _table_path()
+        if not os.path.exists(path):
+            build_table(path)
+        _TABLE = (date_to_jd(TABLE_START), np.load(path, mmap_mode="r"))
+    return _TABLE
+
+
+def daily_positions(body, jd0, n_days):
+    """Positions (n_days, 3) on consecutive days from jd0, from the cached table when in range."""
+    start_jd, table = position_table()
+    i0 = int(round(jd0 - start_jd))
+    if 0 <= i0 and i0 + n_days <= table.shape[0] and abs(start_jd + i0 - jd0) < 1e-9:
+        return np.asarray(table[i0:i0 + n_days, BODIES.index(body), :])
+    r, _ = body_state(body, jd0 + np.arange(n_days, dtype=float))
+    return r
+
+
+def position(body, date_str):
+    b = resolve_body(body)
+    if not b:
+        return {"error": f"Unknown body. Available: {BODIES + list(MOONS.keys())}"}
+    try:
+        jd = date_to_jd(date_str)
+    except ValueError:
+        return {"error": f"Invalid date format. Use YYYY-MM-DD (got '{date_str}')"}
+    r, v = body_state(b, jd)
+    return {
+        "body": b,
+        "date": date_str,
+        "position_km": [round(float(x), 0) for x in r],
+        "velocity_kms": [round(float(x), 4) for x in v],
+        "distance_au": round(float(np.linalg.norm(r)) / AU_KM, 5),
+        "ecliptic_longitude_deg": round(math.degrees(math.atan2(r[1], r[0])) % 360, 3),
+    }
+
+
+def launch_windows(body_from, body_to, start_date, end_date, refine=False):
+    """Find Hohmann-phasing launch opportunities between start and end dates.
+
+    A window opens when the target leads (or trails) the departure body by the
+    Hohmann phase angle π − n_target·t_transfer. Phase angles come from the
+    cached daily table; crossings are linearly interpolated between days. With
+    ``refine`` each window is polished by a ±45-day Lambert porkchop search.
+    """
+    if np is None:
+        return dict(NUMPY_MISSING)
+    b1, b2 = resolve_body(body_from), resolve_body(body_to)
+    if not b1 or not b2:
+        return {"error": f"Unknown body. Available: {BODIES + list(MOONS.keys())}"}
+    if b1 == b2:
+        return {"error": "Same planet — no transfer needed"}
+    try:
+        jd0, jd1 = date_to_jd(start_date), date_to_jd(end_date)
+    except ValueError:
+        return {"error": "Invalid date format. Use YYYY-MM-DD"}
+    if jd1 <= jd0:
+        return {"error": "End date must be after start date"}
+
+    transfer = hohmann_transfer(b1, b2)
+    tof_days = transfer["transfer_time_days"]
+    n1 = 360 / (2 * math.pi * math.sqrt((PLANETS[b1]["a_au"] * AU_KM) ** 3 / MU_SUN) / 86400)
+    n2 = 360 / (2 * math.pi * math.sqrt((PLANETS[b2]["a_au"] * AU_KM) ** 3 / MU_SUN) / 86400)
+    required = math.radians(180 - n2 * tof_days)
+    synodic_days = 360 / abs(n1 - n2)
+
+    n_days = int(jd1 - jd0) + 1
+    r1 = daily_positions(b1, jd0, n_days)
+    r2 = daily_positions(b2, jd0, n_days)
+    phase = np.arctan2(r2[:, 1], r2[:, 0]) - np.arctan2(r1[:, 1], r1[:, 0])
+    diff = np.remainder(phase - required + np.pi, 2 * np.pi) - np.pi
+    crossing = (np.sign(diff[:-1]) != np.sign(diff[1:])) & (np.abs(diff[1:] - diff[:-1]) < np.pi)
+    idx = np.nonzero(crossing)[0]
+    frac = diff[idx] / (diff[idx] - diff[idx + 1])
+
+    windows = []
+    for i, f in zip(idx, frac):
+        dep_jd = jd0 + i + float(f)
+        window = {
+            "departure_date": jd_to_date(dep_jd),
+            "arrival_date": jd_to_date(dep_jd + tof_days),
+            "tof_days": tof_days,
+            "phase_angle_deg": round(math.degrees(required) % 360, 2),
+        }
+        if refine:
+            from lambert import porkchop_grid
+            dep = dep_jd + np.linspace(-45, 45, 91)
+            tofs = tof_days * np.linspace(0.7, 1.3, 61)
+            c3, vinf = porkchop_grid(b1, b2, dep, tofs)
+            total = np.sqrt(c3) + vinf
+            if np.isfinite(total).any():
+                a, b = np.unravel_index(np.nanargmin(total), total.shape)
+                window["refined"] = {
+                    "departure_date": jd_to_date(dep[a]),
+                    "arrival_date": jd_to_date(dep[a] + tofs[b]),
+                    "tof_days": round(float(tofs[b]), 1),
+                    "c3_km2s2": round(float(c3[a, b]), 3),
+                    "v_inf_arrival_kms": round(float(vinf[a, b]), 3),
+                    "delta_v_total_kms": round(float(total[a, b]), 3),
+                }
+        windows.append(window)
+
+    return {
+        "from": b1,
+        "to": body_to.title(),
+        "start_date": start_date,
+        "end_date": end_date,
+        "synodic_period_days": round(synodic_days, 1),
+        "hohmann_delta_v_total_kms": transfer["delta_v_total_kms"],
+        "window_count": len(windows),
+        "windows": windows,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Planetary Ephemeris & Launch Windows")
+    sub = parser.add_subparsers(dest="command")
+
+    p_p = sub.add_parser("position", help="Heliocentric state of a planet on a date")
+    p_p.add_argument("body")
+    p_p.add_argument("--date", required=True, help="YYYY-MM-DD")
+
+    p_w = sub.add_parser("launch-windows", help="Synodic launch opportunities over a date range")
+    p_w.add_argument("planet_from")
+    p_w.add_argument("planet_to")
+    p_w.add_argument("--start", required=True, help="YYYY-MM-DD")
+    p_w.add_argument("--end", required=True, help="YYYY-MM-DD")
+    p_w.add_argument("--refine", action="store_true", help="Polish each window with a Lambert grid")
+
+    sub.add_parser("build-table", help="(Re)build the cached daily position table")
+
+    args = parser.parse_args(argv)
+    if np is None and args.command:
+        print(json.dumps(NUMPY_MISSING))
+        sys.exit(1)
+    if args.command == "position":
+        result = position(args.body, args.date)
+    elif args.command == "launch-windows":
+        result = launch_windows(args.planet_from, args.planet_to, args.start, args.end, args.refine)
+    elif args.command == "build-table":
+        path = build_table()
+        result = {"status": "ok", "output": path, "size_bytes": os.path.getsize(path)}
+    else:
+        parser.print_help()
+        sys.exit(0)
+    if "error" in result:
+        print(json.dumps(result, indent=2, ensure_ascii=False))
+        sys.exit(1)
+    print(json.dumps(result, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
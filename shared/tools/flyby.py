@@ -0,0 +1,299 @@
+"""Gravity-Assist Sequence Search — Shared tool for space-engineering pack.
+
+Searches multi-flyby planetary sequences (e.g. Earth-Venus-Earth-Jupiter) as a
+tree: each node is (body, encounter date, arrival v-infinity), each edge a
+Lambert leg to the next body on a common date grid. Depth-first
+branch-and-bound keeps the k best distinct sequences and prunes any branch
+whose accumulated Δv already meets the current k-th best total. Per-leg
+Lambert solutions are cached by (from, to, departure date) and shared by
+every branch that reaches the same encounter.
+
+Δv model (patched conics, heliocentric v-infinity):
+  launch     |v∞ departure|           (C3 = v∞²)
+  flyby      | |v∞ out| − |v∞ in| |   powered flyby; infeasible if the turn
+                                      angle needs a periapsis below 1.05 R
+  arrival    |v∞ arrival|             (--arrival vinf) or 0 (--arrival flyby)
+
+Usage:
+    python flyby.py search Earth Jupiter --depart-start 2026-01-01 --depart-end 2028-12-31
+    python flyby.py search Earth Jupiter --depart-start 2026-01-01 --depart-end 2028-12-31 \\
+        --max-flybys 3 --via Venus,Earth,Mars --workers 4 --top 5
+"""
+import argparse
+import functools
+import json
+import math
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(__file__))
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from batch_io import np, NUMPY_MISSING
+from constants import RADIUS
+from trajectory import PLANETS, MU_SUN, AU_KM, hohmann_transfer
+from ephemeris import body_state, date_to_jd, jd_to_date
+from lambert import lambert
+
+MIN_FLYBY_RADII = 1.05   # periapsis floor in planetary radii
+TOF_RANGE = (0.4, 1.5)   # leg time of flight as a fraction of the Hohmann time
+ABBREV = {"Mercury": "Me", "Venus": "V", "Earth": "E", "Mars": "Ma",
+          "Jupiter": "J", "Saturn": "S", "Uranus": "U", "Neptune": "N"}
+
+# Worker-process state (set by _init_worker)
+_WORKER = {}
+
+
+def _hohmann_days(a, b):
+    r = (PLANETS[a]["a_au"] + PLANETS[b]["a_au"]) / 2 * AU_KM
+    return math.pi * math.sqrt(r ** 3 / MU_SUN) / 86400
+
+
+class _Search:
+    """Branch-and-bound state for one process: date grid, leg cache, incumbents."""
+
+    def __init__(self, origin, target, via, jd0, n_grid, step_days, n_tof, max_flybys,
+                 arrival, max_c3, top, shared_bound=None):
+        self.origin, self.target, self.max_flybys = origin, target, max_flybys
+        self.bodies = [b for b in dict.fromkeys(list(via) + [target]) if b in PLANETS]
+        self.step_days = step_days
+        self.arrival = arrival
+        self.max_vinf_launch = math.sqrt(max_c3) if max_c3 else math.inf
+        self.top = top
+        self.shared = shared_bound
+        self.jd = jd0 + step_days * np.arange(n_grid)
+        self.states = {b: body_state(b, self.jd) for b in set(self.bodies) | {origin}}
+        self.offsets = {}
+        for a in set(self.bodies) | {origin}:
+            for b in self.bodies:
+                if a != b:
+                    t = _hohmann_days(a, b)
+                    days = np.linspace(TOF_RANGE[0] * t, TOF_RANGE[1] * t, n_tof)
+                    self.offsets[a, b] = np.unique(np.maximum(np.round(days / step_days), 1).astype(int))
+        self.leg = functools.lru_cache(maxsize=None)(self._leg)
+        self.best = {}  # sequence → (total, encounters)
+        self.nodes = 0
+        self.pruned = 0
+
+    def _leg(self, a, b, i):
+        """Lambert leg a(i) → b(i + offset) for every TOF offset: (j, v∞ out at a, v∞ in at b)."""
+        j = i + self.offsets[a, b]
+        j = j[j < len(self.jd)]
+        if not j.size:
+            return j, np.empty((0, 3)), np.empty((0, 3))
+        r1, v1p = self.states[a][0][i], self.states[a][1][i]
+        r2, v2p = self.states[b][0][j], self.states[b][1][j]
+        v1, v2, ok = lambert(np.broadcast_to(r1, r2.shape), r2, (j - i) * self.step_days * 86400)
+        return j[ok], (v1 - v1p)[ok], (v2 - v2p)[ok]
+
+    def bound(self):
+        local = math.inf
+        if len(self.best) >= self.top:
+            local = sorted(v[0] for v in self.best.values())[self.top - 1]
+        if self.shared is not None:
+            return min(local, self.shared.value)
+        return local
+
+    def _record(self, sequence, total, encounters):
+        if total >= self.best.get(sequence, (math.inf,))[0]:
+            return
+        self.best[sequence] = (total, encounters)
+        if self.shared is not None and len(self.best) >= self.top:
+            kth = sorted(v[0] for v in self.best.values())[self.top - 1]
+            with self.shared.get_lock():
+                if kth < self.shared.value:
+                    self.shared.value = kth
+
+    def _flyby_cost(self, body, v_in, v_out):
+        """Powered-flyby Δv per outgoing v∞ (inf where the turn is not achievable)."""
+        mu = PLANETS[body]["mu"]
+        rp = MIN_FLYBY_RADII * RADIUS[body.lower()]
+        s_in = np.linalg.norm(v_in)
+        s_out = np.linalg.norm(v_out, axis=-1)
+        cos_turn = np.clip(v_out @ v_in / (s_in * s_out), -1, 1)
+        max_turn = np.arcsin(1 / (1 + rp * s_in ** 2 / mu)) + np.arcsin(1 / (1 + rp * s_out ** 2 / mu))
+        return np.where(np.arccos(cos_turn) <= max_turn, np.abs(s_out - s_in), np.inf)
+
+    def expand(self, body, i, v_in, cost, encounters):
+        """Depth-first expansion of one node; children visited cheapest first."""
+        self.nodes += 1
+        flybys = len(encounters) - 1
+        children = []
+        for b in self.bodies:
+            if b == body or (b != self.target and flybys >= self.max_flybys):
+                continue
+            j, v_out, v_next = self.leg(body, b, i)
+            if not j.size:
+                continue
+            if v_in is None:  # launch
+                step = np.linalg.norm(v_out, axis=-1)
+                step = np.where(step <= self.max_vinf_launch, step, np.inf)
+            else:
+                step = self._flyby_cost(body, v_in, v_out)
+            new_cost = cost + step
+            bound = self.bound()
+            if b == self.target:
+                arrive = np.linalg.norm(v_next, axis=-1) if self.arrival == "vinf" else np.zeros(len(j))
+                total = new_cost + arrive
+                k = int(np.argmin(total))
+                if total[k] < bound:
+                    seq = tuple(e[0] for e in encounters) + (b,)
+                    final = encounters + [(b, int(j[k]), float(step[k]), float(arrive[k]))]
+                    self._record(seq, float(total[k]), final)
+                continue
+            keep = new_cost < bound
+            self.pruned += int((~keep).sum())
+            for k in np.flatnonzero(keep):
+                children.append((float(new_cost[k]), b, int(j[k]), v_next[k], float(step[k])))
+        children.sort(key=lambda c: c[0])
+        for n, (c, b, j, v, step) in enumerate(children):
+            if c >= self.bound():
+                self.pruned += len(children) - n
+                break
+            self.expand(b, j, v, c, encounters + [(b, j, step, None)])
+
+    def run(self, departures):
+        before = self.leg.cache_info()
+        self.nodes = self.pruned = 0
+        for i in departures:
+            self.expand(self.origin, int(i), None, 0.0, [(self.origin, int(i), 0.0, None)])
+        info = self.leg.cache_info()
+        return {"best": dict(self.best), "nodes": self.nodes, "pruned": self.pruned,
+                "legs_solved": info.misses - before.misses, "leg_cache_hits": info.hits - before.hits}
+
+
+def _init_worker(params, shared_bound):
+    _WORKER["search"] = _Search(**params, shared_bound=shared_bound)
+
+
+def _run_worker(departures):
+    return _WORKER["search"].run(departures)
+
+
+def _describe(sequence, total, encounters, jd):
+    legs = []
+    for (a, i, _, _), (b, j, dv, arrive) in zip(encounters, encounters[1:]):
+        legs.append({"from": a, "to": b, "depart": jd_to_date(jd[i]), "arrive": jd_to_date(jd[j]),
+                     "tof_days": round(float(jd[j] - jd[i]), 1),
+                     "delta_v_kms": round(dv, 3)})
+    launch_vinf = encounters[1][2]
+    return {
+        "sequence": "-".join(ABBREV[b] for b in sequence),
+        "bodies": list(sequence),
+        "delta_v_total_kms": round(total, 3),
+        "launch_c3_km2s2": round(launch_vinf ** 2, 2),
+        "flyby_delta_v_kms": round(sum(e[2] for e in encounters[2:]), 3),
+        "arrival_vinf_kms": round(encounters[-1][3], 3),
+        "flight_time_years": round(float(jd[encounters[-1][1]] - jd[encounters[0][1]]) / 365.25, 2),
+        "legs": legs,
+    }
+
+
+def search_sequences(body_from, body_to, depart_start, depart_end, via=None, max_flybys=3,
+                     step_days=10, n_tof=8, max_years=10, arrival="vinf", max_c3=None,
+                     top=5, workers=1):
+    """Branch-and-bound search for the ``top`` cheapest distinct flyby sequences."""
+    if np is None:
+        return dict(NUMPY_MISSING)
+    origin, target = body_from.title(), body_to.title()
+    via = [v.strip().title() for v in via] if via else list(PLANETS)
+    unknown = [b for b in [origin, target] + via if b not in PLANETS]
+    if unknown:
+        return {"error": f"Unknown body {unknown}. Available: {list(PLANETS)}"}
+    if origin == target:
+        return {"error": "Same planet — no transfer needed"}
+    try:
+        jd0, jd1 = date_to_jd(depart_start), date_to_jd(depart_end)
+    except ValueError:
+        return {"error": "Invalid date format. Use YYYY-MM-DD"}
+    if jd1 < jd0 or step_days <= 0 or max_flybys < 0 or top < 1:
+        return {"error": "Need depart-end >= depart-start, step > 0, max-flybys >= 0, top >= 1"}
+
+    n_grid = int((jd1 - jd0 + max_years * 365.25) / step_days) + 1
+    departures = np.arange(int((jd1 - jd0) / step_days) + 1)
+    params = dict(origin=origin, target=target, via=via, jd0=jd0, n_grid=n_grid, step_days=step_days,
+                  n_tof=n_tof, max_flybys=max_flybys, arrival=arrival, max_c3=max_c3, top=top)
+    started = time.time()
+    if workers and workers > 1 and len(departures) > 1:
+        shared = multiprocessing.Value("d", math.inf)
+        # Interleave departures so every worker sees early and late launch dates
+        blocks = [departures[k::workers * 4] for k in range(min(workers * 4, len(departures)))]
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(params, shared)) as pool:
+            parts = list(pool.map(_run_worker, blocks))
+    else:
+        parts = [_Search(**params).run(departures)]
+
+    best = {}
+    for part in parts:
+        for seq, entry in part["best"].items():
+            if entry[0] < best.get(seq, (math.inf,))[0]:
+                best[seq] = entry
+    ranked = sorted(best.items(), key=lambda kv: kv[1][0])[:top]
+    jd = jd0 + step_days * np.arange(n_grid)
+    return {
+        "from": origin,
+        "to": target,
+        "departure_window": [depart_start, depart_end],
+        "max_flybys": max_flybys,
+        "via": via,
+        "grid": {"step_days": step_days, "tof_samples_per_leg": n_tof, "max_years": max_years},
+        "arrival_model": arrival,
+        "sequences": [_describe(seq, total, enc, jd) for seq, (total, enc) in ranked],
+        "search": {
+            "nodes_expanded": sum(p["nodes"] for p in parts),
+            "branches_pruned": sum(p["pruned"] for p in parts),
+            "legs_solved": sum(p["legs_solved"] for p in parts),
+            "leg_cache_hits": sum(p["leg_cache_hits"] for p in parts),
+            "elapsed_s": round(time.time() - started, 2),
+        },
+        "hohmann_reference": {k: v for k, v in hohmann_transfer(origin, target).items()
+                              if k in ("delta_v_total_kms", "transfer_time_days")},
+        "note": "Patched conics on mean-element ephemerides, single-revolution legs; "
+                "escape/capture burns not included.",
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Gravity-Assist Sequence Search")
+    sub = parser.add_subparsers(dest="command")
+
+    p_s = sub.add_parser("search", help="Branch-and-bound search over flyby sequences and dates")
+    p_s.add_argument("planet_from")
+    p_s.add_argument("planet_to")
+    p_s.add_argument("--depart-start", required=True, help="YYYY-MM-DD")
+    p_s.add_argument("--depart-end", required=True, help="YYYY-MM-DD")
+    p_s.add_argument("--via", default=None, help="Comma-separated flyby candidates (default: all planets)")
+    p_s.add_argument("--max-flybys", type=int, default=3)
+    p_s.add_argument("--step-days", type=float, default=10, help="Encounter date grid spacing")
+    p_s.add_argument("--n-tof", type=int, default=8, help="TOF samples per leg")
+    p_s.add_argument("--max-years", type=float, default=10, help="Mission duration cap")
+    p_s.add_argument("--arrival", choices=["vinf", "flyby"], default="vinf",
+                     help="Count arrival v-infinity (rendezvous) or not (flyby mission)")
+    p_s.add_argument("--max-c3", type=float, default=None, help="Launch C3 cap (km²/s²)")
+    p_s.add_argument("--top", type=int, default=5, help="Distinct sequences to keep")
+    p_s.add_argument("--workers", type=int, default=1, help="Worker processes")
+
+    args = parser.parse_args(argv)
+    if np is None and args.command:
+        print(json.dumps(NUMPY_MISSING))
+        sys.exit(1)
+    if args.command == "search":
+        result = search_sequences(args.planet_from, args.planet_to, args.depart_start, args.depart_end,
+                                  args.via.split(",") if args.via else None, args.max_flybys,
+                                  args.step_days, args.n_tof, args.max_years, args.arrival,
+                                  args.max_c3, args.top, args.workers)
+    else:
+        parser.print_help()
+        sys.exit(0)
+    if "error" in result:
+        print(json.dumps(result, indent=2, ensure_ascii=False))
+        sys.exit(1)
+    print(json.dumps(result, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
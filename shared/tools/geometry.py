@@ -2,13 +2,28 @@
 
 Usage:
     python geometry.py tank --propellant-kg 400000 --fuel lox-rp1 --diameter 3.66
+    python geometry.py tank --propellant-kg 400000 --fuel lox-ch4 --diameter 9 --wall steel --meop-bar 4
+    python geometry.py tank-trade --propellant-kg 400000 --fuel lox-rp1 --diameters 3:6:61 --pressures 2:8:25
+    python geometry.py tank-batch --input tanks.csv --fuel lox-ch4 --output tanks_out.csv
+    python geometry.py tank-optimize --propellant-kg 400000 --fuel lox-rp1,lox-ch4 --max-diameter 4.6 --max-aspect 8
     python geometry.py fairing --payload-diameter 4.0 --payload-height 6.0
+    python geometry.py fairing-batch --input manifest.csv --output fits.csv
     python geometry.py vehicle-size --payload-kg 22800 --orbit LEO --propellant lox-rp1
+    python geometry.py vehicle-size --payload-kg 22800 --orbit LEO --propellant lox-ch4 --closed-loop --wall steel
 """
 import argparse
+import bisect
+import functools
 import json
 import math
+import os
 import sys
+import time
+
+sys.path.insert(0, os.path.dirname(__file__))
+from batch_io import (np, NUMPY_MISSING, read_columns, require_columns, write_columns, summarize_columns,
+                      columns_to_lists, parse_axis)
+from catalog import CATALOG
 
 # Propellant densities (kg/m³)
 PROPELLANTS = {
@@ -32,12 +47,59 @@ COMBINATIONS = {
 WALL_DENSITY_ALUMINUM = 2700   # kg/m³
 WALL_DENSITY_STEEL = 7800      # kg/m³
 WALL_DENSITY_CFRP = 1600       # kg/m³
+WALL_DENSITIES = {"aluminum": WALL_DENSITY_ALUMINUM, "steel": WALL_DENSITY_STEEL, "cfrp": WALL_DENSITY_CFRP}
+
+# Wall allowables (MPa) and minimum manufacturable gauge (mm); composites are sized on ultimate only
+MATERIALS = {
+    "aluminum": {"name": "Al 2219-T87", "density": WALL_DENSITY_ALUMINUM,
+                 "yield_mpa": 345, "ultimate_mpa": 427, "min_gauge_mm": 1.0},
+    "steel": {"name": "Stainless 301 (1/2 hard)", "density": WALL_DENSITY_STEEL,
+              "yield_mpa": 758, "ultimate_mpa": 1034, "min_gauge_mm": 0.6},
+    "cfrp": {"name": "CFRP (quasi-isotropic)", "density": WALL_DENSITY_CFRP,
+             "yield_mpa": None, "ultimate_mpa": 600, "min_gauge_mm": 1.5},
+}
+SAFETY_FACTOR_YIELD = 1.1
+SAFETY_FACTOR_ULTIMATE = 1.4
+ULLAGE_FACTOR = 1.05           # 5% ullage
+INSULATION_KG_M2 = {"lox-lh2": 2.0}  # cryogenic insulation; 0.5 kg/m² otherwise
+DEFAULT_INSULATION_KG_M2 = 0.5
+TANK_SCAN_POINTS = 4001
+
+# Closed-loop sizing: ideal + losses Δv to orbit (km/s), stage Isp (first stage averages SL/vac)
+DELTA_V_TO_ORBIT = {"LEO": 9.4, "GTO": 11.9, "GEO": 13.4, "MOON": 12.6, "MARS": 13.0}
+STAGE_ISP = {"lox-rp1": (296, 348), "lox-ch4": (340, 375), "lox-lh2": (405, 450), "n2o4-udmh": (295, 320)}
+ENGINE_TWR = {"lox-rp1": 150, "lox-ch4": 140, "lox-lh2": 70, "n2o4-udmh": 60}  # engine thrust / engine weight
+STAGE_TWR = (1.3, 0.8)                  # liftoff, upper-stage ignition
+STAGE_AXIAL_G = (4.0, 5.0)              # peak axial load for the hydrostatic head (first, upper stages)
+SECONDARY_STRUCTURE = 1.5               # skirts, intertank, thrust structure, feed lines per kg of tank
+SIZING_DEFAULT_MEOP_BAR = 3.0
+SIZING_TOL = 1e-9
+SIZING_MAX_ITER = 60
+TANK_MEMO_SIZE = 4096
+
+
+def _allowable_stress_mpa(material, sf_yield=SAFETY_FACTOR_YIELD, sf_ultimate=SAFETY_FACTOR_ULTIMATE):
+    """Design membrane stress: lower of yield/SFy and ultimate/SFu → (MPa, governing criterion)."""
+    m = MATERIALS[material]
+    allow, governing = m["ultimate_mpa"] / sf_ultimate, "ultimate"
+    if m["yield_mpa"] is not None and m["yield_mpa"] / sf_yield < allow:
+        allow, governing = m["yield_mpa"] / sf_yield, "yield"
+    return allow, governing
+
 
+def tank_sizing(propellant_kg, fuel_type, diameter_m, wall_material="aluminum", wall_thickness_mm=3,
+                meop_bar=None, sf_yield=SAFETY_FACTOR_YIELD, sf_ultimate=SAFETY_FACTOR_ULTIMATE):
+    """Calculate tank dimensions for given propellant mass and diameter.
 
-def tank_sizing(propellant_kg, fuel_type, diameter_m, wall_material="aluminum", wall_thickness_mm=3):
-    """Calculate tank dimensions for given propellant mass and diameter."""
+    With ``meop_bar`` the walls are sized from pressure instead of the fixed
+    ``wall_thickness_mm``: cylinder from hoop stress p·r/t, domes from the
+    hemisphere membrane stress p·r/(2t), each against the material allowable
+    and never below its minimum gauge.
+    """
     if propellant_kg <= 0:
         return {"error": f"Propellant mass must be > 0 kg (got {propellant_kg})"}
+    if meop_bar is not None and wall_material not in MATERIALS:
+        return {"error": f"Unknown wall material '{wall_material}'. Available: {list(MATERIALS.keys())}"}
     combo = COMBINATIONS.get(fuel_type.lower())
     if not combo:
         return {"error": f"Unknown fuel type. Available: {list(COMBINATIONS.keys())}"}
@@ -50,8 +112,7 @@ def tank_sizing(propellant_kg, fuel_type, diameter_m, wall_material="aluminum",
     ox_volume = ox_mass / ox_density
     fuel_volume = fuel_mass / fuel_density
     total_volume = ox_volume + fuel_volume
-    ullage_factor = 1.05  # 5% ullage
-    total_volume_with_ullage = total_volume * ullage_factor
+    total_volume_with_ullage = total_volume * ULLAGE_FACTOR
 
     radius = diameter_m / 2
     cross_section = math.pi * radius ** 2
@@ -66,15 +127,36 @@ def tank_sizing(propellant_kg, fuel_type, diameter_m, wall_material="aluminum",
         total_length = cylinder_length + diameter_m  # Add dome heights
 
     # Wall mass estimate
-    wt = wall_thickness_mm / 1000
-    materials = {"aluminum": WALL_DENSITY_ALUMINUM, "steel": WALL_DENSITY_STEEL, "cfrp": WALL_DENSITY_CFRP}
-    wall_density = materials.get(wall_material, WALL_DENSITY_ALUMINUM)
-    surface_area = 2 * math.pi * radius * cylinder_length + 4 * math.pi * radius ** 2
-    wall_mass = surface_area * wt * wall_density
+    wall_density = WALL_DENSITIES.get(wall_material, WALL_DENSITY_ALUMINUM)
+    cylinder_area = 2 * math.pi * radius * cylinder_length
+    dome_area = 4 * math.pi * radius ** 2
+    surface_area = cylinder_area + dome_area
+    wall = None
+    if meop_bar is None:
+        wt = wall_thickness_mm / 1000
+        wall_mass = surface_area * wt * wall_density
+    else:
+        p = meop_bar * 1e5
+        allow_mpa, governing = _allowable_stress_mpa(wall_material, sf_yield, sf_ultimate)
+        min_gauge = MATERIALS[wall_material]["min_gauge_mm"] / 1000
+        t_cyl = max(p * radius / (allow_mpa * 1e6), min_gauge)
+        t_dome = max(p * radius / (2 * allow_mpa * 1e6), min_gauge)
+        wall_mass = (cylinder_area * t_cyl + dome_area * t_dome) * wall_density
+        wall = {
+            "meop_bar": meop_bar,
+            "material": MATERIALS[wall_material]["name"],
+            "allowable_stress_mpa": round(allow_mpa, 1),
+            "governing": governing if t_cyl > min_gauge else "min_gauge",
+            "cylinder_thickness_mm": round(t_cyl * 1000, 3),
+            "dome_thickness_mm": round(t_dome * 1000, 3),
+            "hoop_stress_mpa": round(p * radius / t_cyl / 1e6, 1),
+            "longitudinal_stress_mpa": round(p * radius / (2 * t_cyl) / 1e6, 1),
+            "dome_stress_mpa": round(p * radius / (2 * t_dome) / 1e6, 1),
+        }
     # Insulation for cryo
-    insulation_mass = surface_area * 2.0 if fuel_type in ["lox-lh2"] else surface_area * 0.5
+    insulation_mass = surface_area * INSULATION_KG_M2.get(fuel_type, DEFAULT_INSULATION_KG_M2)
 
-    return {
+    result = {
         "propellant_type": combo["name"],
         "mixture_ratio": mr,
         "oxidizer_kg": round(ox_mass, 0),
@@ -91,39 +173,357 @@ def tank_sizing(propellant_kg, fuel_type, diameter_m, wall_material="aluminum",
         "total_tank_mass_kg": round(wall_mass + insulation_mass, 0),
         "tank_mass_fraction": round((wall_mass + insulation_mass) / propellant_kg, 4),
     }
+    if wall:
+        result["wall_sizing"] = wall
+    return result
 
 
-def fairing_check(payload_diameter_m, payload_height_m):
-    """Check payload against common fairing dimensions."""
-    fairings = {
-        "Falcon 9": {"diameter": 5.2, "height": 13.1, "usable_diameter": 4.6, "usable_height": 11.0},
-        "Falcon Heavy": {"diameter": 5.2, "height": 13.1, "usable_diameter": 4.6, "usable_height": 11.0},
-        "Ariane 6": {"diameter": 5.4, "height": 20.0, "usable_diameter": 4.57, "usable_height": 17.0},
-        "Vulcan": {"diameter": 5.4, "height": 21.3, "usable_diameter": 4.57, "usable_height": 18.0},
-        "Starship": {"diameter": 9.0, "height": 22.0, "usable_diameter": 8.0, "usable_height": 18.0},
-        "New Glenn": {"diameter": 7.0, "height": 21.9, "usable_diameter": 6.0, "usable_height": 18.0},
-        "SLS": {"diameter": 8.4, "height": 19.1, "usable_diameter": 7.5, "usable_height": 17.0},
+def tank_sizing_batch(propellant_kg, fuel_type, diameter_m, wall_material="aluminum", wall_thickness_mm=3,
+                      meop_bar=None, sf_yield=SAFETY_FACTOR_YIELD, sf_ultimate=SAFETY_FACTOR_ULTIMATE):
+    """Vectorized tank_sizing(): propellant mass, diameter, thickness and MEOP broadcast as arrays.
+
+    Same algebra as tank_sizing() for one propellant combination and wall
+    material; rows with non-positive mass or diameter are flagged False in
+    ``feasible`` and hold NaN.
+    """
+    if np is None:
+        return dict(NUMPY_MISSING)
+    combo = COMBINATIONS.get(fuel_type.lower())
+    if not combo:
+        return {"error": f"Unknown fuel type. Available: {list(COMBINATIONS.keys())}"}
+    if meop_bar is not None and wall_material not in MATERIALS:
+        return {"error": f"Unknown wall material '{wall_material}'. Available: {list(MATERIALS.keys())}"}
+    pressure = np.nan if meop_bar is None else meop_bar
+    prop, diameter, wt, meop = np.broadcast_arrays(
+        *(np.asarray(x, dtype=float) for x in (propellant_kg, diameter_m, wall_thickness_mm, pressure)))
+    feasible = (prop > 0) & (diameter > 0)
+    prop = np.where(feasible, prop, np.nan)
+    diameter = np.where(feasible, diameter, np.nan)
+    mr = combo["mr"]
+    ox_mass = prop * mr / (1 + mr)
+    fuel_mass = prop - ox_mass
+    ox_volume = ox_mass / PROPELLANTS[combo["ox"]]["density"]
+    fuel_volume = fuel_mass / PROPELLANTS[combo["fuel"]]["density"]
+    volume = (ox_volume + fuel_volume) * ULLAGE_FACTOR
+    radius = diameter / 2
+    cylinder_length = np.maximum(volume - (4 / 3) * np.pi * radius ** 3, 0) / (np.pi * radius ** 2)
+    total_length = cylinder_length + diameter
+    cylinder_area = 2 * np.pi * radius * cylinder_length
+    dome_area = 4 * np.pi * radius ** 2
+    surface_area = cylinder_area + dome_area
+    density = WALL_DENSITIES.get(wall_material, WALL_DENSITY_ALUMINUM)
+    if meop_bar is None:
+        t_cyl = t_dome = wt / 1000
+    else:
+        allow_pa = _allowable_stress_mpa(wall_material, sf_yield, sf_ultimate)[0] * 1e6
+        min_gauge = MATERIALS[wall_material]["min_gauge_mm"] / 1000
+        t_cyl = np.maximum(meop * 1e5 * radius / allow_pa, min_gauge)
+        t_dome = np.maximum(meop * 1e5 * radius / (2 * allow_pa), min_gauge)
+    wall_mass = (cylinder_area * t_cyl + dome_area * t_dome) * density
+    insulation_mass = surface_area * INSULATION_KG_M2.get(fuel_type.lower(), DEFAULT_INSULATION_KG_M2)
+    tank_mass = wall_mass + insulation_mass
+    return {
+        "meop_bar": meop,
+        "cylinder_thickness_mm": t_cyl * 1000,
+        "dome_thickness_mm": t_dome * 1000,
+        "propellant_kg": prop,
+        "tank_diameter_m": diameter,
+        "oxidizer_volume_m3": ox_volume,
+        "fuel_volume_m3": fuel_volume,
+        "total_volume_m3": volume,
+        "cylinder_length_m": cylinder_length,
+        "total_tank_length_m": total_length,
+        "aspect_ratio": total_length / diameter,
+        "wall_mass_kg": wall_mass,
+        "insulation_mass_kg": insulation_mass,
+        "total_tank_mass_kg": tank_mass,
+        "tank_mass_fraction": tank_mass / prop,
+        "feasible": feasible,
     }
+
+
+def tank_optimize(propellant_kg, fuel_types, wall_material="aluminum", wall_thickness_mm=3, objective="mass",
+                  min_diameter=0.5, max_diameter=10.0, max_length=None, min_aspect=None, max_aspect=None,
+                  points=TANK_SCAN_POINTS, meop_bar=None):
+    """Diameter minimizing tank mass (or length) per propellant combination.
+
+    Scans ``points`` diameters in one vectorized call, masks the fairing
+    (max_diameter, max_length) and aspect-ratio limits, then rescans the
+    bracket around the best point once more at the same resolution.
+    """
+    if np is None:
+        return dict(NUMPY_MISSING)
+    if propellant_kg <= 0:
+        return {"error": f"Propellant mass must be > 0 kg (got {propellant_kg})"}
+    if not 0 < min_diameter < max_diameter:
+        return {"error": f"Need 0 < min diameter < max diameter (got {min_diameter}, {max_diameter})"}
+    if meop_bar is not None and wall_material not in MATERIALS:
+        return {"error": f"Unknown wall material '{wall_material}'. Available: {list(MATERIALS.keys())}"}
+    key = "total_tank_mass_kg" if objective == "mass" else "total_tank_length_m"
+
+    def scan(lo, hi, combo):
+        d = np.linspace(lo, hi, points)
+        cols = tank_sizing_batch(propellant_kg, combo, d, wall_material, wall_thickness_mm, meop_bar)
+        ok = cols["feasible"].copy()
+        if max_length is not None:
+            ok &= cols["total_tank_length_m"] <= max_length
+        if min_aspect is not None:
+            ok &= cols["aspect_ratio"] >= min_aspect
+        if max_aspect is not None:
+            ok &= cols["aspect_ratio"] <= max_aspect
+        score = np.where(ok, cols[key], np.inf)
+        return d, cols, score
+
     results = []
-    for name, f in fairings.items():
-        fits = payload_diameter_m <= f["usable_diameter"] and payload_height_m <= f["usable_height"]
-        margin_d = f["usable_diameter"] - payload_diameter_m
-        margin_h = f["usable_height"] - payload_height_m
+    for combo in fuel_types:
+        if combo.lower() not in COMBINATIONS:
+            return {"error": f"Unknown fuel type '{combo}'. Available: {list(COMBINATIONS.keys())}"}
+        d, cols, score = scan(min_diameter, max_diameter, combo)
+        k = int(np.argmin(score))
+        if not np.isfinite(score[k]):
+            results.append({"fuel": combo, "feasible": False,
+                            "reason": "No diameter meets the length and aspect-ratio limits"})
+            continue
+        d, cols, score = scan(d[max(k - 1, 0)], d[min(k + 1, points - 1)], combo)
+        k = int(np.argmin(score))
+        best = tank_sizing(propellant_kg, combo, round(float(d[k]), 4), wall_material, wall_thickness_mm, meop_bar)
+        best["aspect_ratio"] = round(float(cols["aspect_ratio"][k]), 3)
+        results.append({"fuel": combo, "feasible": True, **best})
+    feasible = [r for r in results if r["feasible"]]
+    return {
+        "propellant_kg": propellant_kg,
+        "objective": objective,
+        "wall_material": wall_material,
+        "constraints": {"diameter_m": [min_diameter, max_diameter], "max_length_m": max_length,
+                        "aspect_ratio": [min_aspect, max_aspect]},
+        "diameters_scanned": 2 * points,
+        "best": min(feasible, key=lambda r: r[key])["fuel"] if feasible else None,
+        "results": results,
+    }
+
+
+def run_tank_batch(input_path, fuel_type, wall_material="aluminum", output_path=None, fmt=None):
+    """Read propellant_kg/diameter_m columns, size every tank in one vectorized call."""
+    if np is None:
+        return dict(NUMPY_MISSING)
+    try:
+        columns = read_columns(input_path, fmt)
+    except ValueError as exc:
+        return {"error": str(exc)}
+    names = ["propellant_kg", "diameter_m"]
+    aliases = {"propellant_kg": ["propellant", "mass_kg"], "diameter_m": ["diameter", "tank_diameter_m"]}
+    picked, missing = require_columns(columns, names, aliases)
+    if missing:
+        return {"error": f"Missing columns {missing}. Expected: {names} (+ optional wall_thickness_mm)"}
+    result = tank_sizing_batch(picked[0], fuel_type, picked[1], wall_material,
+                               columns.get("wall_thickness_mm", 3))
+    if "error" in result:
+        return result
+    summary = summarize_columns(result)
+    if output_path:
+        write_columns(output_path, result, fmt)
+        summary["output"] = output_path
+    else:
+        summary["results"] = columns_to_lists(result)
+    return summary
+
+
+def tank_wall_trade(propellant_kg, fuel_type, materials, diameters_m, meops_bar,
+                    sf_yield=SAFETY_FACTOR_YIELD, sf_ultimate=SAFETY_FACTOR_ULTIMATE, output_path=None, fmt=None):
+    """Pressure-sized tank mass over material × diameter × MEOP, one vectorized call per material.
+
+    Returns the lightest configuration per material and overall; the full
+    grid goes to ``output_path`` (CSV/NDJSON) when given.
+    """
+    if np is None:
+        return dict(NUMPY_MISSING)
+    unknown = [m for m in materials if m not in MATERIALS]
+    if unknown:
+        return {"error": f"Unknown wall materials {unknown}. Available: {list(MATERIALS.keys())}"}
+    d, p = np.meshgrid(np.asarray(diameters_m, dtype=float), np.asarray(meops_bar, dtype=float), indexing="ij")
+    d, p = d.ravel(), p.ravel()
+    started = time.perf_counter()
+    blocks, best = [], {}
+    for material in materials:
+        cols = tank_sizing_batch(propellant_kg, fuel_type, d, material, meop_bar=p,
+                                 sf_yield=sf_yield, sf_ultimate=sf_ultimate)
+        if "error" in cols:
+            return cols
+        mass = np.where(cols["feasible"], cols["total_tank_mass_kg"], np.inf)
+        k = int(np.argmin(mass))
+        best[material] = {
+            "material": MATERIALS[material]["name"],
+            "diameter_m": round(float(d[k]), 4),
+            "meop_bar": round(float(p[k]), 3),
+            "cylinder_thickness_mm": round(float(cols["cylinder_thickness_mm"][k]), 3),
+            "dome_thickness_mm": round(float(cols["dome_thickness_mm"][k]), 3),
+            "total_tank_mass_kg": round(float(mass[k]), 1),
+            "tank_mass_fraction": round(float(cols["tank_mass_fraction"][k]), 5),
+        }
+        blocks.append({"material": np.full(d.size, material), **cols})
+    elapsed = time.perf_counter() - started
+    configs = d.size * len(materials)
+    result = {
+        "propellant_kg": propellant_kg,
+        "fuel": fuel_type,
+        "safety_factors": {"yield": sf_yield, "ultimate": sf_ultimate},
+        "configurations": configs,
+        "configs_per_s": round(configs / elapsed) if elapsed > 0 else None,
+        "best": min(best.values(), key=lambda r: r["total_tank_mass_kg"]) if best else None,
+        "best_by_material": best,
+    }
+    if output_path:
+        columns = {k: np.concatenate([b[k] for b in blocks]) for k in blocks[0]}
+        write_columns(output_path, columns, fmt)
+        result["output"] = output_path
+    return result
+
+
+def _load_fairings():
+    """Fairing catalog from the "fairings" section of vehicles.json, in file order."""
+    return tuple({"key": key, **f} for key, f in CATALOG.fairings().items())
+
+
+class FairingIndex:
+    """Sorted 2-D fit index over fairing usable diameter and height.
+
+    Fairings are sorted by usable diameter; for every diameter suffix and every
+    distinct usable height the index stores how many fairings fit and which is
+    the tightest (smallest usable cylinder volume). A payload lookup is then two
+    binary searches, independent of how many fairings match, and
+    ``fit_batch`` runs them for a whole manifest with np.searchsorted.
+    """
+
+    def __init__(self, fairings):
+        self.fairings = sorted(fairings, key=lambda f: f["usable_diameter_m"])
+        self.diameters = [f["usable_diameter_m"] for f in self.fairings]
+        self.heights = sorted({f["usable_height_m"] for f in self.fairings})
+        n, m = len(self.fairings), len(self.heights)
+        # count[i][k] / best[i][k]: fairings j >= i (diameter order) with height >= heights[k]
+        self.count = [[0] * (m + 1) for _ in range(n + 1)]
+        self.best = [[-1] * (m + 1) for _ in range(n + 1)]
+        volume = [math.pi * (f["usable_diameter_m"] / 2) ** 2 * f["usable_height_m"] for f in self.fairings]
+        for k, h in enumerate(self.heights):
+            for i in range(n - 1, -1, -1):
+                fits = self.fairings[i]["usable_height_m"] >= h
+                self.count[i][k] = self.count[i + 1][k] + fits
+                best = self.best[i + 1][k]
+                if fits and (best < 0 or volume[i] <= volume[best]):  # ties go to the earlier entry
+                    best = i
+                self.best[i][k] = best
+
+    def _cell(self, diameter_m, height_m):
+        return bisect.bisect_left(self.diameters, diameter_m), bisect.bisect_left(self.heights, height_m)
+
+    def fit(self, diameter_m, height_m):
+        """(number of fairings that fit, tightest fitting fairing or None)."""
+        i, k = self._cell(diameter_m, height_m)
+        best = self.best[i][k]
+        return self.count[i][k], (self.fairings[best] if best >= 0 else None)
+
+    def fit_batch(self, diameter_m, height_m):
+        """Vectorized fit(): arrays of fit counts and tightest-fairing positions (-1 = none)."""
+        i = np.searchsorted(np.asarray(self.diameters), diameter_m, side="left")
+        k = np.searchsorted(np.asarray(self.heights), height_m, side="left")
+        return np.asarray(self.count)[i, k], np.asarray(self.best)[i, k]
+
+
+def fairing_index(vehicle=None):
+    """FairingIndex over the whole catalog, or over one vehicle's fairings (rebuilt when the catalog changes)."""
+    CATALOG.fairings()  # refresh the version if vehicles.json changed
+    if vehicle is not None:
+        vehicle = CATALOG.resolve_vehicle(vehicle) or vehicle
+    return _fairing_index(vehicle, CATALOG.version)
+
+
+@functools.lru_cache(maxsize=None)
+def _fairing_index(vehicle, version):
+    return FairingIndex([f for f in _load_fairings() if vehicle is None or f.get("vehicle") == vehicle])
+
+
+def fairing_check(payload_diameter_m, payload_height_m):
+    """Check payload against the fairing catalog in vehicles.json."""
+    fairings = _load_fairings()
+    if not fairings:
+        return {"error": "No fairings in vehicles.json"}
+    results = []
+    for f in fairings:
+        fits = payload_diameter_m <= f["usable_diameter_m"] and payload_height_m <= f["usable_height_m"]
+        margin_d = f["usable_diameter_m"] - payload_diameter_m
+        margin_h = f["usable_height_m"] - payload_height_m
         results.append({
-            "vehicle": name,
+            "vehicle": f["name"],
             "fits": fits,
             "diameter_margin_m": round(margin_d, 2),
             "height_margin_m": round(margin_h, 2),
-            "fairing_diameter_m": f["usable_diameter"],
-            "fairing_height_m": f["usable_height"],
+            "fairing_diameter_m": f["usable_diameter_m"],
+            "fairing_height_m": f["usable_height_m"],
         })
+    count, tightest = fairing_index().fit(payload_diameter_m, payload_height_m)
     return {
         "payload_diameter_m": payload_diameter_m,
         "payload_height_m": payload_height_m,
+        "fits_count": count,
+        "tightest_fit": tightest["key"] if tightest else None,
         "results": results,
     }
 
 
+def fairing_batch(diameter_m, height_m, vehicle=None):
+    """Fit a manifest of payload envelopes against the fairing catalog in one call.
+
+    Returns columns: fits_count, tightest fairing and its vehicle (strings, empty
+    when nothing fits) and the margins in that fairing.
+    """
+    if np is None:
+        return dict(NUMPY_MISSING)
+    index = fairing_index(vehicle)
+    if not index.fairings:
+        return {"error": f"No fairings in vehicles.json{f' for vehicle {vehicle}' if vehicle else ''}"}
+    d, h = np.broadcast_arrays(np.asarray(diameter_m, dtype=float), np.asarray(height_m, dtype=float))
+    count, best = index.fit_batch(d, h)
+    found = best >= 0
+    usable_d = np.array([f["usable_diameter_m"] for f in index.fairings] + [np.nan])
+    usable_h = np.array([f["usable_height_m"] for f in index.fairings] + [np.nan])
+    keys = np.array([f["key"] for f in index.fairings] + [""])
+    vehicles = np.array([f.get("vehicle", "") for f in index.fairings] + [""])
+    return {
+        "payload_diameter_m": d,
+        "payload_height_m": h,
+        "fits_count": count,
+        "tightest_fairing": keys[best],
+        "vehicle": vehicles[best],
+        "diameter_margin_m": usable_d[best] - d,
+        "height_margin_m": usable_h[best] - h,
+        "feasible": found,
+    }
+
+
+def run_fairing_batch(input_path, output_path=None, fmt=None, vehicle=None):
+    """Read payload_diameter_m/payload_height_m columns and fit every row."""
+    if np is None:
+        return dict(NUMPY_MISSING)
+    try:
+        columns = read_columns(input_path, fmt)
+    except ValueError as exc:
+        return {"error": str(exc)}
+    names = ["payload_diameter_m", "payload_height_m"]
+    aliases = {"payload_diameter_m": ["diameter_m", "diameter"], "payload_height_m": ["height_m", "height"]}
+    picked, missing = require_columns(columns, names, aliases)
+    if missing:
+        return {"error": f"Missing columns {missing}. Expected: {names}"}
+    result = fairing_batch(*picked, vehicle=vehicle)
+    if "error" in result:
+        return result
+    summary = summarize_columns({k: v for k, v in result.items() if k not in ("tightest_fairing", "vehicle")})
+    if output_path:
+        write_columns(output_path, result, fmt)
+        summary["output"] = output_path
+    else:
+        summary["results"] = columns_to_lists(result)
+    return summary
+
+
 def vehicle_size_estimate(payload_kg, orbit="LEO", propellant="lox-rp1"):
     """Quick vehicle sizing estimate from payload requirements."""
     # Typical payload fractions
@@ -157,7 +557,222 @@ def vehicle_size_estimate(payload_kg, orbit="LEO", propellant="lox-rp1"):
     }
 
 
-if __name__ == "__main__":
+@functools.lru_cache(maxsize=TANK_MEMO_SIZE)
+def _tank_terms(fuel_type, diameter_m, wall_material):
+    """Propellant-independent tank terms for one (combination, diameter, material).
+
+    Returns (ullaged m³ per kg of propellant, radius, dome volume, cross
+    section, dome area, wall density, allowable stress in Pa, minimum gauge in
+    m, insulation kg/m²) as in tank_sizing_batch(). Sizing passes only change
+    the propellant mass, so these stay cached across iterations.
+    """
+    combo = COMBINATIONS[fuel_type]
+    mr = combo["mr"]
+    m3_per_kg = (mr / (1 + mr) / PROPELLANTS[combo["ox"]]["density"]
+                 + 1 / (1 + mr) / PROPELLANTS[combo["fuel"]]["density"]) * ULLAGE_FACTOR
+    radius = diameter_m / 2
+    return (m3_per_kg, radius, (4 / 3) * math.pi * radius ** 3, math.pi * radius ** 2, 4 * math.pi * radius ** 2,
+            WALL_DENSITIES.get(wall_material, WALL_DENSITY_ALUMINUM),
+            _allowable_stress_mpa(wall_material)[0] * 1e6, MATERIALS[wall_material]["min_gauge_mm"] / 1000,
+            INSULATION_KG_M2.get(fuel_type, DEFAULT_INSULATION_KG_M2))
+
+
+def _tank_mass_kg(propellant_kg, fuel_type, diameter_m, wall_material, meop_bar, axial_g):
+    """Unrounded tank mass sized for MEOP plus the mean hydrostatic head at ``axial_g``.
+
+    Same algebra as tank_sizing_batch() on the cached _tank_terms(). Returns
+    (mass, length, design pressure in bar).
+    """
+    m3_per_kg, radius, dome_volume, cross_section, dome_area, wall_density, allow_pa, min_gauge, insulation = \
+        _tank_terms(fuel_type, diameter_m, wall_material)
+    cylinder_length = max(propellant_kg * m3_per_kg - dome_volume, 0) / cross_section
+    length = cylinder_length + 2 * radius
+    design_bar = meop_bar + 9.80665 * axial_g * length / 2 / m3_per_kg / 1e5
+    p = design_bar * 1e5
+    t_cyl = max(p * radius / allow_pa, min_gauge)
+    t_dome = max(p * radius / (2 * allow_pa), min_gauge)
+    cylinder_area = 2 * math.pi * radius * cylinder_length
+    mass = (cylinder_area * t_cyl + dome_area * t_dome) * wall_density + (cylinder_area + dome_area) * insulation
+    return mass, length, design_bar
+
+
+def _anderson(g, x0, depth=3, tol=SIZING_TOL, max_iter=SIZING_MAX_ITER):
+    """Anderson-accelerated fixed point x = g(x); returns (x, iterations, converged)."""
+    x = np.asarray(x0, dtype=float)
+    xs, fs = [], []
+    for k in range(1, max_iter + 1):
+        gx = g(x)
+        f = gx - x
+        if np.max(np.abs(f)) < tol:
+            return gx, k, True
+        xs.append(gx)
+        fs.append(f)
+        if len(fs) > depth + 1:
+            xs.pop(0)
+            fs.pop(0)
+        x = gx
+        if len(fs) > 1:
+            try:
+                gamma = np.linalg.lstsq(np.diff(fs, axis=0).T, f, rcond=None)[0]
+            except np.linalg.LinAlgError:
+                continue
+            mixed = gx - np.diff(xs, axis=0).T @ gamma
+            if np.all(np.isfinite(mixed)):
+                x = mixed
+    return x, max_iter, False
+
+
+def _aitken(g, x0, tol=SIZING_TOL, max_iter=SIZING_MAX_ITER):
+    """Componentwise Aitken Δ² (Steffensen) every two plain steps; returns (x, iterations, converged)."""
+    x = np.asarray(x0, dtype=float)
+    k = 0
+    while k < max_iter:
+        x1 = g(x)
+        k += 1
+        if np.max(np.abs(x1 - x)) < tol:
+            return x1, k, True
+        x2 = g(x1)
+        k += 1
+        if np.max(np.abs(x2 - x1)) < tol:
+            return x2, k, True
+        denom = x2 - 2 * x1 + x
+        safe = np.abs(denom) > 1e-15
+        x = np.where(safe, x - (x1 - x) ** 2 / np.where(safe, denom, 1.0), x2)
+    return x, k, False
+
+
+def _plain(g, x0, tol=SIZING_TOL, max_iter=SIZING_MAX_ITER):
+    x = np.asarray(x0, dtype=float)
+    for k in range(1, max_iter + 1):
+        gx = g(x)
+        if np.max(np.abs(gx - x)) < tol:
+            return gx, k, True
+        x = gx
+    return x, max_iter, False
+
+
+def vehicle_size_closed_loop(payload_kg, orbit="LEO", propellant="lox-rp1", stages=2, diameter_m=None,
+                             wall_material="aluminum", meop_bar=SIZING_DEFAULT_MEOP_BAR, isps=None,
+                             accel="anderson", tol=SIZING_TOL, max_iter=SIZING_MAX_ITER):
+    """Converged vehicle sizing: staging split → tanks → structural fractions → re-stage.
+
+    The fixed point is over per-stage structural fractions. Each pass stages
+    the vehicle with staging.optimal_stage_masses (split cache), sizes every
+    stage's tanks for MEOP plus hydrostatic head (the propellant-independent
+    tank terms are cached per diameter and material), adds secondary
+    structure and engines (from the stage thrust-to-weight), and recomputes
+    the fractions. The loop
+    is accelerated with Anderson mixing (or Aitken Δ²); ``accel="none"`` runs
+    plain substitution for comparison.
+    """
+    if np is None:
+        return dict(NUMPY_MISSING)
+    from staging import optimal_stage_masses, split_cache_info  # staging → cost_estimator → geometry
+
+    orbit = orbit.upper()
+    combo = propellant.lower()
+    if payload_kg <= 0:
+        return {"error": f"Payload must be > 0 kg (got {payload_kg})"}
+    if orbit not in DELTA_V_TO_ORBIT:
+        return {"error": f"Unknown orbit '{orbit}'. Available: {list(DELTA_V_TO_ORBIT.keys())}"}
+    if combo not in COMBINATIONS:
+        return {"error": f"Unknown propellant. Available: {list(COMBINATIONS.keys())}"}
+    if wall_material not in MATERIALS:
+        return {"error": f"Unknown wall material '{wall_material}'. Available: {list(MATERIALS.keys())}"}
+    if isps is None:
+        isps = [STAGE_ISP[combo][0]] + [STAGE_ISP[combo][1]] * (stages - 1)
+    if len(isps) != stages:
+        return {"error": f"Provide {stages} Isp values, got {len(isps)}"}
+    isps = [float(x) for x in isps]
+    total_dv = DELTA_V_TO_ORBIT[orbit]
+    if diameter_m is None:
+        diameter_m = vehicle_size_estimate(payload_kg, orbit, combo)["estimated_diameter_m"]
+    engine_twr = ENGINE_TWR[combo]
+    memo_before = _tank_terms.cache_info()
+    state = {"passes": 0, "error": None}
+
+    def size(sfs):
+        sfs = np.clip(sfs, 0.01, 0.6)
+        staged = optimal_stage_masses(total_dv, isps, [float(x) for x in sfs], payload_kg)
+        if staged is None:
+            state["error"] = (f"Infeasible: {total_dv} km/s to {orbit} does not close with structural "
+                              f"fractions {np.round(sfs, 4).tolist()}")
+            return None
+        split, masses = staged
+        if min(st["propellant_kg"] for st in masses) <= 0:
+            state["error"] = (f"Degenerate staging: a stage carries no propellant at structural fractions "
+                              f"{np.round(sfs, 4).tolist()}; use fewer stages")
+            return None
+        rows = []
+        for i, st in enumerate(masses):
+            tank, length, design_bar = _tank_mass_kg(st["propellant_kg"], combo, float(diameter_m), wall_material,
+                                                     meop_bar, STAGE_AXIAL_G[min(i, 1)])
+            twr = STAGE_TWR[0] if i == 0 else STAGE_TWR[1]
+            engines = twr * st["wet_kg"] / engine_twr
+            structure = tank * (1 + SECONDARY_STRUCTURE) + engines
+            rows.append({"delta_v_kms": split[i], "propellant_kg": st["propellant_kg"], "stack_kg": st["wet_kg"],
+                         "tank_kg": tank, "tank_length_m": length, "design_bar": design_bar, "engines_kg": engines,
+                         "structure_kg": structure, "sf": structure / (structure + st["propellant_kg"])})
+        state["rows"] = rows
+        return rows
+
+    def g(sfs):
+        state["passes"] += 1
+        rows = None if state["error"] else size(sfs)
+        if rows is None:
+            return np.asarray(sfs)  # zero residual stops the solver; error reported below
+        return np.array([r["sf"] for r in rows])
+
+    solver = {"anderson": _anderson, "aitken": _aitken, "none": _plain}.get(accel)
+    if solver is None:
+        return {"error": "accel must be anderson, aitken or none"}
+    x0 = np.full(stages, 0.08)
+    sfs, iterations, converged = solver(g, x0, tol=tol, max_iter=max_iter)
+    if state["error"]:
+        return {"error": state["error"]}
+    rows = size(sfs)
+    if rows is None:
+        return {"error": state["error"]}
+    glow = rows[0]["stack_kg"]
+    memo = _tank_terms.cache_info()
+    return {
+        "payload_kg": payload_kg,
+        "orbit": orbit,
+        "propellant": COMBINATIONS[combo]["name"],
+        "total_delta_v_kms": total_dv,
+        "diameter_m": diameter_m,
+        "wall_material": MATERIALS[wall_material]["name"],
+        "meop_bar": meop_bar,
+        "converged": converged,
+        "acceleration": accel,
+        "iterations": iterations,
+        "sizing_passes": state["passes"],
+        "estimated_glow_kg": round(glow, 0),
+        "estimated_glow_tonnes": round(glow / 1000, 1),
+        "payload_fraction": round(payload_kg / glow, 5),
+        "propellant_mass_kg": round(sum(r["propellant_kg"] for r in rows), 0),
+        "structure_mass_kg": round(sum(r["structure_kg"] for r in rows), 0),
+        "stages": [{
+            "stage": i + 1,
+            "isp_s": isps[i],
+            "delta_v_kms": round(r["delta_v_kms"], 4),
+            "propellant_kg": round(r["propellant_kg"], 0),
+            "tank_mass_kg": round(r["tank_kg"], 1),
+            "tank_length_m": round(r["tank_length_m"], 2),
+            "tank_design_pressure_bar": round(r["design_bar"], 2),
+            "engine_mass_kg": round(r["engines_kg"], 1),
+            "structure_kg": round(r["structure_kg"], 1),
+            "structural_fraction": round(r["sf"], 5),
+        } for i, r in enumerate(rows)],
+        "memo": {
+            "tank_terms_hits": memo.hits - memo_before.hits,
+            "tank_terms_misses": memo.misses - memo_before.misses,
+            "split_cache": split_cache_info(),
+        },
+    }
+
+
+def main(argv=None):
     parser = argparse.ArgumentParser(description="Tank Geometry Calculator")
     sub = parser.add_subparsers(dest="command")
 
@@ -166,27 +781,126 @@ if __name__ == "__main__":
     p_t.add_argument("--fuel", required=True, help="lox-rp1, lox-ch4, lox-lh2, n2o4-udmh")
     p_t.add_argument("--diameter", type=float, required=True, help="Tank diameter in meters")
     p_t.add_argument("--wall", default="aluminum", help="aluminum, steel, cfrp")
+    p_t.add_argument("--meop-bar", type=float, default=None,
+                     help="Size walls from this maximum expected operating pressure instead of 3 mm")
+    p_t.add_argument("--sf-yield", type=float, default=SAFETY_FACTOR_YIELD)
+    p_t.add_argument("--sf-ultimate", type=float, default=SAFETY_FACTOR_ULTIMATE)
+
+    p_tt = sub.add_parser("tank-trade", help="Pressure-sized tank mass across materials × diameters × MEOP")
+    p_tt.add_argument("--propellant-kg", type=float, required=True)
+    p_tt.add_argument("--fuel", required=True, help="lox-rp1, lox-ch4, lox-lh2, n2o4-udmh")
+    p_tt.add_argument("--materials", default="aluminum,steel,cfrp")
+    p_tt.add_argument("--diameters", required=True, help='Diameters (m): "a,b,c" or "start:stop:num"')
+    p_tt.add_argument("--pressures", required=True, help='MEOP (bar): "a,b,c" or "start:stop:num"')
+    p_tt.add_argument("--sf-yield", type=float, default=SAFETY_FACTOR_YIELD)
+    p_tt.add_argument("--sf-ultimate", type=float, default=SAFETY_FACTOR_ULTIMATE)
+    p_tt.add_argument("--output", default=None, help="CSV or NDJSON path for the full grid")
+    p_tt.add_argument("--format", choices=["csv", "ndjson"], default=None)
+
+    p_tb = sub.add_parser("tank-batch", help="Vectorized tank sizing from a CSV/NDJSON table")
+    p_tb.add_argument("--input", required=True, help="Columns: propellant_kg, diameter_m [, wall_thickness_mm]")
+    p_tb.add_argument("--fuel", required=True, help="lox-rp1, lox-ch4, lox-lh2, n2o4-udmh")
+    p_tb.add_argument("--wall", default="aluminum", help="aluminum, steel, cfrp")
+    p_tb.add_argument("--output", default=None, help="CSV or NDJSON output path")
+    p_tb.add_argument("--format", choices=["csv", "ndjson"], default=None)
+
+    p_to = sub.add_parser("tank-optimize", help="Diameter minimizing tank mass or length")
+    p_to.add_argument("--propellant-kg", type=float, required=True)
+    p_to.add_argument("--fuel", required=True, help="One or more comma-separated combinations")
+    p_to.add_argument("--wall", default="aluminum", help="aluminum, steel, cfrp")
+    p_to.add_argument("--objective", choices=["mass", "length"], default="mass")
+    p_to.add_argument("--min-diameter", type=float, default=0.5)
+    p_to.add_argument("--max-diameter", type=float, default=10.0, help="Fairing / vehicle diameter limit (m)")
+    p_to.add_argument("--max-length", type=float, default=None, help="Tank length limit (m)")
+    p_to.add_argument("--min-aspect", type=float, default=None, help="Minimum length/diameter")
+    p_to.add_argument("--max-aspect", type=float, default=None, help="Maximum length/diameter")
+    p_to.add_argument("--meop-bar", type=float, default=None, help="Size walls from pressure (bar)")
 
     p_f = sub.add_parser("fairing", help="Fairing compatibility check")
     p_f.add_argument("--payload-diameter", type=float, required=True)
     p_f.add_argument("--payload-height", type=float, required=True)
 
+    p_fb = sub.add_parser("fairing-batch", help="Fit a manifest of payload envelopes against all fairings")
+    p_fb.add_argument("--input", required=True, help="Columns: payload_diameter_m, payload_height_m")
+    p_fb.add_argument("--vehicle", default=None, help="Only this vehicle's fairings")
+    p_fb.add_argument("--output", default=None, help="CSV or NDJSON output path")
+    p_fb.add_argument("--format", choices=["csv", "ndjson"], default=None)
+
     p_s = sub.add_parser("vehicle-size", help="Quick vehicle sizing from payload")
     p_s.add_argument("--payload-kg", type=float, required=True)
     p_s.add_argument("--orbit", default="LEO")
     p_s.add_argument("--propellant", default="lox-rp1")
+    p_s.add_argument("--closed-loop", action="store_true",
+                     help="Iterate staging → tanks → structural fraction to convergence")
+    p_s.add_argument("--stages", type=int, default=2)
+    p_s.add_argument("--isp", type=str, default=None, help="Comma-separated Isp per stage (s)")
+    p_s.add_argument("--diameter", type=float, default=None, help="Core diameter (m); default ROM estimate")
+    p_s.add_argument("--wall", default="aluminum", help="aluminum, steel, cfrp")
+    p_s.add_argument("--meop-bar", type=float, default=SIZING_DEFAULT_MEOP_BAR)
+    p_s.add_argument("--accel", choices=["anderson", "aitken", "none"], default="anderson")
 
-    args = parser.parse_args()
-    if args.command == "tank":
-        result = tank_sizing(args.propellant_kg, args.fuel, args.diameter, args.wall)
+    args = parser.parse_args(argv)
+    if np is None and args.command in ("tank-batch", "tank-optimize", "tank-trade", "fairing-batch"):
+        print(json.dumps(NUMPY_MISSING, indent=2))
+        sys.exit(1)
+    if args.command == "tank-trade":
+        try:
+            diameters, pressures = parse_axis(args.diameters), parse_axis(args.pressures)
+        except ValueError as exc:
+            result = {"error": str(exc)}
+        else:
+            result = tank_wall_trade(args.propellant_kg, args.fuel, args.materials.split(","), diameters, pressures,
+                                     args.sf_yield, args.sf_ultimate, args.output, args.format)
+        if "error" in result:
+            print(json.dumps(result, indent=2, ensure_ascii=False))
+            sys.exit(1)
+    elif args.command == "tank-batch":
+        result = run_tank_batch(args.input, args.fuel, args.wall, args.output, args.format)
+        if "error" in result:
+            print(json.dumps(result, indent=2, ensure_ascii=False))
+            sys.exit(1)
+    elif args.command == "tank-optimize":
+        result = tank_optimize(args.propellant_kg, args.fuel.split(","), args.wall, objective=args.objective,
+                               min_diameter=args.min_diameter, max_diameter=args.max_diameter,
+                               max_length=args.max_length, min_aspect=args.min_aspect,
+                               max_aspect=args.max_aspect, meop_bar=args.meop_bar)
+        if "error" in result:
+            print(json.dumps(result, indent=2, ensure_ascii=False))
+            sys.exit(1)
+    elif args.command == "tank":
+        result = tank_sizing(args.propellant_kg, args.fuel, args.diameter, args.wall, meop_bar=args.meop_bar,
+                             sf_yield=args.sf_yield, sf_ultimate=args.sf_ultimate)
         if "error" in result:
             print(json.dumps(result, indent=2, ensure_ascii=False))
             sys.exit(1)
     elif args.command == "fairing":
         result = fairing_check(args.payload_diameter, args.payload_height)
+        if "error" in result:
+            print(json.dumps(result, indent=2, ensure_ascii=False))
+            sys.exit(1)
+    elif args.command == "fairing-batch":
+        result = run_fairing_batch(args.input, args.output, args.format, args.vehicle)
+        if "error" in result:
+            print(json.dumps(result, indent=2, ensure_ascii=False))
+            sys.exit(1)
     elif args.command == "vehicle-size":
-        result = vehicle_size_estimate(args.payload_kg, args.orbit, args.propellant)
+        if args.closed_loop:
+            if np is None:
+                print(json.dumps(NUMPY_MISSING, indent=2))
+                sys.exit(1)
+            isps = [float(x) for x in args.isp.split(",")] if args.isp else None
+            result = vehicle_size_closed_loop(args.payload_kg, args.orbit, args.propellant, args.stages,
+                                              args.diameter, args.wall, args.meop_bar, isps, args.accel)
+            if "error" in result:
+                print(json.dumps(result, indent=2, ensure_ascii=False))
+                sys.exit(1)
+        else:
+            result = vehicle_size_estimate(args.payload_kg, args.orbit, args.propellant)
     else:
         parser.print_help()
         sys.exit(0)
     print(json.dumps(result, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
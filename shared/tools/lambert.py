@@ -0,0 +1,223 @@
+"""Lambert Solver & Porkchop Grid — Shared tool for space-engineering pack.
+
+Solves the two-body Lambert problem (universal variables, single revolution)
+vectorized over whole arrays, and evaluates departure-date × time-of-flight
+porkchop grids between planets (C3, arrival v-infinity, total delta-v).
+
+Usage:
+    python lambert.py porkchop Earth Mars --depart-start 2026-09-01 --depart-end 2027-01-31 \\
+        --tof-min 120 --tof-max 400 --n-depart 500 --n-tof 500 --workers 4
+    python lambert.py porkchop Earth Mars --depart-start 2026-09-01 --depart-end 2027-01-31 --output /tmp/pc.npz
+"""
+import argparse
+import json
+import math
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.dirname(__file__))
+from batch_io import np, NUMPY_MISSING
+from trajectory import PLANETS, MOONS, MU_SUN, hohmann_transfer
+from ephemeris import body_state, date_to_jd, jd_to_date, resolve_body
+
+BISECTION_ITERATIONS = 64
+
+
+def _stumpff(z):
+    """Stumpff functions C(z), S(z), valid for any real z (vectorized)."""
+    small = np.abs(z) < 1e-3
+    pos = z > 0
+    sz = np.sqrt(np.abs(z))
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        c_pos = (1 - np.cos(sz)) / z
+        s_pos = (sz - np.sin(sz)) / sz ** 3
+        c_neg = (np.cosh(sz) - 1) / -z
+        s_neg = (np.sinh(sz) - sz) / sz ** 3
+    c_series = 1 / 2 - z / 24 + z ** 2 / 720
+    s_series = 1 / 6 - z / 120 + z ** 2 / 5040
+    c = np.where(small, c_series, np.where(pos, c_pos, c_neg))
+    s = np.where(small, s_series, np.where(pos, s_pos, s_neg))
+    return c, s
+
+
+def lambert(r1, r2, tof_s, mu=MU_SUN, prograde=True):
+    """Vectorized single-revolution Lambert solver (universal variables, bisection on z).
+
+    r1, r2: position vectors (..., 3) in km; tof_s: time of flight (...) in s.
+    Returns (v1, v2, ok) — departure/arrival velocities (..., 3) in km/s and a
+    mask of elements that converged to a valid transfer.
+    """
+    r1 = np.asarray(r1, dtype=float)
+    r2 = np.asarray(r2, dtype=float)
+    r1, r2 = np.broadcast_arrays(r1, r2)
+    tof = np.broadcast_to(np.asarray(tof_s, dtype=float), r1.shape[:-1])
+    r1n = np.linalg.norm(r1, axis=-1)
+    r2n = np.linalg.norm(r2, axis=-1)
+    cos_dtheta = np.clip(np.sum(r1 * r2, axis=-1) / (r1n * r2n), -1.0, 1.0)
+    cross_z = r1[..., 0] * r2[..., 1] - r1[..., 1] * r2[..., 0]
+    dtheta = np.arccos(cos_dtheta)
+    long_way = (cross_z < 0) if prograde else (cross_z >= 0)
+    dtheta = np.where(long_way, 2 * math.pi - dtheta, dtheta)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        A = np.sin(dtheta) * np.sqrt(r1n * r2n / (1 - np.cos(dtheta)))
+    sqrt_mu = math.sqrt(mu)
+
+    def residual(z):
+        c, s = _stumpff(z)
+        with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+            y = r1n + r2n + A * (z * s - 1) / np.sqrt(c)
+            f = (y / c) ** 1.5 * s + A * np.sqrt(y) - sqrt_mu * tof
+        # y < 0 only happens below the root (A > 0 branch): push z upward
+        return np.where(y > 0, f, -np.inf), y, c
+
+    lo = np.full(tof.shape, -4 * math.pi ** 2)
+    hi = np.full(tof.shape, 4 * math.pi ** 2 - 1e-9)
+    # Short hyperbolic arcs can need z below -4π²; widen those brackets
+    for _ in range(8):
+        f_lo, _, _ = residual(lo)
+        too_high = f_lo > 0
+        if not too_high.any():
+            break
+        lo = np.where(too_high, lo * 4, lo)
+    for _ in range(BISECTION_ITERATIONS):
+        mid = 0.5 * (lo + hi)
+        f_mid, _, _ = residual(mid)
+        below = f_mid < 0
+        lo = np.where(below, mid, lo)
+        hi = np.where(below, hi, mid)
+    z = 0.5 * (lo + hi)
+    _, y, _ = residual(z)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        f = 1 - y / r1n
+        g = A * np.sqrt(y / mu)
+        gdot = 1 - y / r2n
+        v1 = (r2 - f[..., None] * r1) / g[..., None]
+        v2 = (gdot[..., None] * r2 - r1) / g[..., None]
+    ok = np.isfinite(v1).all(axis=-1) & np.isfinite(v2).all(axis=-1) & (y > 0) & (np.abs(A) > 1e-6 * r1n)
+    return v1, v2, ok
+
+
+def _porkchop_chunk(args):
+    """Evaluate one block of departure dates (runs in a worker process)."""
+    body_from, body_to, dep_jd, tof_days = args
+    dep = dep_jd[:, None]
+    arr = dep + tof_days[None, :]
+    r1, vp1 = body_state(body_from, dep)
+    r2, vp2 = body_state(body_to, arr)
+    v1, v2, ok = lambert(r1, r2, np.broadcast_to(tof_days[None, :] * 86400, arr.shape))
+    vinf_dep = np.linalg.norm(v1 - vp1, axis=-1)
+    vinf_arr = np.linalg.norm(v2 - vp2, axis=-1)
+    c3 = np.where(ok, vinf_dep ** 2, np.nan)
+    vinf_arr = np.where(ok, vinf_arr, np.nan)
+    return c3, vinf_arr
+
+
+def porkchop_grid(body_from, body_to, dep_jd, tof_days, workers=1):
+    """C3 (km²/s²) and arrival v∞ (km/s) grids of shape (len(dep_jd), len(tof_days)).
+
+    With ``workers`` > 1 the departure axis is split into blocks evaluated in a
+    process pool; each block is itself fully vectorized.
+    """
+    dep_jd = np.asarray(dep_jd, dtype=float)
+    tof_days = np.asarray(tof_days, dtype=float)
+    if workers and workers > 1 and len(dep_jd) > 1:
+        blocks = np.array_split(dep_jd, min(workers * 4, len(dep_jd)))
+        tasks = [(body_from, body_to, b, tof_days) for b in blocks if len(b)]
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            parts = list(pool.map(_porkchop_chunk, tasks))
+        c3 = np.concatenate([p[0] for p in parts], axis=0)
+        vinf_arr = np.concatenate([p[1] for p in parts], axis=0)
+    else:
+        c3, vinf_arr = _porkchop_chunk((body_from, body_to, dep_jd, tof_days))
+    return c3, vinf_arr
+
+
+def porkchop(body_from, body_to, depart_start, depart_end, tof_min_days, tof_max_days,
+             n_depart=200, n_tof=200, workers=1, output_path=None):
+    """Porkchop study: grid summary, optimum cells and optional .npz grid dump."""
+    if np is None:
+        return dict(NUMPY_MISSING)
+    actual_from = resolve_body(body_from)
+    actual_to = resolve_body(body_to)
+    if not actual_from or not actual_to:
+        available = list(PLANETS.keys()) + list(MOONS.keys())
+        return {"error": f"Unknown body. Available: {available}"}
+    if actual_from == actual_to:
+        return {"error": "Same planet — no transfer needed"}
+    try:
+        jd0, jd1 = date_to_jd(depart_start), date_to_jd(depart_end)
+    except ValueError:
+        return {"error": "Invalid date format. Use YYYY-MM-DD"}
+    if jd1 < jd0 or tof_max_days <= tof_min_days or tof_min_days <= 0:
+        return {"error": "Need depart-end >= depart-start and tof-max > tof-min > 0"}
+
+    dep_jd = np.linspace(jd0, jd1, n_depart)
+    tof_days = np.linspace(tof_min_days, tof_max_days, n_tof)
+    c3, vinf_arr = porkchop_grid(actual_from, actual_to, dep_jd, tof_days, workers)
+    dv_total = np.sqrt(c3) + vinf_arr
+
+    def cell(grid):
+        if not np.isfinite(grid).any():
+            return None
+        i, j = np.unravel_index(np.nanargmin(grid), grid.shape)
+        return {
+            "departure_date": jd_to_date(dep_jd[i]),
+            "arrival_date": jd_to_date(dep_jd[i] + tof_days[j]),
+            "tof_days": round(float(tof_days[j]), 1),
+            "c3_km2s2": round(float(c3[i, j]), 3),
+            "v_inf_departure_kms": round(float(math.sqrt(c3[i, j])), 3),
+            "v_inf_arrival_kms": round(float(vinf_arr[i, j]), 3),
+            "delta_v_total_kms": round(float(dv_total[i, j]), 3),
+        }
+
+    result = {
+        "from": body_from.title(),
+        "to": body_to.title(),
+        "grid": {"n_depart": n_depart, "n_tof": n_tof, "cells": n_depart * n_tof,
+                 "valid_cells": int(np.isfinite(c3).sum())},
+        "min_c3": cell(c3),
+        "min_delta_v_total": cell(dv_total),
+        "hohmann_reference": {k: v for k, v in hohmann_transfer(actual_from, actual_to).items()
+                              if k in ("delta_v_total_kms", "transfer_time_days")},
+        "note": "Heliocentric v-infinity only (mean-element ephemeris). Add escape/capture for full budget.",
+    }
+    if output_path:
+        np.savez_compressed(output_path, departure_jd=dep_jd, tof_days=tof_days,
+                            c3_km2s2=c3, v_inf_arrival_kms=vinf_arr, delta_v_total_kms=dv_total)
+        result["output"] = output_path
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Lambert Solver & Porkchop Grid")
+    sub = parser.add_subparsers(dest="command")
+
+    p_p = sub.add_parser("porkchop", help="Departure date × TOF grid of C3 / v-infinity")
+    p_p.add_argument("planet_from")
+    p_p.add_argument("planet_to")
+    p_p.add_argument("--depart-start", required=True, help="YYYY-MM-DD")
+    p_p.add_argument("--depart-end", required=True, help="YYYY-MM-DD")
+    p_p.add_argument("--tof-min", type=float, default=100, help="Minimum time of flight (days)")
+    p_p.add_argument("--tof-max", type=float, default=400, help="Maximum time of flight (days)")
+    p_p.add_argument("--n-depart", type=int, default=200)
+    p_p.add_argument("--n-tof", type=int, default=200)
+    p_p.add_argument("--workers", type=int, default=1, help="Worker processes for the grid")
+    p_p.add_argument("--output", default=None, help="Optional .npz path for the full grids")
+
+    args = parser.parse_args(argv)
+    if args.command == "porkchop":
+        result = porkchop(args.planet_from, args.planet_to, args.depart_start, args.depart_end,
+                          args.tof_min, args.tof_max, args.n_depart, args.n_tof,
+                          args.workers, args.output)
+        if "error" in result:
+            print(json.dumps(result, indent=2, ensure_ascii=False))
+            sys.exit(1)
+    else:
+        parser.print_help()
+        sys.exit(0)
+    print(json.dumps(result, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,320 @@
+"""Low-Thrust Transfer Estimator — Shared tool for space-engineering pack.
+
+Edelbaum's analytic solution for continuous low thrust between circular
+orbits with a combined altitude and inclination change: Δv, time of flight
+and propellant for solar-electric spacecraft. Thrust comes either directly or
+from input power as T = 2ηP / (Isp·g0). Every function is vectorized, so a
+sweep over power × Isp × efficiency (or thrust) grids, or a CSV of design
+variants, evaluates in one pass.
+
+The optional averaged integrator (--integrate) follows the same Edelbaum yaw
+law with RK4 in the accumulated-Δv variable, tracking mass depletion and an
+altitude-dependent thrust fraction (duty cycle, plus worst-case eclipse
+shadowing with --eclipse), so time of flight reflects when the engine is off.
+
+Usage:
+    python lowthrust.py transfer --alt0 400 --alt1 35786 --dinc 28.5 --mass 1800 --power-kw 5 --isp 1800
+    python lowthrust.py transfer --alt0 400 --alt1 35786 --dinc 28.5 --mass 1800 --thrust-mn 250 --isp 1800 \\
+        --integrate --eclipse
+    python lowthrust.py sweep --alt0 400 --alt1 35786 --dinc 28.5 --mass 1800 \\
+        --power-kw 2:20:37 --isp 1200:3000:19 --efficiency 0.55,0.65 --output ep_trade.csv
+    python lowthrust.py batch --input variants.csv --output results.csv
+"""
+import argparse
+import json
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(__file__))
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from batch_io import np, NUMPY_MISSING, read_columns, require_columns, write_columns, summarize_columns, parse_axis
+from constants import G0, MU_EARTH, R_EARTH
+
+EFFICIENCY = 0.6        # thruster total efficiency (jet power / input power)
+INTEGRATOR_STEPS = 400
+
+
+def thrust_from_power(power_kw, isp_s, efficiency=EFFICIENCY):
+    """Thrust (N) of an electric thruster: T = 2ηP / (Isp·g0)."""
+    return 2 * efficiency * np.asarray(power_kw, dtype=float) * 1000 / (np.asarray(isp_s, dtype=float) * G0)
+
+
+def edelbaum_delta_v(v0, v1, dinc_rad):
+    """Edelbaum Δv (same units as v0, v1) for a circle-to-circle transfer with plane change."""
+    return np.sqrt(v0 ** 2 - 2 * v0 * v1 * np.cos(np.pi / 2 * dinc_rad) + v1 ** 2)
+
+
+def _inputs(alt0_km, alt1_km, dinc_deg, mass_kg, isp_s, power_kw, thrust_n, efficiency, duty_cycle):
+    arrays = np.broadcast_arrays(*(np.atleast_1d(np.asarray(x, dtype=float)).ravel() if np.ndim(x)
+                                   else np.atleast_1d(np.asarray(x, dtype=float))
+                                   for x in (alt0_km, alt1_km, dinc_deg, mass_kg, isp_s,
+                                             np.nan if power_kw is None else power_kw,
+                                             np.nan if thrust_n is None else thrust_n,
+                                             efficiency, duty_cycle)))
+    alt0, alt1, dinc, m0, isp, power, thrust, eta, duty = (np.array(a) for a in arrays)
+    thrust = np.where(np.isfinite(thrust), thrust, thrust_from_power(power, isp, eta))
+    return alt0, alt1, dinc, m0, isp, power, thrust, eta, duty
+
+
+def edelbaum_batch(alt0_km, alt1_km, dinc_deg, mass_kg, isp_s, power_kw=None, thrust_n=None,
+                   efficiency=EFFICIENCY, duty_cycle=1.0):
+    """Analytic Edelbaum transfers for broadcast input arrays; returns columnar arrays.
+
+    Give ``thrust_n`` directly or ``power_kw`` (thrust then follows from Isp
+    and efficiency). Rows without a positive thrust, Isp, mass and altitudes
+    are flagged False in ``feasible``.
+    """
+    if np is None:
+        return dict(NUMPY_MISSING)
+    alt0, alt1, dinc, m0, isp, power, thrust, eta, duty = _inputs(
+        alt0_km, alt1_km, dinc_deg, mass_kg, isp_s, power_kw, thrust_n, efficiency, duty_cycle)
+    feasible = (alt0 > 0) & (alt1 > 0) & (m0 > 0) & (isp > 0) & (thrust > 0) & (duty > 0) & (duty <= 1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        v0 = np.sqrt(MU_EARTH / (R_EARTH + alt0))
+        v1 = np.sqrt(MU_EARTH / (R_EARTH + alt1))
+        dv = edelbaum_delta_v(v0, v1, np.radians(dinc)) * 1000  # m/s
+        ve = isp * G0
+        m_prop = m0 * (1 - np.exp(-dv / ve))
+        tof_s = m_prop * ve / thrust / duty  # constant mass flow T/ve
+    nan = np.where(feasible, 1.0, np.nan)
+    return {
+        "alt0_km": alt0,
+        "alt1_km": alt1,
+        "dinc_deg": dinc,
+        "mass_kg": m0,
+        "isp_s": isp,
+        "power_kw": power,
+        "efficiency": eta,
+        "thrust_mn": thrust * 1000 * nan,
+        "delta_v_ms": dv * nan,
+        "propellant_kg": m_prop * nan,
+        "final_mass_kg": (m0 - m_prop) * nan,
+        "tof_days": tof_s / 86400 * nan,
+        "feasible": feasible,
+    }
+
+
+def eclipse_fraction(a_km):
+    """Worst-case (Sun in the orbit plane) shadow fraction of a circular orbit."""
+    return np.arcsin(np.clip(R_EARTH / a_km, 0, 1)) / np.pi
+
+
+def integrate_batch(alt0_km, alt1_km, dinc_deg, mass_kg, isp_s, power_kw=None, thrust_n=None,
+                    efficiency=EFFICIENCY, duty_cycle=1.0, eclipse=False, steps=INTEGRATOR_STEPS):
+    """Orbit-averaged RK4 integration of the Edelbaum steering law; returns columnar arrays.
+
+    The independent variable is accumulated Δv s ∈ [0, Δv_Edelbaum], so every
+    variant takes the same number of steps. State: semi-major axis,
+    inclination, mass and elapsed time (dt/ds = m / (T·on(a)), where on(a) is
+    the duty cycle times the sunlit fraction when ``eclipse`` is set).
+    """
+    if np is None:
+        return dict(NUMPY_MISSING)
+    res = edelbaum_batch(alt0_km, alt1_km, dinc_deg, mass_kg, isp_s, power_kw, thrust_n, efficiency, duty_cycle)
+    alt0, alt1, dinc, m0, isp = (res[k] for k in ("alt0_km", "alt1_km", "dinc_deg", "mass_kg", "isp_s"))
+    feasible = res["feasible"]
+    thrust = np.nan_to_num(res["thrust_mn"]) / 1000
+    duty = np.broadcast_to(np.asarray(duty_cycle, dtype=float), alt0.shape)
+    ve = isp * G0 / 1000  # km/s
+    v0 = np.sqrt(MU_EARTH / (R_EARTH + alt0))
+    v1 = np.sqrt(MU_EARTH / (R_EARTH + alt1))
+    half_turn = np.pi / 2 * np.radians(dinc)
+    beta0 = np.arctan2(np.sin(half_turn), v0 / v1 - np.cos(half_turn))
+    dv_total = np.nan_to_num(res["delta_v_ms"]) / 1000
+    ds = dv_total / steps
+    sign = np.sign(np.radians(dinc))
+
+    def rates(s, y):
+        a, _, m, _ = y
+        v_ref = np.sqrt(np.maximum(v0 ** 2 - 2 * v0 * s * np.cos(beta0) + s ** 2, 1e-12))
+        cos_b = (v0 * np.cos(beta0) - s) / v_ref
+        sin_b = v0 * np.sin(beta0) / v_ref
+        v = np.sqrt(MU_EARTH / a)
+        on = duty * ((1 - eclipse_fraction(a)) if eclipse else 1.0)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            dt = np.where(thrust > 0, m / (thrust / 1000 * on), 0.0)  # thrust N → kg·km/s²
+        return np.stack([2 * a * cos_b / v, sign * 2 / np.pi * sin_b / v, -m / ve, dt])
+
+    y = np.stack([R_EARTH + alt0, np.zeros_like(alt0), m0.astype(float), np.zeros_like(alt0)])
+    for k in range(steps):
+        s = k * ds
+        k1 = rates(s, y)
+        k2 = rates(s + ds / 2, y + ds / 2 * k1)
+        k3 = rates(s + ds / 2, y + ds / 2 * k2)
+        k4 = rates(s + ds, y + ds * k3)
+        y = y + ds / 6 * (k1 + 2 * k2 + 2 * k3 + k4)
+
+    nan = np.where(feasible, 1.0, np.nan)
+    out = dict(res)
+    out["propellant_kg"] = (m0 - y[2]) * nan
+    out["final_mass_kg"] = y[2] * nan
+    out["tof_days"] = y[3] / 86400 * nan
+    out["final_alt_error_km"] = (y[0] - R_EARTH - alt1) * nan
+    out["final_dinc_error_deg"] = (np.degrees(y[1]) - dinc) * nan
+    out["feasible"] = feasible
+    return out
+
+
+def _row(columns, i, digits=3):
+    return {k: (bool(v[i]) if v.dtype == bool else round(float(v[i]), digits)) for k, v in columns.items()}
+
+
+def transfer(alt0_km, alt1_km, dinc_deg, mass_kg, isp_s, power_kw=None, thrust_n=None,
+             efficiency=EFFICIENCY, duty_cycle=1.0, integrate=False, eclipse=False):
+    """One transfer as a rounded dict (analytic, plus the integrated result if requested)."""
+    if np is None:
+        return dict(NUMPY_MISSING)
+    if power_kw is None and thrust_n is None:
+        return {"error": "Give --power-kw or --thrust-mn"}
+    if not 0 < duty_cycle <= 1:
+        return {"error": f"Duty cycle must be in (0, 1] (got {duty_cycle})"}
+    res = edelbaum_batch(alt0_km, alt1_km, dinc_deg, mass_kg, isp_s, power_kw, thrust_n, efficiency, duty_cycle)
+    if not res["feasible"][0]:
+        return {"error": "Altitudes, mass, Isp and thrust/power must all be > 0"}
+    result = _row({k: v for k, v in res.items() if k != "feasible"}, 0)
+    if power_kw is None:
+        result.pop("power_kw")
+        result.pop("efficiency")
+    result["acceleration_mm_s2"] = round(result["thrust_mn"] / mass_kg, 4)
+    if integrate:
+        num = integrate_batch(alt0_km, alt1_km, dinc_deg, mass_kg, isp_s, power_kw, thrust_n,
+                              efficiency, duty_cycle, eclipse)
+        result["integrated"] = {k: round(float(num[k][0]), 3) for k in
+                                ("propellant_kg", "tof_days", "final_alt_error_km", "final_dinc_error_deg")}
+        result["integrated"]["eclipse"] = eclipse
+    return result
+
+
+def _pareto(columns, limit=20):
+    """Non-dominated (tof_days, propellant_kg) rows, fastest first."""
+    tof, prop = columns["tof_days"], columns["propellant_kg"]
+    idx = np.flatnonzero(np.isfinite(tof) & np.isfinite(prop))
+    idx = idx[np.lexsort((prop[idx], tof[idx]))]
+    front = idx[prop[idx] < np.minimum.accumulate(np.concatenate([[np.inf], prop[idx][:-1]]))]
+    step = max(1, -(-len(front) // limit))
+    return [_row({k: v for k, v in columns.items() if k != "feasible"}, i) for i in front[::step]]
+
+
+def _summarize(result, output_path):
+    summary = summarize_columns(result)
+    if output_path:
+        write_columns(output_path, result)
+        summary["output"] = output_path
+    summary["pareto_tof_vs_propellant"] = _pareto(result)
+    return summary
+
+
+def sweep(alt0_km, alt1_km, dinc_deg, mass_kg, isp_axis, power_axis=None, thrust_axis=None,
+          efficiency_axis=(EFFICIENCY,), duty_cycle=1.0, integrate=False, eclipse=False, output_path=None):
+    """Full-factorial sweep over Isp × (power × efficiency | thrust) for one mission."""
+    if np is None:
+        return dict(NUMPY_MISSING)
+    if power_axis is None and thrust_axis is None:
+        return {"error": "Give --power-kw or --thrust-mn axis"}
+    if thrust_axis is not None:
+        isp, thrust = (g.ravel() for g in np.meshgrid(isp_axis, np.asarray(thrust_axis) / 1000, indexing="ij"))
+        power, eta = None, efficiency_axis[0]
+    else:
+        isp, power, eta = (g.ravel() for g in np.meshgrid(isp_axis, power_axis, efficiency_axis, indexing="ij"))
+        thrust = None
+    fn = integrate_batch if integrate else edelbaum_batch
+    kwargs = {"eclipse": eclipse} if integrate else {}
+    result = fn(alt0_km, alt1_km, dinc_deg, mass_kg, isp, power, thrust, eta, duty_cycle, **kwargs)
+    return _summarize(result, output_path)
+
+
+def run_batch(input_path, output_path=None, integrate=False, eclipse=False):
+    """Evaluate a CSV/NDJSON table of design variants."""
+    if np is None:
+        return dict(NUMPY_MISSING)
+    try:
+        columns = read_columns(input_path)
+    except ValueError as exc:
+        return {"error": str(exc)}
+    names = ["alt0_km", "alt1_km", "dinc_deg", "mass_kg", "isp_s"]
+    aliases = {"alt0_km": ["alt0"], "alt1_km": ["alt1"], "dinc_deg": ["dinc"], "mass_kg": ["mass"],
+               "isp_s": ["isp"]}
+    picked, missing = require_columns(columns, names, aliases)
+    if missing:
+        return {"error": f"Missing columns {missing}. Expected: {names} + power_kw or thrust_n"}
+    power = columns.get("power_kw")
+    thrust = columns.get("thrust_n")
+    if thrust is None and "thrust_mn" in columns:
+        thrust = columns["thrust_mn"] / 1000
+    if power is None and thrust is None:
+        return {"error": "Need a power_kw, thrust_n or thrust_mn column"}
+    eta = columns.get("efficiency", EFFICIENCY)
+    duty = columns.get("duty_cycle", 1.0)
+    fn = integrate_batch if integrate else edelbaum_batch
+    kwargs = {"eclipse": eclipse} if integrate else {}
+    return _summarize(fn(*picked, power, thrust, eta, duty, **kwargs), output_path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Low-Thrust Transfer Estimator")
+    sub = parser.add_subparsers(dest="command")
+
+    def mission_args(p):
+        p.add_argument("--alt0", type=float, required=True, help="Initial circular altitude (km)")
+        p.add_argument("--alt1", type=float, required=True, help="Final circular altitude (km)")
+        p.add_argument("--dinc", type=float, default=0.0, help="Inclination change (deg)")
+        p.add_argument("--mass", type=float, required=True, help="Initial spacecraft mass (kg)")
+        p.add_argument("--duty", type=float, default=1.0, help="Thruster duty cycle (0-1]")
+        p.add_argument("--integrate", action="store_true", help="Use the averaged RK4 integrator")
+        p.add_argument("--eclipse", action="store_true", help="No thrust in eclipse (worst-case geometry)")
+
+    p_t = sub.add_parser("transfer", help="One Edelbaum low-thrust transfer")
+    mission_args(p_t)
+    p_t.add_argument("--isp", type=float, required=True)
+    p_t.add_argument("--power-kw", type=float, default=None, help="Thruster input power (kW)")
+    p_t.add_argument("--thrust-mn", type=float, default=None, help="Thrust (mN); overrides --power-kw")
+    p_t.add_argument("--efficiency", type=float, default=EFFICIENCY)
+
+    p_s = sub.add_parser("sweep", help="Grid sweep over Isp × power × efficiency (or thrust)")
+    mission_args(p_s)
+    p_s.add_argument("--isp", required=True, help="Isp axis: a,b,c or start:stop:n")
+    p_s.add_argument("--power-kw", default=None, help="Power axis (kW)")
+    p_s.add_argument("--thrust-mn", default=None, help="Thrust axis (mN); replaces power × efficiency")
+    p_s.add_argument("--efficiency", default=str(EFFICIENCY), help="Efficiency axis")
+    p_s.add_argument("--output", default=None, help="CSV/NDJSON path for every grid point")
+
+    p_b = sub.add_parser("batch", help="Evaluate a CSV/NDJSON table of EP variants")
+    p_b.add_argument("--input", required=True, help="Columns: alt0_km, alt1_km, dinc_deg, mass_kg, isp_s, "
+                                                    "power_kw | thrust_n [, efficiency, duty_cycle]")
+    p_b.add_argument("--output", default=None)
+    p_b.add_argument("--integrate", action="store_true")
+    p_b.add_argument("--eclipse", action="store_true")
+
+    args = parser.parse_args(argv)
+    if np is None and args.command:
+        print(json.dumps(NUMPY_MISSING))
+        sys.exit(1)
+    if args.command == "transfer":
+        thrust = args.thrust_mn / 1000 if args.thrust_mn is not None else None
+        result = transfer(args.alt0, args.alt1, args.dinc, args.mass, args.isp, args.power_kw, thrust,
+                          args.efficiency, args.duty, args.integrate, args.eclipse)
+    elif args.command == "sweep":
+        try:
+            isp = parse_axis(args.isp)
+            power = parse_axis(args.power_kw) if args.power_kw else None
+            thrust = parse_axis(args.thrust_mn) if args.thrust_mn else None
+            eta = parse_axis(args.efficiency)
+        except ValueError as exc:
+            result = {"error": str(exc)}
+        else:
+            result = sweep(args.alt0, args.alt1, args.dinc, args.mass, isp, power, thrust, eta,
+                           args.duty, args.integrate, args.eclipse, args.output)
+    elif args.command == "batch":
+        result = run_batch(args.input, args.output, args.integrate, args.eclipse)
+    else:
+        parser.print_help()
+        sys.exit(0)
+    if "error" in result:
+        print(json.dumps(result, indent=2, ensure_ascii=False))
+        sys.exit(1)
+    print(json.dumps(result, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
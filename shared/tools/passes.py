@@ -0,0 +1,469 @@
+"""Ground-Station Pass Predictor — Shared tool for space-engineering pack.
+
+Predicts AOS/LOS/max-elevation contact windows for many satellites over many
+ground stations. Satellites come from TLEs, a Keplerian element table or a
+Walker shell and are propagated with the secular J2 model in propagator.py.
+
+Pipeline:
+  1. Geometric pre-filter — a station whose latitude exceeds the satellite's
+     inclination plus its coverage half-angle can never see it; those
+     satellite×station pairs are dropped before any propagation.
+  2. Coarse screening — elevations on a fixed time grid (default 60 s),
+     computed as matrix products over (satellite, epoch, station).
+  3. Root refinement — AOS/LOS by bisection inside each bracketing step and
+     time of closest approach by golden-section search, vectorized over all
+     passes at once.
+
+Passes shorter than the screening step can be missed; lower --step-s for
+high-elevation masks or very low orbits.
+
+Usage:
+    python passes.py predict --tle sats.tle --station svalbard --station fairbanks --start 2026-10-18
+    python passes.py predict --walker 53:1000/50/1 --alt 550 --stations stations.json \\
+        --duration-h 24 --workers 4 --output passes.csv
+    python passes.py stations
+"""
+import argparse
+import json
+import math
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(__file__))
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from batch_io import np, NUMPY_MISSING, ColumnWriter, read_columns, require_columns
+from constants import MU_EARTH, R_EARTH_EQ, OMEGA_EARTH, F_EARTH
+from ephemeris import J2000, J2000_JD
+from propagator import j2_rates, make_elements, walker_delta, advance_elements, propagate, propagate_pointwise
+
+# Commercial and agency stations: lat_deg, lon_deg (east), alt_m
+STATIONS = {
+    "svalbard": (78.23, 15.39, 500),
+    "troll": (-72.01, 2.53, 1270),
+    "kiruna": (67.86, 20.96, 400),
+    "inuvik": (68.32, -133.55, 100),
+    "fairbanks": (64.80, -147.65, 150),
+    "wallops": (37.94, -75.46, 10),
+    "south_point": (19.01, -155.66, 370),
+    "singapore": (1.40, 103.83, 20),
+    "hartebeesthoek": (-25.89, 27.69, 1540),
+    "dongara": (-29.05, 115.35, 250),
+    "santiago": (-33.15, -70.67, 720),
+    "awarua": (-46.53, 168.38, 10),
+    "punta_arenas": (-52.94, -70.86, 30),
+    "mcmurdo": (-77.84, 166.67, 150),
+}
+
+MIN_ELEVATION_DEG = 10.0
+STEP_S = 60.0
+CHUNK_SATS = 64
+BISECTION_ITERATIONS = 14  # 60 s bracket → ~4 ms
+GOLDEN_ITERATIONS = 16     # 120 s bracket → ~0.1 s
+_E2 = F_EARTH * (2 - F_EARTH)
+_INV_PHI = (math.sqrt(5) - 1) / 2
+
+
+def parse_time(text):
+    """ISO date or datetime → naive UTC datetime (offsets are converted to UTC)."""
+    dt = datetime.fromisoformat(text.replace("Z", "+00:00"))
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
+    return dt
+
+
+def datetime_to_jd(dt):
+    return J2000_JD + (dt - J2000).total_seconds() / 86400
+
+
+def gmst_rad(jd):
+    """Greenwich mean sidereal angle (rad), UT1 ≈ UTC."""
+    return math.radians((280.46061837 + 360.98564736629 * (jd - J2000_JD)) % 360)
+
+
+def parse_tle(text):
+    """Two- or three-line element sets → (names, epoch datetimes, element columns in degrees)."""
+    lines = [ln.rstrip() for ln in text.splitlines() if ln.strip()]
+    names, epochs, rows = [], [], []
+    i = 0
+    while i < len(lines):
+        name = None
+        if not lines[i].startswith("1 "):
+            name = lines[i].lstrip("0 ").strip()
+            i += 1
+        if i + 1 >= len(lines) or not (lines[i].startswith("1 ") and lines[i + 1].startswith("2 ")):
+            raise ValueError(f"Malformed TLE near line {i + 1}")
+        l1, l2 = lines[i], lines[i + 1]
+        i += 2
+        yy = int(l1[18:20])
+        epoch = datetime(2000 + yy if yy < 57 else 1900 + yy, 1, 1) + timedelta(days=float(l1[20:32]) - 1)
+        rev_per_day = float(l2[52:63])
+        rows.append((rev_per_day, float("0." + l2[26:33].strip()), float(l2[8:16]), float(l2[17:25]),
+                     float(l2[34:42]), float(l2[43:51])))
+        names.append(name or l2[2:7].strip())
+        epochs.append(epoch)
+    return names, epochs, rows
+
+
+def _tle_elements(rows):
+    """TLE mean motion → semi-major axis whose J2-perturbed mean motion matches it."""
+    n_rev, e, inc, raan, argp, m = (np.asarray(col, dtype=float) for col in zip(*rows))
+    n = n_rev * 2 * np.pi / 86400
+    a = np.cbrt(MU_EARTH / n ** 2)
+    _, _, n_bar = j2_rates(a, e, np.radians(inc))
+    a = a * (n_bar / n) ** (2 / 3)
+    return make_elements(a, e, inc, raan, argp, m)
+
+
+def load_satellites(tle_path=None, elements_path=None, walker=None, alt_km=None, start=None):
+    """Satellite names and an element set referred to ``start``; or an error dict."""
+    if tle_path:
+        with open(tle_path, "r", encoding="utf-8") as f:
+            try:
+                names, epochs, rows = parse_tle(f.read())
+            except ValueError as exc:
+                return None, {"error": str(exc)}
+        if not rows:
+            return None, {"error": f"No TLEs in {tle_path}"}
+        elements = _tle_elements(rows)
+        dt = np.array([(start - ep).total_seconds() for ep in epochs])
+        return names, advance_elements(elements, dt)
+    if elements_path:
+        try:
+            cols = read_columns(elements_path)
+        except ValueError as exc:
+            return None, {"error": str(exc)}
+        if "a_km" not in cols and "alt_km" in cols:
+            cols["a_km"] = cols["alt_km"] + R_EARTH_EQ
+        names = ["a_km", "e", "inc_deg", "raan_deg", "argp_deg", "mean_anomaly_deg"]
+        picked, missing = require_columns(cols, names, {"e": ["ecc"], "inc_deg": ["inc"]})
+        if missing:
+            return None, {"error": f"Missing columns {missing}. Expected: {names} (a_km or alt_km)"}
+        elements = make_elements(*picked)
+        return [f"sat-{i}" for i in range(len(elements["a_km"]))], elements
+    if walker:
+        try:
+            inc, rest = walker.split(":")
+            total, planes, phasing = (int(x) for x in rest.split("/"))
+        except ValueError:
+            return None, {"error": f"Walker spec '{walker}' must look like i:t/p/f, e.g. 53:1000/50/1"}
+        if alt_km is None:
+            return None, {"error": "--alt is required with --walker"}
+        if total % planes:
+            return None, {"error": f"Satellite count {total} must be divisible by plane count {planes}"}
+        elements = walker_delta(alt_km, float(inc), total, planes, phasing)
+        return [f"P{i // (total // planes):02d}S{i % (total // planes):02d}" for i in range(total)], elements
+    return None, {"error": "Give satellites with --tle, --elements or --walker"}
+
+
+def load_stations(names=(), stations_path=None, min_el_deg=MIN_ELEVATION_DEG):
+    """Station list of dicts (name, lat_deg, lon_deg, alt_m, min_el_deg); or an error dict."""
+    stations = []
+    if stations_path:
+        with open(stations_path, "r", encoding="utf-8") as f:
+            for entry in json.load(f):
+                stations.append({"name": entry["name"], "lat_deg": float(entry["lat_deg"]),
+                                 "lon_deg": float(entry["lon_deg"]), "alt_m": float(entry.get("alt_m", 0)),
+                                 "min_el_deg": float(entry.get("min_el_deg", min_el_deg))})
+    for spec in names:
+        parts = spec.split(":")
+        key = parts[0].lower().replace(" ", "_").replace("-", "_")
+        if len(parts) == 1:
+            if key not in STATIONS:
+                return {"error": f"Unknown station '{spec}'. Known: {sorted(STATIONS)} or name:lat:lon[:alt_m]"}
+            lat, lon, alt = STATIONS[key]
+        else:
+            try:
+                lat, lon = float(parts[1]), float(parts[2])
+                alt = float(parts[3]) if len(parts) > 3 else 0.0
+            except (IndexError, ValueError):
+                return {"error": f"Station '{spec}' must be name or name:lat:lon[:alt_m]"}
+        stations.append({"name": parts[0], "lat_deg": lat, "lon_deg": lon, "alt_m": alt, "min_el_deg": min_el_deg})
+    if not stations:
+        return {"error": "Give at least one station with --station or --stations"}
+    return stations
+
+
+def _station_geometry(stations):
+    """WGS-84 ECEF positions (S, 3) km, local up vectors (S, 3), sin(min elevation) (S,), geocentric latitude."""
+    lat = np.radians([s["lat_deg"] for s in stations])
+    lon = np.radians([s["lon_deg"] for s in stations])
+    h = np.array([s["alt_m"] for s in stations]) / 1000
+    N = R_EARTH_EQ / np.sqrt(1 - _E2 * np.sin(lat) ** 2)
+    xyz = np.stack([(N + h) * np.cos(lat) * np.cos(lon),
+                    (N + h) * np.cos(lat) * np.sin(lon),
+                    (N * (1 - _E2) + h) * np.sin(lat)], axis=-1)
+    up = np.stack([np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)], axis=-1)
+    sin_min = np.sin(np.radians([s["min_el_deg"] for s in stations]))
+    geocentric_lat = np.arcsin(xyz[:, 2] / np.linalg.norm(xyz, axis=-1))
+    return xyz, up, sin_min, geocentric_lat
+
+
+def visibility_mask(elements, stations):
+    """(N, S) mask of satellite×station pairs that can ever be in view.
+
+    The sub-satellite latitude never exceeds the inclination (or its supplement
+    for retrograde orbits); a station sees at most a coverage half-angle λ
+    beyond that, with λ taken at apogee where it is largest.
+    """
+    _, _, sin_min, geo_lat = _station_geometry(stations)
+    el_min = np.arcsin(sin_min)
+    r_max = (elements["a_km"] * (1 + elements["e"]))[:, None]
+    lam = np.arccos(np.clip(R_EARTH_EQ * np.cos(el_min)[None, :] / r_max, -1, 1)) - el_min[None, :]
+    inc = elements["inc_rad"][:, None]
+    reach = np.minimum(inc, np.pi - inc) + lam
+    return np.abs(geo_lat)[None, :] <= reach
+
+
+def _sin_elevation_grid(pos_eci, theta, st_xyz, st_up):
+    """sin(elevation) (n, M, S) for positions (n, M, 3) at sidereal angles theta (M,)."""
+    c, s = np.cos(theta), np.sin(theta)
+    x = c * pos_eci[..., 0] + s * pos_eci[..., 1]
+    y = -s * pos_eci[..., 0] + c * pos_eci[..., 1]
+    pos = np.stack([x, y, pos_eci[..., 2]], axis=-1)
+    r_dot_up = pos @ st_up.T
+    r_dot_st = pos @ st_xyz.T
+    range_sq = np.sum(pos * pos, axis=-1)[..., None] - 2 * r_dot_st + np.sum(st_xyz * st_xyz, axis=-1)
+    return (r_dot_up - np.sum(st_xyz * st_up, axis=-1)) / np.sqrt(range_sq)
+
+
+def _sin_elevation_points(elements, sat, sta, t, theta0, st_xyz, st_up):
+    """sin(elevation) for K arbitrary (satellite, station, time) triples."""
+    pos = propagate_pointwise(elements, sat, t)
+    theta = theta0 + OMEGA_EARTH * t
+    c, s = np.cos(theta), np.sin(theta)
+    ecef = np.stack([c * pos[:, 0] + s * pos[:, 1], -s * pos[:, 0] + c * pos[:, 1], pos[:, 2]], axis=-1)
+    rho = ecef - st_xyz[sta]
+    return np.sum(rho * st_up[sta], axis=-1) / np.linalg.norm(rho, axis=-1)
+
+
+def _bisect(fn, lo, hi, rising):
+    """Vectorized bisection for the mask crossing in [lo, hi]; ``rising`` marks below→above brackets."""
+    for _ in range(BISECTION_ITERATIONS):
+        mid = 0.5 * (lo + hi)
+        above = fn(mid) > 0
+        go_left = above == rising
+        hi = np.where(go_left, mid, hi)
+        lo = np.where(go_left, lo, mid)
+    return 0.5 * (lo + hi)
+
+
+def _golden_max(fn, lo, hi):
+    """Vectorized golden-section search for the maximum of a unimodal fn on [lo, hi]."""
+    a, b = lo.copy(), hi.copy()
+    c = b - _INV_PHI * (b - a)
+    d = a + _INV_PHI * (b - a)
+    fc, fd = fn(c), fn(d)
+    for _ in range(GOLDEN_ITERATIONS):
+        left = fc > fd
+        b = np.where(left, d, b)
+        a = np.where(left, a, c)
+        new_c = b - _INV_PHI * (b - a)
+        new_d = a + _INV_PHI * (b - a)
+        c, d = np.where(left, new_c, d), np.where(left, c, new_d)
+        f_new = fn(np.where(left, new_c, new_d))
+        fc, fd = np.where(left, f_new, fd), np.where(left, fc, f_new)
+    return 0.5 * (a + b)
+
+
+def _passes_block(args):
+    """Screen and refine one block of satellites; returns pass columns (indices are global)."""
+    elements, sat_offset, stations, mask, t_s, theta0 = args
+    st_xyz, st_up, sin_min, _ = _station_geometry(stations)
+    theta = theta0 + OMEGA_EARTH * t_s
+    n_sat = len(elements["a_km"])
+    out = {k: [] for k in ("sat", "station", "aos_s", "los_s", "tca_s", "max_sin_el")}
+    screened = 0
+    for lo in range(0, n_sat, CHUNK_SATS):
+        hi = min(lo + CHUNK_SATS, n_sat)
+        cols = np.flatnonzero(mask[lo:hi].any(axis=0))  # stations any satellite in the chunk can see
+        if not cols.size:
+            continue
+        chunk = {k: v[lo:hi] for k, v in elements.items()}
+        sin_el = _sin_elevation_grid(propagate(chunk, t_s), theta, st_xyz[cols], st_up[cols])
+        f = (sin_el - sin_min[cols]).transpose(0, 2, 1)        # (n, s, M)
+        f[~mask[lo:hi][:, cols]] = -1.0                          # pruned pairs never rise
+        screened += int(mask[lo:hi][:, cols].sum())
+        above = f > 0
+        n, s, M = above.shape
+        edges = np.diff(np.pad(above.reshape(n * s, M), ((0, 0), (1, 1))).astype(np.int8), axis=1)
+        row_s, start = np.nonzero(edges == 1)  # first in-view sample
+        _, end = np.nonzero(edges == -1)       # first sample back below the mask
+        if not start.size:
+            continue
+        sat = lo + row_s // s
+        sta = cols[row_s % s]
+
+        def fn(t, idx=slice(None)):
+            return (_sin_elevation_points(elements, sat[idx], sta[idx], t, theta0, st_xyz, st_up)
+                    - sin_min[sta[idx]])
+
+        aos = np.full(start.shape, t_s[0])
+        rises = np.flatnonzero(start > 0)  # passes already in progress at t0 keep AOS = t0
+        if rises.size:
+            aos[rises] = _bisect(lambda t: fn(t, rises), t_s[start[rises] - 1], t_s[start[rises]], True)
+        los = np.full(start.shape, t_s[-1])
+        sets = np.flatnonzero(end < M)
+        if sets.size:
+            los[sets] = _bisect(lambda t: fn(t, sets), t_s[end[sets] - 1], t_s[end[sets]], False)
+
+        # Coarse peak sample per pass, then golden-section between its neighbours
+        rows = f.reshape(n * s, M)[row_s]
+        best = start.copy()
+        for j in range(1, int((end - start).max())):
+            idx = np.minimum(start + j, end - 1)
+            better = rows[np.arange(len(idx)), idx] > rows[np.arange(len(idx)), best]
+            best = np.where(better, idx, best)
+        t_lo = np.maximum(t_s[np.maximum(best - 1, 0)], aos)
+        t_hi = np.minimum(t_s[np.minimum(best + 1, M - 1)], los)
+        tca = _golden_max(fn, t_lo, np.maximum(t_hi, t_lo))
+        peak = fn(tca) + sin_min[sta]
+
+        out["sat"].append(sat + sat_offset)
+        out["station"].append(sta)
+        out["aos_s"].append(aos)
+        out["los_s"].append(los)
+        out["tca_s"].append(tca)
+        out["max_sin_el"].append(peak)
+    cols = {k: np.concatenate(v) if v else np.empty(0) for k, v in out.items()}
+    cols["screened_pairs"] = screened
+    return cols
+
+
+def predict_passes(names, elements, stations, start, duration_h=24, step_s=STEP_S, workers=1,
+                   output_path=None, limit=20):
+    """Contact windows for every satellite×station pair over [start, start + duration_h]."""
+    if duration_h <= 0 or step_s <= 0:
+        return {"error": "--duration-h and --step-s must be > 0"}
+    # Sort by inclination so each chunk shares one pruned station subset
+    order = np.argsort(elements["inc_rad"], kind="stable")
+    sorted_el = {k: v[order] for k, v in elements.items()}
+    mask = visibility_mask(sorted_el, stations)
+    t_s = np.arange(0, duration_h * 3600 + 1e-9, step_s)
+    theta0 = gmst_rad(datetime_to_jd(start))
+
+    n_sat = len(order)
+    if workers and workers > 1 and n_sat > CHUNK_SATS:
+        bounds = np.linspace(0, n_sat, min(workers * 4, -(-n_sat // CHUNK_SATS)) + 1).astype(int)
+        jobs = [({k: v[lo:hi] for k, v in sorted_el.items()}, lo, stations, mask[lo:hi], t_s, theta0)
+                for lo, hi in zip(bounds[:-1], bounds[1:]) if hi > lo]
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            parts = list(pool.map(_passes_block, jobs))
+    else:
+        parts = [_passes_block((sorted_el, 0, stations, mask, t_s, theta0))]
+    screened = sum(p.pop("screened_pairs") for p in parts)
+    res = {k: np.concatenate([p[k] for p in parts]) for k in parts[0]}
+    by_aos = np.argsort(res["aos_s"], kind="stable")
+    res = {k: v[by_aos] for k, v in res.items()}
+    sat = order[res["sat"].astype(int)]
+    sta = res["station"].astype(int)
+    duration = res["los_s"] - res["aos_s"]
+    max_el = np.degrees(np.arcsin(np.clip(res["max_sin_el"], -1, 1)))
+
+    epoch = np.datetime64(start, "ms")
+
+    def stamp(t):
+        return np.char.add(np.datetime_as_string(epoch + np.round(t * 1000).astype("timedelta64[ms]"), unit="s"), "Z")
+
+    rows = {
+        "satellite": np.asarray([names[i] for i in sat], dtype=object),
+        "station": np.asarray([stations[i]["name"] for i in sta], dtype=object),
+        "aos_utc": stamp(res["aos_s"]).astype(object),
+        "los_utc": stamp(res["los_s"]).astype(object),
+        "tca_utc": stamp(res["tca_s"]).astype(object),
+        "duration_s": np.round(duration, 1),
+        "max_elevation_deg": np.round(max_el, 2),
+    }
+
+    per_station = {}
+    for i, st in enumerate(stations):
+        sel = sta == i
+        per_station[st["name"]] = {
+            "passes": int(sel.sum()),
+            "contact_min": round(float(duration[sel].sum()) / 60, 1),
+            "satellites_seen": int(np.unique(sat[sel]).size),
+        }
+    total_pairs = n_sat * len(stations)
+    result = {
+        "start_utc": start.strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "duration_h": duration_h,
+        "step_s": step_s,
+        "satellites": n_sat,
+        "stations": len(stations),
+        "pairs": total_pairs,
+        "pairs_pruned": total_pairs - int(mask.sum()),
+        "pairs_screened": screened,
+        "passes": int(len(sat)),
+        "mean_duration_min": round(float(duration.mean()) / 60, 2) if len(sat) else None,
+        "per_station": per_station,
+    }
+    if limit:
+        result["first_passes"] = [{k: (v[i] if v.dtype == object else float(v[i])) for k, v in rows.items()}
+                                  for i in range(min(limit, len(sat)))]
+    if output_path:
+        with ColumnWriter(output_path) as writer:
+            writer.write(rows)
+        result["output"] = output_path
+    return result
+
+
+def list_stations():
+    return {name: {"lat_deg": lat, "lon_deg": lon, "alt_m": alt} for name, (lat, lon, alt) in STATIONS.items()}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Ground-Station Pass Predictor")
+    sub = parser.add_subparsers(dest="command")
+
+    p_p = sub.add_parser("predict", help="AOS/LOS/max-elevation windows for satellites × stations")
+    src = p_p.add_mutually_exclusive_group()
+    src.add_argument("--tle", default=None, help="File of 2- or 3-line element sets")
+    src.add_argument("--elements", default=None,
+                     help="CSV/NDJSON: a_km|alt_km, e, inc_deg, raan_deg, argp_deg, mean_anomaly_deg at --start")
+    src.add_argument("--walker", default=None, help="Walker-delta shell i:t/p/f, e.g. 53:1000/50/1")
+    p_p.add_argument("--alt", type=float, default=None, help="Walker shell altitude (km)")
+    p_p.add_argument("--station", action="append", default=[],
+                     help="Known station name or name:lat:lon[:alt_m] (repeatable)")
+    p_p.add_argument("--stations", default=None,
+                     help="JSON list of {name, lat_deg, lon_deg[, alt_m, min_el_deg]}")
+    p_p.add_argument("--min-el", type=float, default=MIN_ELEVATION_DEG, help="Default elevation mask (deg)")
+    p_p.add_argument("--start", default=None, help="UTC start, ISO date/datetime (default: today 00:00)")
+    p_p.add_argument("--duration-h", type=float, default=24)
+    p_p.add_argument("--step-s", type=float, default=STEP_S, help="Coarse screening step (s)")
+    p_p.add_argument("--workers", type=int, default=1, help="Worker processes")
+    p_p.add_argument("--limit", type=int, default=20, help="Passes to list in the JSON output")
+    p_p.add_argument("--output", default=None, help="CSV/NDJSON path for every pass")
+
+    sub.add_parser("stations", help="List built-in ground stations")
+
+    args = parser.parse_args(argv)
+    if np is None and args.command:
+        print(json.dumps(NUMPY_MISSING))
+        sys.exit(1)
+    if args.command == "predict":
+        start = parse_time(args.start) if args.start else datetime.now(timezone.utc).replace(
+            hour=0, minute=0, second=0, microsecond=0, tzinfo=None)
+        stations = load_stations(args.station, args.stations, args.min_el)
+        names, elements = load_satellites(args.tle, args.elements, args.walker, args.alt, start)
+        if isinstance(stations, dict):
+            result = stations
+        elif names is None:
+            result = elements
+        else:
+            result = predict_passes(names, elements, stations, start, args.duration_h, args.step_s,
+                                    args.workers, args.output, args.limit)
+    elif args.command == "stations":
+        result = list_stations()
+    else:
+        parser.print_help()
+        sys.exit(0)
+    if "error" in result:
+        print(json.dumps(result, indent=2, ensure_ascii=False))
+        sys.exit(1)
+    print(json.dumps(result, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -14,6 +14,7 @@ import os
 # Import from sibling modules
 sys.path.insert(0, os.path.dirname(__file__))
 from trajectory import PLANETS, MOONS, MU_SUN, AU_KM, hohmann_transfer, delta_v_budget
+from catalog import CATALOG, normalize_key
 
 # Lazy import matplotlib to fail gracefully
 try:
@@ -25,17 +26,6 @@ except ImportError:
     print(json.dumps({"error": "matplotlib not installed. Run: pip install matplotlib"}))
     sys.exit(1)
 
-SHARED_DATA = os.path.join(os.path.dirname(__file__), "..", "data")
-
-
-def _load_vehicles():
-    filepath = os.path.join(SHARED_DATA, "vehicles.json")
-    if os.path.exists(filepath):
-        with open(filepath, "r", encoding="utf-8") as f:
-            return json.load(f)
-    return {"vehicles": {}, "engines": {}}
-
-
 def hohmann_plot(planet_from, planet_to, output_path):
     """Top-down view of Hohmann transfer orbit."""
     planet_from = planet_from.title()
@@ -202,12 +192,11 @@ def delta_v_waterfall(destination, reusable=False, output_path="/tmp/plot_output
 
 def trade_matrix(vehicle_names, output_path="/tmp/plot_output.png"):
     """Grouped bar chart comparing vehicles on cost, payload, cost/kg."""
-    data = _load_vehicles()
-    vehicles = data.get("vehicles", {})
+    vehicles = CATALOG.vehicles()
 
     found = []
     for name in vehicle_names:
-        key = name.lower().replace(" ", "_").replace("-", "_")
+        key = CATALOG.resolve_vehicle(name) or normalize_key(name)
         if key in vehicles:
             v = vehicles[key]
             found.append({
@@ -265,7 +254,7 @@ def trade_matrix(vehicle_names, output_path="/tmp/plot_output.png"):
     return {"status": "ok", "output": output_path, "size_bytes": os.path.getsize(output_path)}
 
 
-if __name__ == "__main__":
+def main(argv=None):
     parser = argparse.ArgumentParser(description="Space Engineering Visualization Tool")
     sub = parser.add_subparsers(dest="command")
 
@@ -283,7 +272,7 @@ if __name__ == "__main__":
     p_t.add_argument("--vehicles", nargs="+", required=True)
     p_t.add_argument("--output", default="/tmp/plot_output.png")
 
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
     if args.command == "hohmann-plot":
         result = hohmann_plot(args.planet_from, args.planet_to, args.output)
     elif args.command == "delta-v-waterfall":
@@ -295,3 +284,7 @@ if __name__ == "__main__":
         parser.print_help()
         sys.exit(0)
     print(json.dumps(result, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,266 @@
+"""J2 Orbit Propagator — Shared tool for space-engineering pack.
+
+Secular J2 propagation of Earth orbits: RAAN and argument-of-perigee drift
+plus the J2-corrected mean motion. Constellations are held as
+structure-of-arrays element sets (one NumPy array per element), so N
+satellites × M epochs propagate without a Python loop per satellite, and
+ephemerides stream out in epoch chunks to keep memory flat.
+
+Usage:
+    python propagator.py rates --alt 550 --inc 53
+    python propagator.py sso --alt 550
+    python propagator.py walker --alt 550 --inc 53 --sats 1584 --planes 72 --phasing 1 \\
+        --duration-h 24 --step-s 60 --output /tmp/shell.npy
+"""
+import argparse
+import json
+import math
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(__file__))
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from batch_io import np, NUMPY_MISSING
+from constants import MU_EARTH, R_EARTH_EQ, J2_EARTH
+
+# Required nodal precession for a sun-synchronous orbit: 360° per tropical year
+SSO_RAAN_RATE = 2 * math.pi / (365.2421897 * 86400)  # rad/s
+ELEMENT_KEYS = ("a_km", "e", "inc_rad", "raan_rad", "argp_rad", "mean_anomaly_rad")
+CHUNK_EPOCHS = 64
+
+
+def j2_rates(a_km, e, inc_rad):
+    """Secular J2 rates (rad/s): RAAN drift, perigee drift, perturbed mean motion."""
+    a_km, e, inc_rad = (np.asarray(x, dtype=float) for x in (a_km, e, inc_rad))
+    n = np.sqrt(MU_EARTH / a_km ** 3)
+    p = a_km * (1 - e ** 2)
+    k = 1.5 * J2_EARTH * (R_EARTH_EQ / p) ** 2 * n
+    cos_i, sin_i = np.cos(inc_rad), np.sin(inc_rad)
+    raan_dot = -k * cos_i
+    argp_dot = 0.5 * k * (5 * cos_i ** 2 - 1)
+    mean_motion = n + k * np.sqrt(1 - e ** 2) * (1 - 1.5 * sin_i ** 2)
+    return raan_dot, argp_dot, mean_motion
+
+
+def sso_inclination(alt_km, e=0.0):
+    """Inclination (deg) that makes the orbit sun-synchronous, or None if unreachable."""
+    a = R_EARTH_EQ + alt_km
+    n = math.sqrt(MU_EARTH / a ** 3)
+    p = a * (1 - e ** 2)
+    cos_i = -SSO_RAAN_RATE / (1.5 * J2_EARTH * (R_EARTH_EQ / p) ** 2 * n)
+    if abs(cos_i) > 1:
+        return None
+    return math.degrees(math.acos(cos_i))
+
+
+def make_elements(a_km, e, inc_deg, raan_deg, argp_deg, mean_anomaly_deg):
+    """Structure-of-arrays element set (all arrays broadcast to a common length)."""
+    arrays = np.broadcast_arrays(*(np.atleast_1d(np.asarray(x, dtype=float))
+                                   for x in (a_km, e, inc_deg, raan_deg, argp_deg, mean_anomaly_deg)))
+    a, e, inc, raan, argp, m = (np.array(x) for x in arrays)
+    return {"a_km": a, "e": e, "inc_rad": np.radians(inc), "raan_rad": np.radians(raan),
+            "argp_rad": np.radians(argp), "mean_anomaly_rad": np.radians(m)}
+
+
+def walker_delta(alt_km, inc_deg, total, planes, phasing=1, e=0.0):
+    """Walker-delta i:t/p/f shell as a structure-of-arrays element set."""
+    per_plane = total // planes
+    plane = np.repeat(np.arange(planes), per_plane)
+    slot = np.tile(np.arange(per_plane), planes)
+    raan = 360.0 * plane / planes
+    anomaly = 360.0 * slot / per_plane + 360.0 * phasing * plane / total
+    return make_elements(R_EARTH_EQ + alt_km, e, inc_deg, raan, 0.0, anomaly % 360)
+
+
+def _solve_kepler(M, e, iterations=6):
+    E = M + e * np.sin(M)
+    for _ in range(iterations):
+        E = E - (E - e * np.sin(E) - M) / (1 - e * np.cos(E))
+    return E
+
+
+def _secular_state(a, e, inc, raan0, argp0, m0, t, velocities=False):
+    """Secular-J2 ECI state for broadcastable element/time arrays."""
+    raan_dot, argp_dot, n_bar = j2_rates(a, e, inc)
+    raan = raan0 + raan_dot * t
+    argp = argp0 + argp_dot * t
+    M = np.remainder(m0 + n_bar * t, 2 * np.pi)
+    E = _solve_kepler(M, e)
+    root = np.sqrt(1 - e ** 2)
+    cos_E, sin_E = np.cos(E), np.sin(E)
+    xp = a * (cos_E - e)
+    yp = a * root * sin_E
+
+    cw, sw = np.cos(argp), np.sin(argp)
+    cO, sO = np.cos(raan), np.sin(raan)
+    ci, si = np.cos(inc), np.sin(inc)
+    r11, r12 = cw * cO - sw * sO * ci, -sw * cO - cw * sO * ci
+    r21, r22 = cw * sO + sw * cO * ci, -sw * sO + cw * cO * ci
+    r31, r32 = sw * si, cw * si
+    pos = np.stack([r11 * xp + r12 * yp, r21 * xp + r22 * yp, r31 * xp + r32 * yp], axis=-1)
+    if not velocities:
+        return pos
+    edot = n_bar / (1 - e * cos_E)
+    vxp = -a * sin_E * edot
+    vyp = a * root * cos_E * edot
+    vel = np.stack([r11 * vxp + r12 * vyp, r21 * vxp + r22 * vyp, r31 * vxp + r32 * vyp], axis=-1)
+    return pos, vel
+
+
+def propagate(elements, t_s, velocities=False):
+    """ECI positions (N, M, 3) km — and velocities (km/s) if requested — at times t_s.
+
+    Times are seconds from the element epoch. Element drift is the secular J2
+    solution; every operation is broadcast over (satellite, epoch).
+    """
+    t = np.asarray(t_s, dtype=float)[None, :]
+    return _secular_state(*(elements[k][:, None] for k in ELEMENT_KEYS), t, velocities)
+
+
+def propagate_pointwise(elements, sat_index, t_s):
+    """ECI positions (K, 3) for K arbitrary (satellite index, time) pairs."""
+    sat_index = np.asarray(sat_index)
+    return _secular_state(*(elements[k][sat_index] for k in ELEMENT_KEYS), np.asarray(t_s, dtype=float))
+
+
+def advance_elements(elements, dt_s):
+    """Element set moved forward by dt_s (scalar or per satellite) under secular J2."""
+    dt = np.asarray(dt_s, dtype=float)
+    raan_dot, argp_dot, n_bar = j2_rates(elements["a_km"], elements["e"], elements["inc_rad"])
+    out = dict(elements)
+    out["raan_rad"] = np.remainder(elements["raan_rad"] + raan_dot * dt, 2 * np.pi)
+    out["argp_rad"] = np.remainder(elements["argp_rad"] + argp_dot * dt, 2 * np.pi)
+    out["mean_anomaly_rad"] = np.remainder(elements["mean_anomaly_rad"] + n_bar * dt, 2 * np.pi)
+    return out
+
+
+def propagate_chunks(elements, t_s, chunk_epochs=CHUNK_EPOCHS, dtype=None):
+    """Yield (start_index, t_chunk, positions (N, m, 3)) over consecutive epoch chunks."""
+    t_s = np.asarray(t_s, dtype=float)
+    for start in range(0, len(t_s), chunk_epochs):
+        t_chunk = t_s[start:start + chunk_epochs]
+        pos = propagate(elements, t_chunk)
+        yield start, t_chunk, pos.astype(dtype) if dtype else pos
+
+
+def orbit_rates(alt_km, inc_deg, e=0.0):
+    if alt_km <= 0:
+        return {"error": f"Altitude must be > 0 km (got {alt_km})"}
+    a = R_EARTH_EQ + alt_km
+    raan_dot, argp_dot, n_bar = (float(x) for x in j2_rates(a, e, math.radians(inc_deg)))
+    day = 86400
+    sso_inc = sso_inclination(alt_km, e)
+    return {
+        "altitude_km": alt_km,
+        "inclination_deg": inc_deg,
+        "eccentricity": e,
+        "period_min": round(2 * math.pi / n_bar / 60, 3),
+        "raan_drift_deg_per_day": round(math.degrees(raan_dot) * day, 4),
+        "argp_drift_deg_per_day": round(math.degrees(argp_dot) * day, 4),
+        "sun_synchronous": abs(raan_dot - SSO_RAAN_RATE) / SSO_RAAN_RATE < 0.01,
+        "sso_inclination_deg": round(sso_inc, 3) if sso_inc is not None else None,
+    }
+
+
+def sso(alt_km, e=0.0):
+    inc = sso_inclination(alt_km, e)
+    if inc is None:
+        return {"error": f"No sun-synchronous inclination exists at {alt_km} km"}
+    result = orbit_rates(alt_km, round(inc, 3), e)
+    result["required_raan_drift_deg_per_day"] = round(math.degrees(SSO_RAAN_RATE) * 86400, 4)
+    return result
+
+
+def walker_ephemeris(alt_km, inc_deg, total, planes, phasing, duration_h, step_s,
+                     output_path=None, chunk_epochs=CHUNK_EPOCHS, float32=False):
+    """Propagate a Walker shell and stream positions to a (M, N, 3) .npy memmap."""
+    if alt_km <= 0:
+        return {"error": f"Altitude must be > 0 km (got {alt_km})"}
+    if total < 1 or planes < 1:
+        return {"error": f"Satellite and plane counts must be >= 1 (got {total}/{planes})"}
+    if step_s <= 0 or duration_h < 0:
+        return {"error": f"Step must be > 0 s and duration >= 0 h (got {step_s} s, {duration_h} h)"}
+    if chunk_epochs < 1:
+        return {"error": f"Chunk must be >= 1 epoch (got {chunk_epochs})"}
+    if total % planes:
+        return {"error": f"Satellite count {total} must be divisible by plane count {planes}"}
+    elements = walker_delta(alt_km, inc_deg, total, planes, phasing)
+    t_s = np.arange(0, duration_h * 3600 + 1e-9, step_s)
+    dtype = np.float32 if float32 else np.float64
+    out = None
+    if output_path:
+        out = np.lib.format.open_memmap(output_path, mode="w+", dtype=dtype, shape=(len(t_s), total, 3))
+    r_min, r_max = np.inf, 0.0
+    for start, t_chunk, pos in propagate_chunks(elements, t_s, chunk_epochs, dtype):
+        if out is not None:
+            out[start:start + len(t_chunk)] = pos.transpose(1, 0, 2)
+        r = np.linalg.norm(pos, axis=-1)
+        r_min, r_max = min(r_min, float(r.min())), max(r_max, float(r.max()))
+    if out is not None:
+        out.flush()
+        del out
+    rates = orbit_rates(alt_km, inc_deg)
+    result = {
+        "walker": f"{inc_deg}:{total}/{planes}/{phasing}",
+        "satellites": total,
+        "epochs": len(t_s),
+        "step_s": step_s,
+        "positions": total * len(t_s),
+        "radius_range_km": [round(r_min, 3), round(r_max, 3)],
+        "raan_drift_deg_per_day": rates["raan_drift_deg_per_day"],
+        "period_min": rates["period_min"],
+    }
+    if output_path:
+        result["output"] = output_path
+        result["layout"] = "(epoch, satellite, xyz) km, ECI"
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="J2 Orbit Propagator")
+    sub = parser.add_subparsers(dest="command")
+
+    p_r = sub.add_parser("rates", help="Secular J2 drift rates for one orbit")
+    p_r.add_argument("--alt", type=float, required=True, help="Altitude (km)")
+    p_r.add_argument("--inc", type=float, required=True, help="Inclination (deg)")
+    p_r.add_argument("--ecc", type=float, default=0.0)
+
+    p_s = sub.add_parser("sso", help="Sun-synchronous inclination for an altitude")
+    p_s.add_argument("--alt", type=float, required=True, help="Altitude (km)")
+    p_s.add_argument("--ecc", type=float, default=0.0)
+
+    p_w = sub.add_parser("walker", help="Propagate a Walker-delta shell")
+    p_w.add_argument("--alt", type=float, required=True, help="Altitude (km)")
+    p_w.add_argument("--inc", type=float, required=True, help="Inclination (deg)")
+    p_w.add_argument("--sats", type=int, required=True, help="Total satellites")
+    p_w.add_argument("--planes", type=int, required=True)
+    p_w.add_argument("--phasing", type=int, default=1, help="Walker phasing factor f")
+    p_w.add_argument("--duration-h", type=float, default=24)
+    p_w.add_argument("--step-s", type=float, default=60)
+    p_w.add_argument("--chunk", type=int, default=CHUNK_EPOCHS, help="Epochs per chunk")
+    p_w.add_argument("--float32", action="store_true", help="Store positions as float32")
+    p_w.add_argument("--output", default=None, help=".npy path for the streamed ephemeris")
+
+    args = parser.parse_args(argv)
+    if np is None and args.command:
+        print(json.dumps(NUMPY_MISSING))
+        sys.exit(1)
+    if args.command == "rates":
+        result = orbit_rates(args.alt, args.inc, args.ecc)
+    elif args.command == "sso":
+        result = sso(args.alt, args.ecc)
+    elif args.command == "walker":
+        result = walker_ephemeris(args.alt, args.inc, args.sats, args.planes, args.phasing,
+                                  args.duration_h, args.step_s, args.output, args.chunk, args.float32)
+    else:
+        parser.print_help()
+        sys.exit(0)
+    if "error" in result:
+        print(json.dumps(result, indent=2, ensure_ascii=False))
+        sys.exit(1)
+    print(json.dumps(result, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,237 @@
+"""Resident Tool Server — Shared tool for space-engineering pack.
+
+Hosts every shared tool in one long-running interpreter so repeated calls skip
+interpreter startup, module imports (numpy, matplotlib) and vehicles.json
+parsing; each call still builds its tool's argparse parser (about a
+millisecond). Tools are preloaded at startup (or imported on first use with
+--no-preload) and stay loaded.
+
+Protocol: newline-delimited JSON-RPC 2.0, one request per line.
+    {"jsonrpc": "2.0", "id": 1, "method": "run",
+     "params": {"tool": "trajectory", "argv": ["hohmann", "Earth", "Mars"], "cwd": "/work"}}
+    → {"jsonrpc": "2.0", "id": 1, "result": {"exit_code": 0, "stdout": "...", "stderr": ""}}
+Other methods: "ping", "tools", "shutdown".
+
+Usage:
+    python server.py serve                 # Unix-socket daemon (default socket below)
+    python server.py serve --socket /tmp/space.sock
+    python server.py stdio                 # JSON-RPC over stdin/stdout
+    python server.py status | stop
+    python client.py trajectory hohmann Earth Mars   # thin client, same CLI syntax
+"""
+import argparse
+import contextlib
+import importlib
+import io
+import json
+import os
+import socket
+import socketserver
+import sys
+import threading
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+# tool name → module; "cost" is a short alias for cost_estimator
+TOOLS = {
+    "trajectory": "trajectory",
+    "staging": "staging",
+    "geometry": "geometry",
+    "cost_estimator": "cost_estimator",
+    "cost": "cost_estimator",
+    "timeline": "timeline",
+    "plot": "plot",
+    "lambert": "lambert",
+    "ephemeris": "ephemeris",
+    "ascent": "ascent",
+    "propagator": "propagator",
+    "passes": "passes",
+    "flyby": "flyby",
+    "lowthrust": "lowthrust",
+}
+
+DEFAULT_SOCKET = os.environ.get(
+    "SPACE_TOOLS_SOCKET",
+    os.path.join("/tmp", f"space-tools-{os.getuid() if hasattr(os, 'getuid') else 0}.sock"))
+
+# Tools print to sys.stdout and chdir for relative output paths, so calls are serialized
+_RUN_LOCK = threading.Lock()
+
+
+def tool_module_name(tool):
+    name = os.path.basename(tool)
+    if name.endswith(".py"):
+        name = name[:-3]
+    return TOOLS.get(name)
+
+
+def run_tool(tool, argv, cwd=None):
+    """Run ``tool``'s CLI in-process; returns {"exit_code", "stdout", "stderr"}."""
+    module_name = tool_module_name(tool)
+    if not module_name:
+        return {"exit_code": 2, "stdout": "",
+                "stderr": f"Unknown tool '{tool}'. Available: {sorted(set(TOOLS))}\n"}
+    out, err = io.StringIO(), io.StringIO()
+    code = 0
+    with _RUN_LOCK:
+        prev_cwd, prev_argv = os.getcwd(), sys.argv
+        try:
+            if cwd:
+                os.chdir(cwd)
+            sys.argv = [f"{module_name}.py"] + list(argv)  # argparse derives prog from argv[0]
+            with contextlib.redirect_stdout(out), contextlib.redirect_stderr(err):
+                try:
+                    module = importlib.import_module(module_name)
+                    module.main(list(argv))
+                except SystemExit as exc:
+                    code = exc.code if isinstance(exc.code, int) else (0 if exc.code is None else 1)
+                    if exc.code is not None and not isinstance(exc.code, int):
+                        print(exc.code, file=sys.stderr)
+                except Exception as exc:  # keep the daemon alive on tool bugs
+                    code = 1
+                    print(json.dumps({"error": f"{type(exc).__name__}: {exc}"}), file=sys.stderr)
+        finally:
+            os.chdir(prev_cwd)
+            sys.argv = prev_argv
+    return {"exit_code": code, "stdout": out.getvalue(), "stderr": err.getvalue()}
+
+
+def handle_request(request):
+    """Dispatch one JSON-RPC request dict; returns (response, shutdown_requested)."""
+    rid = request.get("id")
+    method = request.get("method")
+    params = request.get("params") or {}
+    if method == "run":
+        result = run_tool(params.get("tool", ""), params.get("argv", []), params.get("cwd"))
+    elif method == "ping":
+        result = {"status": "ok", "pid": os.getpid(),
+                  "loaded": sorted(m for m in set(TOOLS.values()) if m in sys.modules)}
+    elif method == "tools":
+        result = sorted(set(TOOLS))
+    elif method == "shutdown":
+        return {"jsonrpc": "2.0", "id": rid, "result": {"status": "stopping"}}, True
+    else:
+        return {"jsonrpc": "2.0", "id": rid,
+                "error": {"code": -32601, "message": f"Unknown method '{method}'"}}, False
+    return {"jsonrpc": "2.0", "id": rid, "result": result}, False
+
+
+def _handle_line(line):
+    try:
+        request = json.loads(line)
+    except json.JSONDecodeError as exc:
+        return {"jsonrpc": "2.0", "id": None, "error": {"code": -32700, "message": str(exc)}}, False
+    return handle_request(request)
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self):
+        for raw in self.rfile:
+            if not raw.strip():
+                continue
+            response, stop = _handle_line(raw.decode("utf-8"))
+            self.wfile.write((json.dumps(response) + "\n").encode("utf-8"))
+            self.wfile.flush()
+            if stop:
+                threading.Thread(target=self.server.shutdown, daemon=True).start()
+                return
+
+
+class _Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def _socket_alive(path):
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as s:
+            s.settimeout(1.0)
+            s.connect(path)
+        return True
+    except OSError:
+        return False
+
+
+def serve_socket(path=DEFAULT_SOCKET, preload=True):
+    if os.path.exists(path):
+        if _socket_alive(path):
+            return {"error": f"Server already running on {path}"}
+        os.unlink(path)  # stale socket from a crashed server
+    if preload:
+        for module_name in set(TOOLS.values()):
+            with contextlib.suppress(Exception, SystemExit):
+                importlib.import_module(module_name)
+    old_umask = os.umask(0o177)  # socket is created 0600: no window for other local users
+    try:
+        server = _Server(path, _Handler)
+    finally:
+        os.umask(old_umask)
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        with contextlib.suppress(OSError):
+            os.unlink(path)
+    return {"status": "stopped", "socket": path}
+
+
+def serve_stdio(stdin=None, stdout=None):
+    """JSON-RPC over stdin/stdout (tool output is captured, never mixed into the stream)."""
+    stdin = stdin or sys.stdin
+    stdout = stdout or sys.stdout
+    for line in stdin:
+        if not line.strip():
+            continue
+        response, stop = _handle_line(line)
+        stdout.write(json.dumps(response) + "\n")
+        stdout.flush()
+        if stop:
+            break
+
+
+def call(method, params=None, path=DEFAULT_SOCKET, timeout=None):
+    """Send one request to a running socket server and return the decoded response."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as s:
+        s.settimeout(timeout)
+        s.connect(path)
+        s.sendall((json.dumps({"jsonrpc": "2.0", "id": 1, "method": method,
+                               "params": params or {}}) + "\n").encode("utf-8"))
+        with s.makefile("rb") as f:
+            return json.loads(f.readline().decode("utf-8"))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Resident Tool Server")
+    sub = parser.add_subparsers(dest="command")
+
+    p_s = sub.add_parser("serve", help="Run the Unix-socket daemon in the foreground")
+    p_s.add_argument("--socket", default=DEFAULT_SOCKET)
+    p_s.add_argument("--no-preload", action="store_true", help="Import tools on first use only")
+
+    sub.add_parser("stdio", help="Serve JSON-RPC over stdin/stdout")
+
+    for name, help_text in (("status", "Ping the daemon"), ("stop", "Shut the daemon down")):
+        p = sub.add_parser(name, help=help_text)
+        p.add_argument("--socket", default=DEFAULT_SOCKET)
+
+    args = parser.parse_args(argv)
+    if args.command == "serve":
+        result = serve_socket(args.socket, preload=not args.no_preload)
+    elif args.command == "stdio":
+        serve_stdio()
+        return
+    elif args.command in ("status", "stop"):
+        try:
+            response = call("ping" if args.command == "status" else "shutdown", path=args.socket, timeout=5)
+            result = response.get("result", response)
+        except OSError:
+            result = {"error": f"No server on {args.socket}"}
+    else:
+        parser.print_help()
+        sys.exit(0)
+    print(json.dumps(result, indent=2, ensure_ascii=False))
+    if "error" in result:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
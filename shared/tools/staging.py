@@ -1,29 +1,54 @@
 """Staging Optimizer — Shared tool for space-engineering pack.
 
-Finds optimal delta-v split across stages to minimize GLOW.
+Finds optimal delta-v split across stages to minimize GLOW. The split comes from
+the closed-form Lagrange-multiplier solution of the tandem-staging problem;
+--verify cross-checks it against a numerical SLSQP optimization (scipy), or a
+vectorized hierarchical grid search (--method grid) when scipy is missing.
 
 Usage:
     python staging.py optimize --delta-v 9.4 --stages 2 --isp 282,348 --structural-fraction 0.06,0.08 --payload-kg 22800
+    python staging.py optimize --delta-v 9.4 --stages 3 --isp 290,340,450 --payload-kg 5000 --verify
     python staging.py optimize --delta-v 9.4 --stages 2 --engine merlin_1d,rl10c --payload-kg 5000
+    python staging.py sweep --spec grid.json --workers 4 --output sweep.npy
+    python staging.py engine-search --delta-v 9.4 --stages 2 --payload-kg 15000 --objective cost
+    python staging.py montecarlo --delta-v 9.4 --isp 282,348 --structural-fraction 0.06,0.08 --payload-kg 22800 --samples 1000000 --workers 4
+    python staging.py parallel --spec falcon_heavy.json --counts 0,2,4
+    python staging.py boosters --spec stack.json --delta-v 9.4 --max-boosters 6
 """
 import argparse
+import bisect
+import heapq
 import json
 import math
 import sys
 import os
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.dirname(__file__))
+from batch_io import np, NUMPY_MISSING, ColumnWriter, QuantileSketch, columns_to_lists
+from catalog import CATALOG, normalize_key
+from cost_estimator import ENGINE_DEV_BASE, engine_cost, vehicle_cost
 
 G0 = 9.80665  # m/s²
 
-SHARED_DATA = os.path.join(os.path.dirname(__file__), "..", "data")
+SPLIT_CACHE_SIZE = 4096
+DEFAULT_STRUCTURAL_FRACTION = 0.07
+SWEEP_CHUNK_POINTS = 1 << 16
+SWEEP_INLINE_ROWS = 10000  # without --output, smaller sweeps return their rows inline
+MIN_LIFTOFF_TWR = 1.2
+MIN_UPPER_TWR = 0.6
+MAX_ENGINES_PER_STAGE = 40
 
 
 def _load_engines():
-    filepath = os.path.join(SHARED_DATA, "vehicles.json")
-    if os.path.exists(filepath):
-        with open(filepath, "r", encoding="utf-8") as f:
-            data = json.load(f)
-        return data.get("engines", {})
-    return {}
+    return CATALOG.engines()
+
+
+def _engine_key(name):
+    """Catalog key for an engine key or name alias (normalized name if unknown)."""
+    return CATALOG.resolve_engine(name) or normalize_key(name)
 
 
 def _stage_mass(dv_kms, isp, sf, payload_kg):
@@ -56,78 +81,331 @@ def _stage_mass(dv_kms, isp, sf, payload_kg):
 
 def _compute_glow(dv_split, isps, sfs, payload_kg):
     """Compute GLOW for a given delta-v split (top-down: last stage first)."""
-    n = len(dv_split)
     payload_above = payload_kg
     stages = []
-    for i in range(n - 1, -1, -1):  # From top stage down
+    for i in reversed(range(len(dv_split))):  # From top stage down
         result = _stage_mass(dv_split[i], isps[i], sfs[i], payload_above)
         if result is None:
             return float("inf"), []
-        stages.insert(0, result)
+        stages.append(result)
         payload_above = result["wet_kg"]
+    stages.reverse()
     glow = stages[0]["wet_kg"] if stages else float("inf")
     return glow, stages
 
 
-def optimize_staging(total_dv_kms, n_stages, isps, sfs, payload_kg):
-    """Find optimal delta-v split to minimize GLOW."""
+def _compute_glow_batch(splits, isps, sfs, payload_kg):
+    """GLOW for K candidate splits in one pass; ``splits`` is (K, n_stages) km/s.
+
+    Returns (glow (K,), stages) where stages maps propellant_kg, structure_kg,
+    wet_kg, dry_kg and mass_ratio to (K, n_stages) arrays. Infeasible rows
+    (mass_ratio · sf ≥ 1 on any stage) get GLOW = inf.
+    """
+    splits = np.atleast_2d(np.asarray(splits, dtype=float))
+    c = np.asarray(isps, dtype=float) * G0
+    sf = np.asarray(sfs, dtype=float)
+    mass_ratio = np.exp(splits * 1000 / c)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        prop_per_kg = (mass_ratio - 1) * (1 - sf) / (1 - mass_ratio * sf)  # per kg carried above
+    feasible = (prop_per_kg >= 0).all(axis=1)
+    growth = 1 + prop_per_kg / (1 - sf)  # wet mass per kg carried above
+    # Mass carried above stage i = payload × Π growth of the stages above it
+    above = payload_kg * np.cumprod(np.concatenate([np.ones((len(splits), 1)), growth[:, :0:-1]], axis=1),
+                                    axis=1)[:, ::-1]
+    propellant = above * prop_per_kg
+    structure = sf * propellant / (1 - sf)
+    wet = above + propellant + structure
+    glow = np.where(feasible, wet[:, 0], np.inf)
+    return glow, {"propellant_kg": propellant, "structure_kg": structure, "wet_kg": wet,
+                  "dry_kg": structure + above, "mass_ratio": mass_ratio}
+
+
+def grid_split(total_dv_kms, isps, sfs, payload_kg, points=21, levels=10):
+    """Hierarchical grid search for the GLOW-minimizing split (numpy, no scipy).
+
+    Each level scores a full grid over the first n-1 stage delta-vs (the last
+    stage takes the remainder) with _compute_glow_batch, then shrinks the box
+    to ±2 cells around the best point. Returns (split, glow, evaluations).
+    """
+    n = len(isps)
+    if n == 1:
+        glow, _ = _compute_glow_batch([[total_dv_kms]], isps, sfs, payload_kg)
+        return [total_dv_kms], float(glow[0]), 1
+    lo = np.zeros(n - 1)
+    hi = np.full(n - 1, float(total_dv_kms))
+    best, best_glow, evaluations = None, np.inf, 0
+    for _ in range(levels):
+        axes = [np.linspace(a, b, points) for a, b in zip(lo, hi)]
+        grid = np.stack(np.meshgrid(*axes, indexing="ij"), axis=-1).reshape(-1, n - 1)
+        last = total_dv_kms - grid.sum(axis=1)
+        keep = last >= 0
+        candidates = np.column_stack([grid[keep], last[keep]])
+        glow, _ = _compute_glow_batch(candidates, isps, sfs, payload_kg)
+        evaluations += len(candidates)
+        k = int(np.argmin(glow))
+        if glow[k] < best_glow:
+            best, best_glow = candidates[k], float(glow[k])
+        if best is None:
+            break
+        half = 2 * (hi - lo) / (points - 1)
+        lo = np.clip(best[:-1] - half, 0, total_dv_kms)
+        hi = np.clip(best[:-1] + half, 0, total_dv_kms)
+    return (list(best) if best is not None else None), best_glow, evaluations
+
+
+def lagrange_split(total_dv_kms, isps, sfs, eta0=None, tol=1e-12, max_iter=100):
+    """Exact GLOW-minimizing delta-v split for tandem stages.
+
+    With exhaust velocity c_i and structural fraction ε_i, the optimal stage
+    mass ratios are n_i = (c_i·η − 1) / (c_i·ε_i·η) for the Lagrange multiplier
+    η that satisfies Σ c_i·ln(n_i) = Δv. The left side increases monotonically
+    in η, so a safeguarded Newton iteration on the bracket converges in a few
+    steps. Stages that cannot help (n_i ≤ 1) are clamped to zero delta-v.
+
+    Returns (split_kms, eta, iterations), or None when Δv ≥ Σ c_i·ln(1/ε_i),
+    the limit as payload → 0.
+    """
+    c = [isp * G0 / 1000 for isp in isps]  # km/s
+    if total_dv_kms >= sum(ci * math.log(1 / sf) for ci, sf in zip(c, sfs)):
+        return None
+
+    def ratios(eta):
+        return [(ci * eta - 1) / (ci * sf * eta) for ci, sf in zip(c, sfs)]
+
+    def residual(eta):
+        value, slope = -total_dv_kms, 0.0
+        for ci, n in zip(c, ratios(eta)):
+            if n > 1:
+                value += ci * math.log(n)
+                slope += ci / (eta * (ci * eta - 1))
+        return value, slope
+
+    floors = [1 / (ci * (1 - sf)) for ci, sf in zip(c, sfs)]
+    lo = min(floors)           # every stage at n_i = 1: residual = -Δv
+    hi = 2 * max(floors)
+    while residual(hi)[0] < 0:
+        lo, hi = hi, hi * 2
+    if eta0 is not None and eta0 >= hi:
+        hi = 2 * eta0  # any root for these stages exceeds lo, so a warm start only widens hi
+    eta = eta0 if eta0 is not None and lo < eta0 < hi else 0.5 * (lo + hi)
+    iterations = 0
+    for iterations in range(1, max_iter + 1):
+        value, slope = residual(eta)
+        if abs(value) <= tol * total_dv_kms:
+            break
+        if value < 0:
+            lo = eta
+        else:
+            hi = eta
+        step = eta - value / slope if slope > 0 else None
+        eta = step if step is not None and lo < step < hi else 0.5 * (lo + hi)
+    split = [ci * math.log(n) if n > 1 else 0.0 for ci, n in zip(c, ratios(eta))]
+    return split, eta, iterations
+
+
+class _SplitCache:
+    """LRU cache of optimal splits keyed on (Δv, Isps, structural fractions).
+
+    The optimal split does not depend on payload and every stage mass scales
+    linearly with it, so entries hold the solution for a 1 kg payload. Keys
+    that share Isps and structural fractions are also indexed by Δv, so a miss
+    can warm-start the solver from the nearest cached multiplier.
+    """
+
+    def __init__(self, maxsize=SPLIT_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._by_config = {}  # (isps, sfs) → sorted Δv list
+        self.hits = self.misses = self.warm_starts = 0
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def put(self, key, entry):
+        dv, config = key[0], key[1:]
+        if key not in self._entries:
+            bisect.insort(self._by_config.setdefault(config, []), dv)
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            (old_dv, *old_config), _ = self._entries.popitem(last=False)
+            dvs = self._by_config[tuple(old_config)]
+            dvs.pop(bisect.bisect_left(dvs, old_dv))
+            if not dvs:
+                del self._by_config[tuple(old_config)]
+
+    def nearest_eta(self, key):
+        """Multiplier of the cached entry with the same stages and the closest Δv, or None."""
+        dv, config = key[0], key[1:]
+        dvs = self._by_config.get(config)
+        if not dvs:
+            return None
+        i = bisect.bisect_left(dvs, dv)
+        nearest = min(dvs[max(i - 1, 0):i + 1], key=lambda x: abs(x - dv))
+        return self._entries[(nearest,) + config]["eta"]
+
+    def info(self):
+        return {"hits": self.hits, "misses": self.misses, "warm_starts": self.warm_starts,
+                "size": len(self._entries), "maxsize": self.maxsize}
+
+    def clear(self):
+        self._entries.clear()
+        self._by_config.clear()
+        self.hits = self.misses = self.warm_starts = 0
+
+
+_SPLIT_CACHE = _SplitCache()
+
+
+def split_cache_info():
+    return _SPLIT_CACHE.info()
+
+
+def _cached_split(total_dv_kms, isps, sfs):
+    """Unit-payload optimum for (Δv, Isps, sfs) from the cache, solving on a miss; None if infeasible."""
+    key = (round(total_dv_kms, 9), tuple(float(x) for x in isps), tuple(float(x) for x in sfs))
+    entry = _SPLIT_CACHE.get(key)
+    if entry is not None:
+        return entry, "hit"
+    eta0 = _SPLIT_CACHE.nearest_eta(key)
+    solution = lagrange_split(total_dv_kms, isps, sfs, eta0=eta0)
+    if solution is None:
+        return None, "miss"
+    if eta0 is not None:
+        _SPLIT_CACHE.warm_starts += 1
+    split, eta, iterations = solution
+    unit_glow, unit_stages = _compute_glow(split, isps, sfs, 1.0)
+    equal_split = [total_dv_kms / len(isps)] * len(isps)
+    unit_glow_equal, _ = _compute_glow(equal_split, isps, sfs, 1.0)
+    entry = {"split": split, "eta": eta, "iterations": iterations, "unit_glow": unit_glow,
+             "unit_stages": unit_stages, "unit_glow_equal": unit_glow_equal}
+    _SPLIT_CACHE.put(key, entry)
+    return entry, "warm-start" if eta0 is not None else "miss"
+
+
+def optimal_stage_masses(total_dv_kms, isps, sfs, payload_kg):
+    """Unrounded optimal split and per-stage masses through the split cache; None if infeasible.
+
+    For inner loops (e.g. closed-loop vehicle sizing) that need the raw numbers
+    rather than optimize_staging()'s rounded report.
+    """
+    entry, _ = _cached_split(total_dv_kms, isps, sfs)
+    if entry is None:
+        return None
+    stages = [{k: (v if k == "mass_ratio" else v * payload_kg) for k, v in st.items()}
+              for st in entry["unit_stages"]]
+    return list(entry["split"]), stages
+
+
+def _slsqp_split(total_dv_kms, isps, sfs, payload_kg):
+    """Numerical SLSQP optimum over _compute_glow (verification only; needs scipy)."""
+    from scipy.optimize import minimize
+
+    n_stages = len(isps)
+
+    def objective(x):
+        # x contains n-1 delta-v values; last is computed from constraint
+        dv_split = list(x) + [total_dv_kms - sum(x)]
+        if any(dv < 0.1 for dv in dv_split):
+            return 1e15
+        glow, _ = _compute_glow(dv_split, isps, sfs, payload_kg)
+        return glow
+
+    # Initial guess: proportional to ln(Isp)
+    ln_sum = sum(math.log(isp) for isp in isps)
+    x0 = [total_dv_kms * math.log(isps[i]) / ln_sum for i in range(n_stages - 1)]
+    bounds = [(0.5, total_dv_kms - 0.5)] * (n_stages - 1)
+    constraints = [{"type": "ineq", "fun": lambda x: total_dv_kms - sum(x) - 0.1}]
+    result = minimize(objective, x0, method="SLSQP", bounds=bounds,
+                      constraints=constraints, options={"maxiter": 500, "ftol": 1e-8})
+    return list(result.x) + [total_dv_kms - sum(result.x)]
+
+
+def optimize_staging(total_dv_kms, n_stages, isps, sfs, payload_kg, verify=False, method="lagrange"):
+    """Find optimal delta-v split to minimize GLOW (closed-form Lagrange multiplier).
+
+    Splits are memoized per (Δv, Isps, structural fractions) and rescaled to
+    ``payload_kg``, so payload sweeps only pay for the first call.
+
+    ``method="grid"`` uses the vectorized hierarchical grid search instead.
+    With ``verify`` the result is cross-checked against a numerical SLSQP
+    optimization, or the grid search when scipy is not installed.
+    """
     if len(isps) != n_stages or len(sfs) != n_stages:
         return {"error": f"Must provide {n_stages} Isp and structural-fraction values"}
     if payload_kg <= 0:
         return {"error": "Payload must be > 0 kg"}
     if total_dv_kms <= 0:
         return {"error": "Delta-v must be > 0 km/s"}
+    if any(isp <= 0 for isp in isps) or any(not 0 < sf < 1 for sf in sfs):
+        return {"error": "Isp must be > 0 and structural fractions in (0, 1)"}
 
-    # Check if all Isp equal — use analytical equal split
-    all_equal_isp = all(abs(isp - isps[0]) < 0.1 for isp in isps)
-
-    if all_equal_isp:
-        # Equal split is optimal for equal Isp
-        optimal_split = [total_dv_kms / n_stages] * n_stages
-        method = "analytical (equal Isp)"
-    else:
-        # Numerical optimization with scipy
-        try:
-            from scipy.optimize import minimize
-        except ImportError:
-            # Fallback: proportional to ln(Isp) heuristic
-            ln_sum = sum(math.log(isp) for isp in isps)
-            optimal_split = [total_dv_kms * math.log(isp) / ln_sum for isp in isps]
-            method = "heuristic (scipy not available)"
-            glow_opt, stages_opt = _compute_glow(optimal_split, isps, sfs, payload_kg)
-            return _build_result(optimal_split, isps, sfs, payload_kg, total_dv_kms,
-                                 glow_opt, stages_opt, method)
-
-        def objective(x):
-            # x contains n-1 delta-v values; last is computed from constraint
-            dv_split = list(x) + [total_dv_kms - sum(x)]
-            if any(dv < 0.1 for dv in dv_split):
-                return 1e15
-            glow, _ = _compute_glow(dv_split, isps, sfs, payload_kg)
-            return glow
-
-        # Initial guess: proportional to Isp
-        ln_sum = sum(math.log(isp) for isp in isps)
-        x0 = [total_dv_kms * math.log(isps[i]) / ln_sum for i in range(n_stages - 1)]
-
-        bounds = [(0.5, total_dv_kms - 0.5)] * (n_stages - 1)
-        constraints = [{"type": "ineq", "fun": lambda x: total_dv_kms - sum(x) - 0.1}]
+    if method == "grid":
+        return _optimize_grid(total_dv_kms, n_stages, isps, sfs, payload_kg)
 
-        result = minimize(objective, x0, method="SLSQP", bounds=bounds,
-                          constraints=constraints, options={"maxiter": 500, "ftol": 1e-8})
+    entry, cache_status = _cached_split(total_dv_kms, isps, sfs)
+    if entry is None:
+        dv_max = sum(isp * G0 / 1000 * math.log(1 / sf) for isp, sf in zip(isps, sfs))
+        return {"error": f"Infeasible: {total_dv_kms} km/s exceeds the {dv_max:.3f} km/s these stages "
+                         f"reach even with zero payload"}
+    # Payload-invariant split: every mass scales linearly with the payload
+    optimal_split, eta = entry["split"], entry["eta"]
+    iterations = 0 if cache_status == "hit" else entry["iterations"]  # a hit runs no solver
+    glow_opt = entry["unit_glow"] * payload_kg
+    stages_opt = [{k: (v if k == "mass_ratio" else v * payload_kg) for k, v in st.items()}
+                  for st in entry["unit_stages"]]
+    method = "analytical (Lagrange multiplier)"
 
-        optimal_split = list(result.x) + [total_dv_kms - sum(result.x)]
-        method = "numerical (SLSQP)"
+    # Compare with equal split
+    glow_equal = entry["unit_glow_equal"] * payload_kg
+    mass_saved_pct = (glow_equal - glow_opt) / glow_equal * 100 if math.isfinite(glow_equal) else None
 
-    glow_opt, stages_opt = _compute_glow(optimal_split, isps, sfs, payload_kg)
+    result = _build_result(optimal_split, isps, sfs, payload_kg, total_dv_kms,
+                           glow_opt, stages_opt, method, glow_equal, mass_saved_pct)
+    result["lagrange_multiplier"] = eta
+    result["iterations"] = iterations
+    result["split_cache"] = cache_status
+    if verify:
+        try:
+            numeric = _slsqp_split(total_dv_kms, isps, sfs, payload_kg)
+            label = "numerical (SLSQP)"
+        except ImportError:
+            if np is None:
+                result["verification"] = {"skipped": "neither scipy nor numpy installed"}
+                return result
+            numeric, _, _ = grid_split(total_dv_kms, isps, sfs, payload_kg)
+            label = "numerical (hierarchical grid)"
+        glow_num, _ = _compute_glow(numeric, isps, sfs, payload_kg)
+        result["verification"] = {
+            "method": label,
+            "delta_v_split_kms": [round(dv, 3) for dv in numeric],
+            "glow_kg": round(glow_num, 1),
+            "relative_difference": round((glow_num - glow_opt) / glow_opt, 8),
+        }
+    return result
 
-    # Compare with equal split
-    equal_split = [total_dv_kms / n_stages] * n_stages
-    glow_equal, stages_equal = _compute_glow(equal_split, isps, sfs, payload_kg)
-    mass_saved_pct = (glow_equal - glow_opt) / glow_equal * 100 if glow_equal > 0 else 0
 
-    return _build_result(optimal_split, isps, sfs, payload_kg, total_dv_kms,
-                         glow_opt, stages_opt, method, glow_equal, mass_saved_pct)
+def _optimize_grid(total_dv_kms, n_stages, isps, sfs, payload_kg):
+    if np is None:
+        return dict(NUMPY_MISSING)
+    split, glow, evaluations = grid_split(total_dv_kms, isps, sfs, payload_kg)
+    if split is None or not math.isfinite(glow):
+        return {"error": f"Infeasible: no split of {total_dv_kms} km/s closes with these stages"}
+    _, stages = _compute_glow_batch([split], isps, sfs, payload_kg)
+    stage_list = [{k: float(v[0, i]) for k, v in stages.items()} for i in range(n_stages)]
+    glow_equal, _ = _compute_glow_batch([[total_dv_kms / n_stages] * n_stages], isps, sfs, payload_kg)
+    glow_equal = float(glow_equal[0])
+    mass_saved_pct = (glow_equal - glow) / glow_equal * 100 if math.isfinite(glow_equal) else None
+    result = _build_result(split, isps, sfs, payload_kg, total_dv_kms, glow, stage_list,
+                           "numerical (hierarchical grid)", glow_equal, mass_saved_pct)
+    result["grid_evaluations"] = evaluations
+    return result
 
 
 def _build_result(split, isps, sfs, payload_kg, total_dv, glow, stages, method,
@@ -156,14 +434,694 @@ def _build_result(split, isps, sfs, payload_kg, total_dv, glow, stages, method,
     }
     if glow_equal is not None:
         result["comparison"] = {
-            "equal_split_glow_kg": round(glow_equal, 1),
+            "equal_split_glow_kg": round(glow_equal, 1) if math.isfinite(glow_equal) else None,
             "optimal_glow_kg": round(glow, 1),
-            "mass_saved_pct": round(mass_saved_pct, 2),
+            "mass_saved_pct": round(mass_saved_pct, 2) if mass_saved_pct is not None else None,
         }
     return result
 
 
-if __name__ == "__main__":
+def _axis(spec, name):
+    """Grid axis from a list, a scalar, or {"start", "stop", "num" | "step"}."""
+    if isinstance(spec, dict):
+        if "num" in spec:
+            return np.linspace(spec["start"], spec["stop"], int(spec["num"]))
+        if "step" in spec:
+            return np.arange(spec["start"], spec["stop"] + spec["step"] / 2, spec["step"])
+        raise ValueError(f"Axis '{name}' needs num or step")
+    return np.atleast_1d(np.asarray(spec, dtype=float))
+
+
+def parse_sweep_spec(spec):
+    """Grid spec (dict, JSON text or JSON file path) → (delta_v axis, payload axis, configs)."""
+    if isinstance(spec, str):
+        if os.path.exists(spec):
+            with open(spec, "r", encoding="utf-8") as f:
+                spec = json.load(f)
+        else:
+            spec = json.loads(spec)
+    dv = _axis(spec["delta_v_kms"], "delta_v_kms")
+    payload = _axis(spec["payload_kg"], "payload_kg")
+    if "configs" in spec:
+        raw = [(c["isp"], c.get("structural_fraction", DEFAULT_STRUCTURAL_FRACTION)) for c in spec["configs"]]
+    else:
+        sf = spec.get("structural_fraction", DEFAULT_STRUCTURAL_FRACTION)
+        raw = [(isps, sf) for isps in spec["isp"]]
+    configs = []
+    for isps, sfs in raw:
+        isps = [float(x) for x in isps]
+        sfs = [float(sfs)] * len(isps) if isinstance(sfs, (int, float)) else [float(x) for x in sfs]
+        if len(sfs) != len(isps):
+            raise ValueError(f"Config {isps}: {len(isps)} Isp values but {len(sfs)} structural fractions")
+        configs.append((isps, sfs))
+    return dv, payload, configs
+
+
+def _sweep_chunk(args):
+    """One config × Δv block × every payload (runs in a worker process).
+
+    Each (config, Δv) is solved once; the payload axis is a rescale.
+    """
+    config_index, isps, sfs, dv_block, payloads, max_stages = args
+    n_dv, n_pay = len(dv_block), len(payloads)
+    unit_glow = np.full(n_dv, np.nan)
+    splits = np.full((n_dv, max_stages), np.nan)
+    for k, dv in enumerate(dv_block):
+        entry, _ = _cached_split(float(dv), isps, sfs)
+        if entry is not None and math.isfinite(entry["unit_glow"]):
+            unit_glow[k] = entry["unit_glow"]
+            splits[k, :len(isps)] = entry["split"]
+    glow = (unit_glow[:, None] * payloads[None, :]).ravel()
+    columns = {
+        "config": np.full(n_dv * n_pay, config_index, dtype=int),
+        "stages": np.full(n_dv * n_pay, len(isps), dtype=int),
+        "delta_v_kms": np.repeat(dv_block, n_pay),
+        "payload_kg": np.tile(payloads, n_dv),
+        "glow_kg": glow,
+        "payload_fraction": np.tile(payloads, n_dv) / glow,
+    }
+    for i in range(max_stages):
+        columns[f"dv_stage{i + 1}_kms"] = np.repeat(splits[:, i], n_pay)
+    columns["feasible"] = np.isfinite(glow)
+    return columns
+
+
+def _bounded_map(pool, fn, tasks, window):
+    """Like pool.map but with at most ``window`` tasks in flight, yielding results in order."""
+    pending = []
+    for task in tasks:
+        pending.append(pool.submit(fn, task))
+        if len(pending) >= window:
+            yield pending.pop(0).result()
+    for future in pending:
+        yield future.result()
+
+
+def sweep_staging(spec, output_path=None, workers=1, chunk_points=SWEEP_CHUNK_POINTS):
+    """Optimal staging over Δv × payload × stage configuration, streamed to disk in chunks.
+
+    Rows are ordered config-major, then Δv, then payload. Output goes to
+    CSV/NDJSON through ColumnWriter (config and stages as integers), or to a
+    float64 ``.npy`` memmap of shape (points, columns) for very large sweeps.
+    """
+    if np is None:
+        return dict(NUMPY_MISSING)
+    try:
+        dv_axis, payloads, configs = parse_sweep_spec(spec)
+    except (KeyError, ValueError, TypeError, json.JSONDecodeError) as exc:
+        return {"error": f"Bad sweep spec: {exc}. Expected delta_v_kms, payload_kg and configs "
+                         f"[{{isp, structural_fraction}}] or isp [[...], ...]"}
+    if not configs or not dv_axis.size or not payloads.size:
+        return {"error": "Sweep spec has an empty axis"}
+    if (dv_axis <= 0).any() or (payloads <= 0).any():
+        return {"error": "Delta-v and payload values must be > 0"}
+    for isps, sfs in configs:
+        if any(isp <= 0 for isp in isps) or any(not 0 < sf < 1 for sf in sfs):
+            return {"error": f"Config {isps}: Isp must be > 0 and structural fractions in (0, 1)"}
+
+    max_stages = max(len(isps) for isps, _ in configs)
+    dv_per_chunk = max(1, chunk_points // len(payloads))
+    tasks = [(ci, isps, sfs, dv_axis[k:k + dv_per_chunk], payloads, max_stages)
+             for ci, (isps, sfs) in enumerate(configs)
+             for k in range(0, len(dv_axis), dv_per_chunk)]
+    total = len(configs) * len(dv_axis) * len(payloads)
+    names = (["config", "stages", "delta_v_kms", "payload_kg", "glow_kg", "payload_fraction"]
+             + [f"dv_stage{i + 1}_kms" for i in range(max_stages)] + ["feasible"])
+
+    started = time.time()
+    writer = memmap = None
+    inline = []
+    if output_path and output_path.endswith(".npy"):
+        memmap = np.lib.format.open_memmap(output_path, mode="w+", dtype=np.float64, shape=(total, len(names)))
+    elif output_path:
+        writer = ColumnWriter(output_path)
+    elif total > SWEEP_INLINE_ROWS:
+        return {"error": f"{total} points — pass --output (CSV, NDJSON or .npy) for sweeps above "
+                         f"{SWEEP_INLINE_ROWS} rows"}
+
+    feasible = 0
+    glow_min, glow_max = math.inf, 0.0
+    row = 0
+    try:
+        if workers and workers > 1 and len(tasks) > 1:
+            pool = ProcessPoolExecutor(max_workers=workers)
+            results = _bounded_map(pool, _sweep_chunk, tasks, workers * 2)
+        else:
+            pool = None
+            results = map(_sweep_chunk, tasks)
+        for columns in results:
+            n = len(columns["glow_kg"])
+            ok = columns["feasible"]
+            feasible += int(ok.sum())
+            if ok.any():
+                glow_min = min(glow_min, float(columns["glow_kg"][ok].min()))
+                glow_max = max(glow_max, float(columns["glow_kg"][ok].max()))
+            if memmap is not None:
+                memmap[row:row + n] = np.column_stack([columns[k] for k in names])
+            elif writer is not None:
+                writer.write(columns)
+            else:
+                inline.append(columns)
+            row += n
+    finally:
+        if pool is not None:
+            pool.shutdown()
+        if writer is not None:
+            writer.close()
+        if memmap is not None:
+            memmap.flush()
+            del memmap
+
+    result = {
+        "points": total,
+        "feasible": feasible,
+        "configs": [{"isp_s": isps, "structural_fraction": sfs} for isps, sfs in configs],
+        "delta_v_kms": [round(float(dv_axis.min()), 4), round(float(dv_axis.max()), 4), len(dv_axis)],
+        "payload_kg": [round(float(payloads.min()), 1), round(float(payloads.max()), 1), len(payloads)],
+        "glow_kg": [round(glow_min, 1), round(glow_max, 1)] if feasible else None,
+        "chunks": len(tasks),
+        "elapsed_s": round(time.time() - started, 2),
+    }
+    if output_path:
+        result["output"] = output_path
+        result["columns"] = names
+    else:
+        result["results"] = columns_to_lists({k: np.concatenate([c[k] for c in inline]) for k in names})
+    return result
+
+
+def _cycle_key(cycle):
+    """vehicles.json cycle label → cost_estimator ENGINE_DEV_BASE key."""
+    key = (cycle or "").lower().replace("-", "_").replace(" ", "_")
+    if key.startswith("full_flow"):
+        return "full_flow"
+    if "staged" in key:
+        return "staged"
+    for base in ENGINE_DEV_BASE:
+        if base in key:
+            return base
+    return "gas_generator"
+
+
+def _stage_isp(engine, stage_index):
+    """Effective Isp on a stage: first stage averages sea level and vacuum; None if not usable there."""
+    if stage_index == 0:
+        if "isp_sl_s" not in engine or "thrust_sl_kn" not in engine:
+            return None  # vacuum-only engine cannot lift off
+        return (engine["isp_sl_s"] + engine["isp_vac_s"]) / 2
+    return engine["isp_vac_s"]
+
+
+def _engine_unit_cost_m(engine):
+    # Production cost of one engine; heritage only discounts development, not units
+    return engine_cost(engine["thrust_vac_kn"], _cycle_key(engine.get("cycle")), "new")["unit_cost_first_m"]
+
+
+def _evaluate_assignment(args):
+    """Size one complete engine assignment: split, engine counts from TWR, masses, cost."""
+    keys, engines, sfs, total_dv_kms, payload_kg, min_twr, upper_twr, max_engines = args
+    isps = [_stage_isp(engines[k], i) for i, k in enumerate(keys)]
+    staged = optimize_staging(total_dv_kms, len(keys), isps, sfs, payload_kg)
+    if "error" in staged:
+        return {"engines": list(keys), "feasible": False, "reason": staged["error"]}
+    stages, reasons, engine_cost_m = [], [], 0.0
+    for i, (key, st) in enumerate(zip(keys, staged["stages"])):
+        eng = engines[key]
+        thrust_kn = eng["thrust_sl_kn"] if i == 0 else eng["thrust_vac_kn"]
+        twr_req = min_twr if i == 0 else upper_twr
+        count = max(1, math.ceil(twr_req * st["wet_mass_kg"] * G0 / (thrust_kn * 1000)))
+        engine_mass = count * eng["thrust_vac_kn"] * 1000 / (eng.get("twr", 80) * G0)
+        if count > max_engines:
+            reasons.append(f"stage {i + 1} needs {count} x {key} (max {max_engines})")
+        if engine_mass > st["structure_kg"]:
+            reasons.append(f"stage {i + 1} engines ({engine_mass:.0f} kg) exceed its structure budget "
+                           f"({st['structure_kg']:.0f} kg)")
+        unit = _engine_unit_cost_m(eng)
+        engine_cost_m += count * unit
+        stages.append({
+            "stage": i + 1,
+            "engine": key,
+            "engine_count": count,
+            "isp_s": round(isps[i], 1),
+            "delta_v_kms": st["delta_v_kms"],
+            "wet_mass_kg": st["wet_mass_kg"],
+            "thrust_to_weight": round(count * thrust_kn * 1000 / (st["wet_mass_kg"] * G0), 3),
+            "engine_mass_kg": round(engine_mass, 1),
+        })
+    glow_t = staged["glow_kg"] / 1000
+    production_m = vehicle_cost(glow_t, len(keys))["vehicle_production_m"]
+    return {
+        "engines": list(keys),
+        "feasible": not reasons,
+        "reason": "; ".join(reasons) or None,
+        "glow_kg": staged["glow_kg"],
+        "payload_fraction": staged["payload_fraction"],
+        "engine_cost_m": round(engine_cost_m, 1),
+        "vehicle_cost_m": round(production_m + engine_cost_m, 1),
+        "stages": stages,
+    }
+
+
+def engine_search(total_dv_kms, n_stages, payload_kg, sfs=None, candidates=None, objective="glow",
+                  min_twr=MIN_LIFTOFF_TWR, upper_twr=MIN_UPPER_TWR, max_engines=MAX_ENGINES_PER_STAGE,
+                  top=5, workers=1):
+    """Best per-stage engine assignments from vehicles.json by GLOW or vehicle cost.
+
+    Best-first branch-and-bound over partial assignments (stage 1 upward).
+    A node's lower bound fills every unassigned stage with the highest Isp
+    available there — GLOW only falls as Isp rises, and the payload-invariant
+    split cache makes each bound a rescale. For the cost objective the bound
+    is the GLOW-based production cost of that bound plus one engine per stage
+    at the cheapest admissible unit price. Complete assignments are popped in
+    bound order and sized in parallel batches; the search stops once the
+    next bound cannot beat the k-th best feasible result.
+    """
+    engines = _load_engines()
+    if not engines:
+        return {"error": "No engines in vehicles.json"}
+    names = list(engines) if not candidates else [_engine_key(c) for c in candidates]
+    unknown = [c for c in names if c not in engines]
+    if unknown:
+        return {"error": f"Unknown engine(s) {unknown}. Available: {list(engines)}"}
+    if n_stages < 1 or payload_kg <= 0 or total_dv_kms <= 0:
+        return {"error": "Need stages >= 1, payload > 0 kg and delta-v > 0 km/s"}
+    sfs = list(sfs) if sfs else [DEFAULT_STRUCTURAL_FRACTION] * n_stages
+    if len(sfs) != n_stages:
+        return {"error": f"Must provide {n_stages} structural-fraction values"}
+    if objective not in ("glow", "cost"):
+        return {"error": "Objective must be 'glow' or 'cost'"}
+    if top < 1:
+        return {"error": f"--top must be >= 1 (got {top})"}
+
+    options = [[k for k in names if _stage_isp(engines[k], i) is not None] for i in range(n_stages)]
+    if not all(options):
+        return {"error": "No candidate engine can serve every stage (stage 1 needs sea-level ratings)"}
+    best_isp = [max(_stage_isp(engines[k], i) for k in opts) for i, opts in enumerate(options)]
+    cheapest = [min(_engine_unit_cost_m(engines[k]) for k in opts) for opts in options]
+
+    def bound(partial):
+        isps = [_stage_isp(engines[k], i) for i, k in enumerate(partial)] + best_isp[len(partial):]
+        entry, _ = _cached_split(total_dv_kms, isps, sfs)
+        if entry is None:
+            return math.inf
+        glow = entry["unit_glow"] * payload_kg
+        if objective == "glow":
+            return glow
+        engines_m = (sum(_engine_unit_cost_m(engines[k]) for k in partial) + sum(cheapest[len(partial):]))
+        return vehicle_cost(glow / 1000, n_stages)["vehicle_production_m"] + engines_m
+
+    started = time.time()
+    key_name = "glow_kg" if objective == "glow" else "vehicle_cost_m"
+    heap = [(bound(()), ())]
+    results, infeasible = [], 0
+    expanded = pruned = evaluated = 0
+    batch_size = max(1, workers) * 4
+    pool = ProcessPoolExecutor(max_workers=workers) if workers and workers > 1 else None
+
+    def kth_best():
+        return results[top - 1][key_name] if len(results) >= top else math.inf
+
+    try:
+        while heap:
+            batch = []
+            while heap and len(batch) < batch_size:
+                lb, partial = heapq.heappop(heap)
+                if lb >= kth_best():
+                    pruned += 1 + len(heap)  # every remaining node has an equal or larger bound
+                    heap = []
+                    break
+                if len(partial) == n_stages:
+                    batch.append(partial)
+                    continue
+                expanded += 1
+                for k in options[len(partial)]:
+                    child = partial + (k,)
+                    child_lb = bound(child)
+                    if child_lb < kth_best():
+                        heapq.heappush(heap, (child_lb, child))
+                    else:
+                        pruned += 1
+            if not batch:
+                continue
+            tasks = [(keys, engines, sfs, total_dv_kms, payload_kg, min_twr, upper_twr, max_engines)
+                     for keys in batch]
+            evaluated += len(tasks)
+            for res in (pool.map(_evaluate_assignment, tasks) if pool else map(_evaluate_assignment, tasks)):
+                if res["feasible"]:
+                    results.append(res)
+                else:
+                    infeasible += 1
+            results.sort(key=lambda r: r[key_name])
+            del results[top:]
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    if not results:
+        return {"error": "No feasible engine assignment (check TWR, engine-count and structure limits)"}
+    return {
+        "total_delta_v_kms": total_dv_kms,
+        "payload_kg": payload_kg,
+        "stages": n_stages,
+        "objective": objective,
+        "best": results[0],
+        "ranked": results,
+        "search": {
+            "combinations": math.prod(len(o) for o in options),
+            "nodes_expanded": expanded,
+            "pruned": pruned,
+            "evaluated": evaluated,
+            "infeasible": infeasible,
+            "elapsed_s": round(time.time() - started, 3),
+        },
+        "assumptions": {
+            "structural_fraction": sfs,
+            "stage1_isp": "mean of sea-level and vacuum",
+            "min_liftoff_twr": min_twr,
+            "min_upper_stage_twr": upper_twr,
+            "max_engines_per_stage": max_engines,
+            "cost": "TRANSCOST production from GLOW + engine units priced from thrust and cycle",
+        },
+    }
+
+
+MONTE_CARLO_CHUNK = 1 << 16
+MONTE_CARLO_QUANTILES = (0.05, 0.1, 0.5, 0.9, 0.95, 0.99)
+MONTE_CARLO_DISTS = ("normal", "uniform", "triangular")
+SKETCH_ACCURACY = 0.001  # quantiles within ±0.1 %
+PARALLEL_PROP_POINTS = 64
+PARALLEL_BISECTIONS = 40
+
+
+def _sample(rng, mean, sd, dist, size):
+    """Samples with the given mean and standard deviation, broadcast per stage."""
+    mean = np.asarray(mean, dtype=float)
+    sd = np.asarray(sd, dtype=float)
+    shape = (size, len(mean))
+    if dist == "uniform":
+        return mean + sd * math.sqrt(3) * rng.uniform(-1, 1, shape)
+    if dist == "triangular":
+        return mean + sd * math.sqrt(6) * rng.triangular(-1, 0, 1, shape)
+    return rng.normal(mean, sd, shape)
+
+
+def _montecarlo_chunk(args):
+    """Sample one chunk of Isp/structural-fraction draws and sketch its GLOW (worker process)."""
+    seed, size, split, isps, isp_sd, sfs, sf_sd, dist, payload_kg = args
+    rng = np.random.default_rng(seed)
+    isp = np.maximum(_sample(rng, isps, isp_sd, dist, size), 1e-6)
+    sf = np.clip(_sample(rng, sfs, sf_sd, dist, size), 1e-6, 1 - 1e-6)
+    glow, _ = _compute_glow_batch(np.broadcast_to(split, isp.shape), isp, sf, payload_kg)
+    sketch = QuantileSketch(SKETCH_ACCURACY)
+    sketch.add(glow)
+    return sketch, int(size - np.isfinite(glow).sum())
+
+
+def montecarlo_staging(total_dv_kms, isps, sfs, payload_kg, isp_sd, sf_sd, samples=100000,
+                       dist="normal", seed=0, workers=1, chunk=MONTE_CARLO_CHUNK):
+    """GLOW distribution of the nominal optimal split under Isp and structural-fraction scatter.
+
+    The split is fixed at the deterministic optimum (the design point) and each
+    sample re-sizes the stages at that split. Chunks are drawn from independent
+    child seeds, so results do not depend on ``workers``, and only a mergeable
+    quantile sketch of each chunk ever leaves its worker. Infeasible samples
+    rank as infinite GLOW, so a quantile is None once they exceed 1 - q.
+    """
+    if np is None:
+        return dict(NUMPY_MISSING)
+    if samples < 1 or chunk < 1:
+        return {"error": f"Samples and chunk size must be >= 1 (got {samples}, {chunk})"}
+    n = len(isps)
+    if len(isp_sd) != n or len(sf_sd) != n:
+        return {"error": f"Provide {n} Isp and structural-fraction standard deviations"}
+    if any(sd < 0 for sd in list(isp_sd) + list(sf_sd)):
+        return {"error": "Standard deviations must be >= 0"}
+    if dist not in MONTE_CARLO_DISTS:
+        return {"error": f"Unknown distribution '{dist}'. Use one of {list(MONTE_CARLO_DISTS)}"}
+    nominal = optimize_staging(total_dv_kms, n, isps, sfs, payload_kg)
+    if "error" in nominal:
+        return nominal
+    split = np.array([st["delta_v_kms"] for st in nominal["stages"]])
+    sizes = [min(chunk, samples - k) for k in range(0, samples, chunk)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    tasks = [(s, size, split, isps, isp_sd, sfs, sf_sd, dist, payload_kg) for s, size in zip(seeds, sizes)]
+
+    started = time.time()
+    sketch = QuantileSketch(SKETCH_ACCURACY)
+    infeasible = 0
+    if workers and workers > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for part, bad in _bounded_map(pool, _montecarlo_chunk, tasks, workers * 2):
+                sketch.merge(part)
+                infeasible += bad
+    else:
+        for part, bad in map(_montecarlo_chunk, tasks):
+            sketch.merge(part)
+            infeasible += bad
+
+    glow_nominal = nominal["glow_kg"]
+    quantiles = {}
+    for q in MONTE_CARLO_QUANTILES:
+        value = sketch.quantile(q, above=infeasible)
+        quantiles[f"p{round(q * 100)}"] = round(value, 1) if value is not None and math.isfinite(value) else None
+    return {
+        "total_delta_v_kms": total_dv_kms,
+        "payload_kg": payload_kg,
+        "distribution": dist,
+        "samples": samples,
+        "seed": seed,
+        "delta_v_split_kms": [round(float(dv), 3) for dv in split],
+        "isp_s": {"mean": list(isps), "sd": list(isp_sd)},
+        "structural_fraction": {"mean": list(sfs), "sd": list(sf_sd)},
+        "glow_nominal_kg": glow_nominal,
+        "glow_mean_kg": round(sketch.mean, 1) if sketch.count else None,  # feasible samples only
+        "glow_quantiles_kg": quantiles,
+        "quantile_note": "Over all samples; infeasible ones rank as infinite GLOW (null quantile)",
+        "glow_min_kg": round(sketch.min, 1) if sketch.count else None,
+        "glow_max_kg": round(sketch.max, 1) if sketch.count else None,
+        "p90_margin_pct": (round((quantiles["p90"] - glow_nominal) / glow_nominal * 100, 2)
+                           if quantiles["p90"] is not None else None),
+        "infeasible_fraction": round(infeasible / samples, 6),
+        "sketch": {"relative_accuracy": SKETCH_ACCURACY, "buckets": len(sketch.buckets)},
+        "chunks": len(tasks),
+        "elapsed_s": round(time.time() - started, 2),
+    }
+
+
+def _parallel_element(spec, stage_index, engines_db):
+    """Stack element spec → dict(isp, thrust_kn, propellant_kg, sf) with engines resolved.
+
+    Elements name an ``engine`` from vehicles.json (× ``engines``) or give ``isp``
+    and ``thrust_kn`` directly; first-stage elements (core, boosters) average sea
+    level and vacuum, like engine-search.
+    """
+    el = {"propellant_kg": spec.get("propellant_kg"),
+          "sf": float(spec.get("structural_fraction", DEFAULT_STRUCTURAL_FRACTION))}
+    if el["propellant_kg"] is not None and float(el["propellant_kg"]) < 0:
+        raise ValueError(f"propellant_kg must be >= 0 (got {el['propellant_kg']})")
+    if not 0 < el["sf"] < 1:
+        raise ValueError(f"structural_fraction must be between 0 and 1 (got {el['sf']})")
+    if "engine" in spec:
+        key = _engine_key(spec["engine"])
+        if key not in engines_db:
+            raise ValueError(f"Unknown engine '{spec['engine']}'. Available: {list(engines_db)}")
+        eng = engines_db[key]
+        isp = _stage_isp(eng, stage_index)
+        if isp is None:
+            raise ValueError(f"Engine '{key}' has no sea-level rating and cannot fly a first-stage element")
+        count = int(spec.get("engines", 1))
+        thrust = (eng["thrust_sl_kn"] + eng["thrust_vac_kn"]) / 2 if stage_index == 0 else eng["thrust_vac_kn"]
+        el.update(isp=float(isp), thrust_kn=count * thrust)
+    else:
+        el.update(isp=float(spec["isp"]), thrust_kn=float(spec.get("thrust_kn", 0.0)))
+    if el["isp"] <= 0:
+        raise ValueError(f"isp must be > 0 (got {el['isp']})")
+    if stage_index == 0 and el["thrust_kn"] <= 0:
+        raise ValueError("Core and booster elements need thrust_kn (or an engine) for the parallel burn")
+    return el
+
+
+def parse_parallel_spec(spec):
+    """Parallel-stack spec (dict, JSON text or JSON file path) → (core, booster, uppers, crossfeed, payload)."""
+    if isinstance(spec, str):
+        if os.path.exists(spec):
+            with open(spec, "r", encoding="utf-8") as f:
+                spec = json.load(f)
+        else:
+            spec = json.loads(spec)
+    engines_db = _load_engines()
+    core = _parallel_element(spec["core"], 0, engines_db)
+    booster = _parallel_element(spec["booster"], 0, engines_db)
+    count = spec["booster"].get("count", 2)
+    if isinstance(count, bool) or not isinstance(count, (int, float)) or count != int(count):
+        raise ValueError(f"Booster count must be a whole number (got {count!r})")
+    booster["count"] = int(count)
+    if booster["count"] < 0:
+        raise ValueError(f"Booster count must be >= 0 (got {booster['count']})")
+    uppers = [_parallel_element(u, i + 1, engines_db) for i, u in enumerate(spec.get("upper", []))]
+    return core, booster, uppers, bool(spec.get("crossfeed", False)), spec.get("payload_kg")
+
+
+def _parallel_batch(payload_kg, core, booster, uppers, count, booster_prop_kg, crossfeed=False):
+    """Ideal Δv of a core + N strap-on stack, broadcast over booster count × propellant load.
+
+    Phase 1 burns core and boosters together at the thrust-weighted Isp until the
+    boosters are dry (with crossfeed the core runs on booster propellant and
+    separates full); the booster structure is dropped, the core finishes alone,
+    then the upper stages burn in series. Returns a dict of arrays; ``feasible``
+    is False where the core runs dry before the boosters do.
+    """
+    count = np.asarray(count, dtype=float)
+    prop_b = np.asarray(booster_prop_kg, dtype=float)
+    count, prop_b = np.broadcast_arrays(count, prop_b)
+    mdot_c = core["thrust_kn"] * 1000 / (core["isp"] * G0)
+    mdot_b = booster["thrust_kn"] * 1000 / (booster["isp"] * G0)
+    prop_c = float(core["propellant_kg"])
+    struct_c = prop_c * core["sf"] / (1 - core["sf"])
+    struct_b = prop_b * booster["sf"] / (1 - booster["sf"])
+
+    # Upper stages, top down, as a fixed mass above the core
+    above = float(payload_kg)
+    upper_dv = 0.0
+    upper_rows = []
+    for u in reversed(uppers):
+        prop_u = float(u["propellant_kg"])
+        wet_u = prop_u / (1 - u["sf"])
+        dv_u = u["isp"] * G0 * math.log((above + wet_u) / (above + wet_u - prop_u)) / 1000
+        upper_rows.append({"isp_s": u["isp"], "propellant_kg": prop_u, "wet_mass_kg": round(wet_u, 1),
+                           "delta_v_kms": round(dv_u, 4)})
+        upper_dv += dv_u
+        above += wet_u
+    upper_rows.reverse()
+
+    active = (count > 0) & (prop_b > 0)
+    thrust = np.where(active, count * booster["thrust_kn"], 0.0) + core["thrust_kn"]  # empty boosters don't fire
+    flow = np.where(active, count * mdot_b, 0.0) + mdot_c
+    isp_parallel = thrust * 1000 / (flow * G0)
+    if crossfeed:
+        t_b = np.where(active, count * prop_b / flow, 0.0)
+        core_used = np.zeros_like(t_b)
+    else:
+        t_b = np.where(active, prop_b / mdot_b, 0.0)
+        core_used = mdot_c * t_b
+    m0 = above + prop_c + struct_c + count * (prop_b + struct_b)
+    m1 = m0 - count * prop_b - core_used
+    core_left = prop_c - core_used
+    m2 = m1 - count * struct_b
+    with np.errstate(invalid="ignore", divide="ignore"):
+        dv1 = isp_parallel * G0 * np.log(m0 / m1) / 1000
+        dv2 = core["isp"] * G0 * np.log(m2 / np.maximum(m2 - core_left, 1e-9)) / 1000
+    feasible = core_left >= 0
+    return {
+        "booster_count": count,
+        "booster_propellant_kg": prop_b,
+        "glow_kg": m0,
+        "liftoff_twr": thrust * 1000 / (m0 * G0),
+        "parallel_burn_s": t_b,
+        "parallel_isp_s": isp_parallel,
+        "delta_v_parallel_kms": np.where(feasible, dv1, np.nan),
+        "delta_v_core_kms": np.where(feasible, dv2, np.nan),
+        "delta_v_upper_kms": np.full(count.shape, upper_dv),
+        "delta_v_kms": np.where(feasible, dv1 + dv2 + upper_dv, np.nan),
+        "payload_fraction": payload_kg / m0,
+        "feasible": feasible,
+        "upper_stages": upper_rows,
+    }
+
+
+def evaluate_parallel(spec, counts=None, booster_props=None, payload_kg=None):
+    """Evaluate a parallel stack over every (booster count, propellant load) combination."""
+    if np is None:
+        return dict(NUMPY_MISSING)
+    try:
+        core, booster, uppers, crossfeed, spec_payload = parse_parallel_spec(spec)
+    except (KeyError, ValueError, TypeError, json.JSONDecodeError) as exc:
+        return {"error": f"Invalid parallel-stack spec: {exc}"}
+    payload_kg = payload_kg if payload_kg is not None else spec_payload
+    if payload_kg is None or core["propellant_kg"] is None:
+        return {"error": "Parallel stack needs payload_kg and a core propellant_kg"}
+    counts = np.atleast_1d(counts if counts is not None else booster["count"]).astype(float)
+    props = np.atleast_1d(booster_props if booster_props is not None
+                          else booster["propellant_kg"] or 0.0).astype(float)
+    if (counts < 0).any() or (props < 0).any():
+        return {"error": "Booster counts and propellant loads must be >= 0"}
+    c, p = np.meshgrid(counts, props, indexing="ij")
+    res = _parallel_batch(payload_kg, core, booster, uppers, c.ravel(), p.ravel(), crossfeed)
+    uppers_out = res.pop("upper_stages")
+    rows = columns_to_lists({k: np.round(v, 4) if v.dtype.kind == "f" else v for k, v in res.items()})
+    return {
+        "payload_kg": payload_kg,
+        "crossfeed": crossfeed,
+        "core": {"isp_s": round(core["isp"], 1), "thrust_kn": round(core["thrust_kn"], 1),
+                 "propellant_kg": core["propellant_kg"]},
+        "booster": {"isp_s": round(booster["isp"], 1), "thrust_kn": round(booster["thrust_kn"], 1)},
+        "upper_stages": uppers_out,
+        "combinations": len(c.ravel()),
+        "results": rows,
+    }
+
+
+def optimize_boosters(spec, total_dv_kms, payload_kg=None, max_boosters=6, max_booster_prop_kg=None,
+                      min_twr=MIN_LIFTOFF_TWR, points=PARALLEL_PROP_POINTS):
+    """Lightest (booster count, booster propellant load) that reaches ``total_dv_kms``.
+
+    Every count 0..max_boosters is scored on a propellant grid in one batch; the
+    first load per count that closes is then bisected to the boundary, all
+    counts at once. GLOW grows with load, so the boundary is the lightest stack.
+    """
+    if np is None:
+        return dict(NUMPY_MISSING)
+    try:
+        core, booster, uppers, crossfeed, spec_payload = parse_parallel_spec(spec)
+    except (KeyError, ValueError, TypeError, json.JSONDecodeError) as exc:
+        return {"error": f"Invalid parallel-stack spec: {exc}"}
+    payload_kg = payload_kg if payload_kg is not None else spec_payload
+    if payload_kg is None or core["propellant_kg"] is None:
+        return {"error": "Parallel stack needs payload_kg and a core propellant_kg"}
+    if max_boosters < 0 or (max_booster_prop_kg is not None and max_booster_prop_kg <= 0):
+        return {"error": "max_boosters must be >= 0 and max_booster_prop_kg > 0"}
+    max_prop = float(max_booster_prop_kg or 2 * core["propellant_kg"])
+    counts = np.arange(max_boosters + 1, dtype=float)
+
+    def closes(res):
+        return res["feasible"] & (res["delta_v_kms"] >= total_dv_kms) & (res["liftoff_twr"] >= min_twr)
+
+    grid = np.linspace(0.0, max_prop, points)
+    res = _parallel_batch(payload_kg, core, booster, uppers, counts[:, None], grid[None, :], crossfeed)
+    ok = closes(res)
+    has = ok.any(axis=1)
+    first = np.argmax(ok, axis=1)
+    hi = grid[first]
+    lo = np.where(first > 0, grid[np.maximum(first - 1, 0)], 0.0)
+    for _ in range(PARALLEL_BISECTIONS):
+        mid = (lo + hi) / 2
+        good = closes(_parallel_batch(payload_kg, core, booster, uppers, counts, mid, crossfeed))
+        hi = np.where(good, mid, hi)
+        lo = np.where(good, lo, mid)
+    hi = np.where(counts == 0, 0.0, hi)  # no boosters → no booster propellant
+    best = _parallel_batch(payload_kg, core, booster, uppers, counts, hi, crossfeed)
+    uppers_out = best.pop("upper_stages")
+    options = []
+    for i in np.flatnonzero(has):
+        row = {k: (round(float(v[i]), 4) if v.dtype.kind == "f" else bool(v[i])) for k, v in best.items()}
+        row["booster_count"] = int(counts[i])
+        options.append(row)
+    if not options:
+        return {"error": f"No stack with up to {max_boosters} boosters and {max_prop:.0f} kg each "
+                         f"reaches {total_dv_kms} km/s at liftoff TWR ≥ {min_twr}"}
+    options.sort(key=lambda r: r["glow_kg"])
+    return {
+        "total_delta_v_kms": total_dv_kms,
+        "payload_kg": payload_kg,
+        "crossfeed": crossfeed,
+        "upper_stages": uppers_out,
+        "best": options[0],
+        "options": options,
+        "evaluations": len(counts) * (points + PARALLEL_BISECTIONS + 1),
+    }
+
+
+def main(argv=None):
     parser = argparse.ArgumentParser(description="Staging Optimizer")
     sub = parser.add_subparsers(dest="command")
 
@@ -176,9 +1134,117 @@ if __name__ == "__main__":
     p_o.add_argument("--engine", type=str, default=None,
                      help="Comma-separated engine names from vehicles.json")
     p_o.add_argument("--payload-kg", type=float, required=True)
+    p_o.add_argument("--verify", action="store_true",
+                     help="Cross-check the closed-form split with SLSQP (grid search without scipy)")
+    p_o.add_argument("--method", choices=["lagrange", "grid"], default="lagrange",
+                     help="Closed-form solver or vectorized hierarchical grid search (numpy)")
+
+    p_s = sub.add_parser("sweep", help="Optimal staging over a Δv × payload × configuration grid")
+    p_s.add_argument("--spec", required=True,
+                     help='Grid spec JSON (file or inline): {"delta_v_kms": [...] | {"start", "stop", "num"}, '
+                          '"payload_kg": ..., "configs": [{"isp": [...], "structural_fraction": ...}]}')
+    p_s.add_argument("--output", default=None, help="CSV, NDJSON or .npy (memmap) path")
+    p_s.add_argument("--workers", type=int, default=1, help="Worker processes")
+    p_s.add_argument("--chunk-points", type=int, default=SWEEP_CHUNK_POINTS, help="Grid points per chunk")
 
-    args = parser.parse_args()
-    if args.command == "optimize":
+    p_e = sub.add_parser("engine-search", help="Best per-stage engine assignment from vehicles.json")
+    p_e.add_argument("--delta-v", type=float, required=True, help="Total delta-v in km/s")
+    p_e.add_argument("--stages", type=int, required=True, help="Number of stages")
+    p_e.add_argument("--payload-kg", type=float, required=True)
+    p_e.add_argument("--structural-fraction", type=str, default=None,
+                     help="Comma-separated structural fraction per stage (default 0.07)")
+    p_e.add_argument("--engines", type=str, default=None, help="Restrict to these engine names")
+    p_e.add_argument("--objective", choices=["glow", "cost"], default="glow")
+    p_e.add_argument("--min-twr", type=float, default=MIN_LIFTOFF_TWR, help="Liftoff thrust-to-weight")
+    p_e.add_argument("--upper-twr", type=float, default=MIN_UPPER_TWR, help="Upper-stage ignition TWR")
+    p_e.add_argument("--max-engines", type=int, default=MAX_ENGINES_PER_STAGE, help="Engines per stage cap")
+    p_e.add_argument("--top", type=int, default=5)
+    p_e.add_argument("--workers", type=int, default=1, help="Worker processes for candidate sizing")
+
+    p_p = sub.add_parser("parallel", help="Evaluate a core + strap-on booster stack")
+    p_p.add_argument("--spec", required=True,
+                     help='Stack JSON (file or inline): {"payload_kg", "crossfeed", "core": {...}, '
+                          '"booster": {..., "count"}, "upper": [{...}]}; elements take engine + engines '
+                          'or isp + thrust_kn, plus propellant_kg and structural_fraction')
+    p_p.add_argument("--counts", type=str, default=None, help="Comma-separated booster counts to evaluate")
+    p_p.add_argument("--booster-prop", type=str, default=None,
+                     help="Comma-separated booster propellant loads (kg) to evaluate")
+    p_p.add_argument("--payload-kg", type=float, default=None)
+
+    p_b = sub.add_parser("boosters", help="Optimize booster count and propellant load for a Δv target")
+    p_b.add_argument("--spec", required=True, help="Stack JSON as for parallel (booster propellant is sized)")
+    p_b.add_argument("--delta-v", type=float, required=True, help="Total delta-v in km/s")
+    p_b.add_argument("--payload-kg", type=float, default=None)
+    p_b.add_argument("--max-boosters", type=int, default=6)
+    p_b.add_argument("--max-booster-prop", type=float, default=None,
+                     help="Upper bound on propellant per booster (kg, default 2× core)")
+    p_b.add_argument("--min-twr", type=float, default=MIN_LIFTOFF_TWR, help="Liftoff thrust-to-weight")
+
+    p_m = sub.add_parser("montecarlo", help="GLOW quantiles under Isp and structural-fraction uncertainty")
+    p_m.add_argument("--delta-v", type=float, required=True, help="Total delta-v in km/s")
+    p_m.add_argument("--isp", type=str, required=True, help="Comma-separated mean Isp per stage (s)")
+    p_m.add_argument("--structural-fraction", type=str, default=None,
+                     help="Comma-separated mean structural fraction per stage")
+    p_m.add_argument("--payload-kg", type=float, required=True)
+    p_m.add_argument("--isp-sd", type=str, default="3", help="Isp standard deviation (s), one or per stage")
+    p_m.add_argument("--sf-sd", type=str, default="0.005",
+                     help="Structural-fraction standard deviation, one or per stage")
+    p_m.add_argument("--dist", choices=MONTE_CARLO_DISTS, default="normal")
+    p_m.add_argument("--samples", type=int, default=100000)
+    p_m.add_argument("--seed", type=int, default=0)
+    p_m.add_argument("--workers", type=int, default=1, help="Worker processes")
+    p_m.add_argument("--chunk", type=int, default=MONTE_CARLO_CHUNK, help="Samples per chunk")
+
+    args = parser.parse_args(argv)
+    if np is None and args.command in ("sweep", "parallel", "boosters", "montecarlo"):
+        print(json.dumps(NUMPY_MISSING, indent=2))
+        sys.exit(1)
+    if args.command == "montecarlo":
+        isps = [float(x) for x in args.isp.split(",")]
+        n = len(isps)
+        sfs = ([float(x) for x in args.structural_fraction.split(",")] if args.structural_fraction
+               else [DEFAULT_STRUCTURAL_FRACTION] * n)
+        isp_sd = [float(x) for x in args.isp_sd.split(",")]
+        sf_sd = [float(x) for x in args.sf_sd.split(",")]
+        result = montecarlo_staging(args.delta_v, isps, sfs, args.payload_kg,
+                                    isp_sd * n if len(isp_sd) == 1 else isp_sd,
+                                    sf_sd * n if len(sf_sd) == 1 else sf_sd,
+                                    args.samples, args.dist, args.seed, args.workers, args.chunk)
+        if "error" in result:
+            print(json.dumps(result, indent=2, ensure_ascii=False))
+            sys.exit(1)
+        print(json.dumps(result, indent=2, ensure_ascii=False))
+    elif args.command == "parallel":
+        counts = [int(x) for x in args.counts.split(",")] if args.counts else None
+        props = [float(x) for x in args.booster_prop.split(",")] if args.booster_prop else None
+        result = evaluate_parallel(args.spec, counts, props, args.payload_kg)
+        if "error" in result:
+            print(json.dumps(result, indent=2, ensure_ascii=False))
+            sys.exit(1)
+        print(json.dumps(result, indent=2, ensure_ascii=False))
+    elif args.command == "boosters":
+        result = optimize_boosters(args.spec, args.delta_v, args.payload_kg, args.max_boosters,
+                                   args.max_booster_prop, args.min_twr)
+        if "error" in result:
+            print(json.dumps(result, indent=2, ensure_ascii=False))
+            sys.exit(1)
+        print(json.dumps(result, indent=2, ensure_ascii=False))
+    elif args.command == "engine-search":
+        sfs = [float(x) for x in args.structural_fraction.split(",")] if args.structural_fraction else None
+        result = engine_search(args.delta_v, args.stages, args.payload_kg, sfs,
+                               args.engines.split(",") if args.engines else None, args.objective,
+                               args.min_twr, args.upper_twr, args.max_engines, args.top, args.workers)
+        if "error" in result:
+            print(json.dumps(result, indent=2, ensure_ascii=False))
+            sys.exit(1)
+        print(json.dumps(result, indent=2, ensure_ascii=False))
+    elif args.command == "sweep":
+        result = sweep_staging(args.spec, args.output, args.workers, args.chunk_points)
+        if "error" in result:
+            print(json.dumps(result, indent=2, ensure_ascii=False))
+            sys.exit(1)
+        print(json.dumps(result, indent=2, ensure_ascii=False))
+    elif args.command == "optimize":
         n = args.stages
 
         if args.engine:
@@ -190,7 +1256,7 @@ if __name__ == "__main__":
                 sys.exit(1)
             isps = []
             for ename in engine_names:
-                key = ename.lower().replace(" ", "_").replace("-", "_")
+                key = _engine_key(ename)
                 if key not in engines_db:
                     print(json.dumps({"error": f"Unknown engine '{ename}'. Available: {list(engines_db.keys())}"}))
                     sys.exit(1)
@@ -200,18 +1266,18 @@ if __name__ == "__main__":
             if args.structural_fraction:
                 sfs = [float(x) for x in args.structural_fraction.split(",")]
             else:
-                sfs = [0.07] * n
+                sfs = [DEFAULT_STRUCTURAL_FRACTION] * n
         elif args.isp:
             isps = [float(x) for x in args.isp.split(",")]
             if args.structural_fraction:
                 sfs = [float(x) for x in args.structural_fraction.split(",")]
             else:
-                sfs = [0.07] * n
+                sfs = [DEFAULT_STRUCTURAL_FRACTION] * n
         else:
             print(json.dumps({"error": "Provide either --isp or --engine"}))
             sys.exit(1)
 
-        result = optimize_staging(args.delta_v, n, isps, sfs, args.payload_kg)
+        result = optimize_staging(args.delta_v, n, isps, sfs, args.payload_kg, args.verify, args.method)
         if "error" in result:
             print(json.dumps(result, indent=2, ensure_ascii=False))
             sys.exit(1)
@@ -219,3 +1285,7 @@ if __name__ == "__main__":
     else:
         parser.print_help()
         sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
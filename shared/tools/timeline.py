@@ -2,6 +2,7 @@
 
 Usage:
     python timeline.py plan --launch-date 2027-03-15 --destination Mars --payload-kg 1000
+    python timeline.py plan --launch-date 2027-03-15 --destination Mars --launch-window
     python timeline.py gantt --launch-date 2027-03-15 --destination Mars --output /tmp/timeline.png
 """
 import argparse
@@ -32,14 +33,41 @@ OPS_DURATION = {
 PARKING_ORBIT_DAYS = 0.1  # ~2.4 hours (typical 1-2 orbits)
 
 
-def mission_plan(launch_date_str, destination, payload_kg=None):
-    """Generate mission timeline with phases."""
+def _next_launch_window(destination, launch_date):
+    """First Earth-departure window on/after launch_date (None if unavailable)."""
+    try:
+        from ephemeris import launch_windows
+    except ImportError:
+        return None
+    end = launch_date + timedelta(days=800)  # > longest synodic period (Mars, ~780 d)
+    found = launch_windows("Earth", destination, launch_date.strftime("%Y-%m-%d"),
+                           end.strftime("%Y-%m-%d"))
+    if "error" in found or not found["windows"]:
+        return None
+    window = dict(found["windows"][0])
+    window["days_after_requested_date"] = (
+        datetime.strptime(window["departure_date"], "%Y-%m-%d") - launch_date).days
+    return window
+
+
+def mission_plan(launch_date_str, destination, payload_kg=None, launch_window=False):
+    """Generate mission timeline with phases.
+
+    With ``launch_window`` an interplanetary plan launches at the first Hohmann
+    window on/after the given date (from the cached ephemeris table) instead of
+    on the date itself; the given date is kept as ``requested_launch_date``.
+    """
     try:
         launch_date = datetime.strptime(launch_date_str, "%Y-%m-%d")
     except ValueError:
         return {"error": f"Invalid date format. Use YYYY-MM-DD (got '{launch_date_str}')"}
 
     dest_upper = destination.upper()
+    window = None
+    if launch_window and dest_upper not in ("LEO", "GTO", "GEO"):
+        window = _next_launch_window(destination, launch_date)
+        if window:
+            launch_date = datetime.strptime(window["departure_date"], "%Y-%m-%d")
     phases = []
     current_date = launch_date
 
@@ -127,18 +155,22 @@ def mission_plan(launch_date_str, destination, payload_kg=None):
         })
 
     total_days = (datetime.strptime(phases[-1]["end"], "%Y-%m-%d") - launch_date).days
-    return {
+    plan = {
         "mission": f"Earth -> {destination}",
-        "launch_date": launch_date_str,
+        "launch_date": launch_date.strftime("%Y-%m-%d"),
         "end_date": phases[-1]["end"],
         "total_duration_days": total_days,
         "total_duration_years": round(total_days / 365.25, 1),
         "payload_kg": payload_kg,
         "phases": phases,
     }
+    if launch_window:
+        plan["requested_launch_date"] = launch_date_str
+        plan["launch_window"] = window  # None when no window applies (Earth orbit, moons of Earth)
+    return plan
 
 
-def gantt_chart(launch_date_str, destination, output_path, payload_kg=None):
+def gantt_chart(launch_date_str, destination, output_path, payload_kg=None, launch_window=False):
     """Generate Gantt chart of mission timeline."""
     try:
         import matplotlib
@@ -148,7 +180,7 @@ def gantt_chart(launch_date_str, destination, output_path, payload_kg=None):
     except ImportError:
         return {"error": "matplotlib not installed. Run: pip install matplotlib"}
 
-    plan = mission_plan(launch_date_str, destination, payload_kg)
+    plan = mission_plan(launch_date_str, destination, payload_kg, launch_window)
     if "error" in plan:
         return plan
 
@@ -188,7 +220,7 @@ def gantt_chart(launch_date_str, destination, output_path, payload_kg=None):
     return {"status": "ok", "output": output_path, "size_bytes": os.path.getsize(output_path)}
 
 
-if __name__ == "__main__":
+def main(argv=None):
     parser = argparse.ArgumentParser(description="Mission Timeline Generator")
     sub = parser.add_subparsers(dest="command")
 
@@ -196,19 +228,28 @@ if __name__ == "__main__":
     p_p.add_argument("--launch-date", required=True, help="YYYY-MM-DD")
     p_p.add_argument("--destination", required=True)
     p_p.add_argument("--payload-kg", type=float, default=None)
+    p_p.add_argument("--launch-window", action="store_true",
+                     help="Launch at the next Hohmann window on/after --launch-date")
 
     p_g = sub.add_parser("gantt", help="Generate Gantt chart PNG")
     p_g.add_argument("--launch-date", required=True, help="YYYY-MM-DD")
     p_g.add_argument("--destination", required=True)
     p_g.add_argument("--payload-kg", type=float, default=None)
     p_g.add_argument("--output", default="/tmp/plot_output.png")
+    p_g.add_argument("--launch-window", action="store_true",
+                     help="Launch at the next Hohmann window on/after --launch-date")
 
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
     if args.command == "plan":
-        result = mission_plan(args.launch_date, args.destination, args.payload_kg)
+        result = mission_plan(args.launch_date, args.destination, args.payload_kg, args.launch_window)
     elif args.command == "gantt":
-        result = gantt_chart(args.launch_date, args.destination, args.output, args.payload_kg)
+        result = gantt_chart(args.launch_date, args.destination, args.output, args.payload_kg,
+                             args.launch_window)
     else:
         parser.print_help()
         sys.exit(0)
     print(json.dumps(result, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
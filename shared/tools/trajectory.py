@@ -2,15 +2,24 @@
 
 Usage:
     python trajectory.py hohmann Earth Mars
+    python trajectory.py transfer-matrix --quantity delta_v_total_kms
     python trajectory.py tsiolkovsky --isp 311 --mass-initial 549000 --mass-final 26000
     python trajectory.py delta-v-budget LEO --reusable
     python trajectory.py gravity-loss --twr 1.3 --burn-time 162
+    python trajectory.py tsiolkovsky-batch --input sweep.csv --output results.csv
+    python trajectory.py inverse-batch --input sweep.ndjson --output results.ndjson
 """
 import argparse
+import copy
+import functools
 import math
 import json
+import os
 import sys
 
+sys.path.insert(0, os.path.dirname(__file__))
+from batch_io import np, NUMPY_MISSING, read_columns, require_columns, write_columns, summarize_columns, columns_to_lists
+
 G0 = 9.80665  # m/s²
 
 # Delta-v reference table (km/s) — verified from NASA/ESA sources
@@ -115,10 +124,100 @@ def inverse_tsiolkovsky(isp, delta_v_kms, m_payload, structural_fraction=0.08):
     }
 
 
+def tsiolkovsky_batch(isp, m_initial, m_final):
+    """Vectorized Tsiolkovsky over NumPy arrays (broadcast), returning columnar arrays.
+
+    Infeasible rows (m_final <= 0, m_initial <= 0 or m_final >= m_initial) are
+    flagged False in the ``feasible`` mask and hold NaN in the result columns.
+    """
+    if np is None:
+        return dict(NUMPY_MISSING)
+    isp, m_i, m_f = np.broadcast_arrays(*(np.asarray(x, dtype=float) for x in (isp, m_initial, m_final)))
+    feasible = (m_f > 0) & (m_i > 0) & (m_f < m_i)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mass_ratio = np.where(feasible, m_i / m_f, np.nan)
+        dv = isp * G0 * np.log(mass_ratio)
+    return {
+        "delta_v_ms": dv,
+        "delta_v_kms": dv / 1000,
+        "mass_ratio": mass_ratio,
+        "propellant_fraction": 1 - 1 / mass_ratio,
+        "feasible": feasible,
+    }
+
+
+def inverse_tsiolkovsky_batch(isp, delta_v_kms, m_payload, structural_fraction=0.08):
+    """Vectorized inverse Tsiolkovsky, same algebra as inverse_tsiolkovsky().
+
+    Rows with non-positive payload or a mass ratio at/above the structural
+    limit 1/sf are flagged False in ``feasible`` and hold NaN.
+    """
+    if np is None:
+        return dict(NUMPY_MISSING)
+    isp, dv_kms, payload, sf = np.broadcast_arrays(
+        *(np.asarray(x, dtype=float) for x in (isp, delta_v_kms, m_payload, structural_fraction)))
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        mass_ratio = np.exp(dv_kms * 1000 / (isp * G0))
+        denominator = mass_ratio * sf - 1
+        feasible = (payload > 0) & (mass_ratio < 1 / sf) & (denominator != 0)
+        propellant = np.where(feasible, np.abs(payload * (1 - mass_ratio) * (1 - sf) / denominator), np.nan)
+        structure = sf * propellant / (1 - sf)
+        m_initial = structure + propellant + payload
+        m_final = structure + payload
+        return {
+            "propellant_kg": propellant,
+            "structure_kg": structure,
+            "stage_dry_kg": m_final,
+            "stage_wet_kg": m_initial,
+            "mass_ratio": m_initial / m_final,
+            "payload_fraction": payload / m_initial,
+            "feasible": feasible,
+        }
+
+
+def _run_batch(kind, input_path, output_path=None, fmt=None, structural_fraction=0.08):
+    """Read a CSV/NDJSON table, evaluate it in one vectorized call, write the columns."""
+    if np is None:
+        return dict(NUMPY_MISSING)
+    try:
+        columns = read_columns(input_path, fmt)
+    except ValueError as exc:
+        return {"error": str(exc)}
+    if kind == "tsiolkovsky":
+        names = ["isp", "mass_initial", "mass_final"]
+        aliases = {"mass_initial": ["m_initial", "m_initial_kg"], "mass_final": ["m_final", "m_final_kg"]}
+        picked, missing = require_columns(columns, names, aliases)
+        if missing:
+            return {"error": f"Missing columns {missing}. Expected: {names}"}
+        result = tsiolkovsky_batch(*picked)
+    else:
+        names = ["isp", "delta_v", "payload"]
+        aliases = {"delta_v": ["delta_v_kms"], "payload": ["payload_kg", "m_payload"]}
+        picked, missing = require_columns(columns, names, aliases)
+        if missing:
+            return {"error": f"Missing columns {missing}. Expected: {names} (+ optional structural_fraction)"}
+        sf = columns.get("structural_fraction")
+        sf = structural_fraction if sf is None else np.where(np.isnan(sf), structural_fraction, sf)  # blank → default
+        result = inverse_tsiolkovsky_batch(*picked, structural_fraction=sf)
+    summary = summarize_columns(result)
+    if output_path:
+        write_columns(output_path, result)
+        summary["output"] = output_path
+    else:
+        summary["results"] = columns_to_lists(result)
+    return summary
+
+
 def hohmann_transfer(planet_from, planet_to):
-    """Calculate Hohmann transfer delta-v between two planets (or to a moon)."""
-    planet_from = planet_from.title()
-    planet_to = planet_to.title()
+    """Calculate Hohmann transfer delta-v between two planets (or to a moon).
+
+    Results are memoized per (from, to) pair; callers get their own copy.
+    """
+    return dict(_hohmann_transfer(planet_from.title(), planet_to.title()))
+
+
+@functools.lru_cache(maxsize=None)
+def _hohmann_transfer(planet_from, planet_to):
     if planet_from == planet_to:
         return {"error": "Same planet — no transfer needed"}
 
@@ -167,16 +266,100 @@ def hohmann_transfer(planet_from, planet_to):
     return result
 
 
-def gravity_loss(twr, burn_time_s):
-    """Estimate gravity losses based on initial TWR and burn time."""
+TRANSFER_QUANTITIES = ("delta_v_departure_kms", "delta_v_arrival_kms",
+                       "delta_v_total_kms", "transfer_time_days")
+
+
+def transfer_matrix():
+    """N×N Hohmann table over all PLANETS and MOONS, built once on first use.
+
+    Returns {"bodies": [...], "index": {name: i}, "moon_notes": {moon: note},
+    <quantity>: [[...]]} where matrix[q][i][j] is the transfer from bodies[i]
+    to bodies[j] (None on the diagonal and between a parent and its moons,
+    which share a heliocentric orbit). Callers get their own copy.
+    """
+    return copy.deepcopy(_transfer_matrix())
+
+
+@functools.lru_cache(maxsize=None)
+def _transfer_matrix():
+    bodies = list(PLANETS.keys()) + list(MOONS.keys())
+    matrix = {"bodies": bodies, "index": {b: i for i, b in enumerate(bodies)}, "moon_notes": {}}
+    for q in TRANSFER_QUANTITIES:
+        matrix[q] = [[None] * len(bodies) for _ in bodies]
+    parent = {b: MOONS[b]["parent"] if b in MOONS else b for b in bodies}
+    for i, a in enumerate(bodies):
+        for j, b in enumerate(bodies):
+            res = _hohmann_transfer(a, b)
+            if "moon_note" in res:
+                matrix["moon_notes"][b] = res["moon_note"]
+            if "error" in res or parent[a] == parent[b]:
+                continue  # parent <-> moon legs have no heliocentric transfer
+            for q in TRANSFER_QUANTITIES:
+                matrix[q][i][j] = res[q]
+    return matrix
+
+
+def transfer_lookup(planet_from, planet_to):
+    """In-process matrix lookup: {quantity: value} for one pair, or an error dict."""
+    m = _transfer_matrix()
+    i = m["index"].get(planet_from.title())
+    j = m["index"].get(planet_to.title())
+    if i is None or j is None:
+        return {"error": f"Unknown body. Available: {m['bodies']}"}
+    if m["delta_v_total_kms"][i][j] is None:
+        res = _hohmann_transfer(m["bodies"][i], m["bodies"][j])
+        if "error" in res:
+            return dict(res)
+        result = {q: res[q] for q in TRANSFER_QUANTITIES}
+    else:
+        result = {q: m[q][i][j] for q in TRANSFER_QUANTITIES}
+    if m["bodies"][j] in m["moon_notes"]:
+        result["moon_note"] = m["moon_notes"][m["bodies"][j]]
+    return result
+
+
+def gravity_loss(twr, burn_time_s, isp=None, method=None):
+    """Estimate gravity/drag losses for a first-stage burn of given TWR and duration.
+
+    ``method="numerical"`` integrates a 2-D gravity-turn ascent (ascent.py,
+    requires numpy); ``"heuristic"`` — or a missing numpy — uses the classic
+    averaged-TWR rule of thumb. By default the integrator runs only when an
+    Isp is given, since burn time and TWR alone do not fix the mass ratio.
+    """
     if twr <= 1.0:
         return {"error": "TWR must be > 1.0 for launch"}
+    steering_loss = 100  # Typical guidance allowance — a pure gravity turn has none
+    if method is None:
+        method = "heuristic" if isp is None else "numerical"
+    if method == "numerical":
+        if isp is None:
+            isp = 300
+        from ascent import simulate_ascent
+        sim = simulate_ascent(twr, burn_time_s, isp)
+        if "error" in sim and sim["error"] != NUMPY_MISSING["error"]:
+            return sim
+        if "error" not in sim:
+            g_loss = sim["gravity_loss_ms"]
+            drag_loss = sim["drag_loss_ms"]
+            return {
+                "gravity_loss_ms": round(g_loss, 0),
+                "gravity_loss_kms": round(g_loss / 1000, 2),
+                "drag_loss_ms": round(drag_loss, 0),
+                "steering_loss_ms": round(steering_loss, 0),
+                "total_losses_ms": round(g_loss + drag_loss + steering_loss, 0),
+                "total_losses_kms": round((g_loss + drag_loss + steering_loss) / 1000, 2),
+                "burnout_velocity_ms": round(sim["burnout_velocity_ms"], 0),
+                "burnout_altitude_km": round(sim["burnout_altitude_km"], 1),
+                "input_twr": twr,
+                "burn_time_s": burn_time_s,
+                "isp_s": isp,
+                "method": "numerical (gravity-turn integration)",
+            }
     # Simplified model: gravity loss ≈ g0 * burn_time * (1/TWR) * correction_factor
-    # More accurate: integrate over changing mass, but this gives good estimate
     avg_twr = twr * 1.4  # TWR increases as propellant burns (rough 1.4x avg)
     g_loss = G0 * burn_time_s * (1 / avg_twr) * 0.85  # 0.85 correction for gravity turn
     drag_loss = 150 + (twr - 1.3) * 50  # Higher TWR = more drag (faster in atmo)
-    steering_loss = 100  # Typical
     return {
         "gravity_loss_ms": round(g_loss, 0),
         "gravity_loss_kms": round(g_loss / 1000, 2),
@@ -186,6 +369,7 @@ def gravity_loss(twr, burn_time_s):
         "total_losses_kms": round((g_loss + drag_loss + steering_loss) / 1000, 2),
         "input_twr": twr,
         "burn_time_s": burn_time_s,
+        "method": "heuristic",
     }
 
 
@@ -227,7 +411,7 @@ def delta_v_budget(destination, reusable=False, margin_pct=10):
     return budget
 
 
-if __name__ == "__main__":
+def main(argv=None):
     parser = argparse.ArgumentParser(description="Rocket Trajectory Calculator")
     sub = parser.add_subparsers(dest="command")
 
@@ -242,20 +426,38 @@ if __name__ == "__main__":
     p_inv.add_argument("--payload", type=float, required=True, help="kg")
     p_inv.add_argument("--structural-fraction", type=float, default=0.08)
 
+    for name, kind in (("tsiolkovsky-batch", "Tsiolkovsky"), ("inverse-batch", "Inverse Tsiolkovsky")):
+        p_b = sub.add_parser(name, help=f"{kind} over a CSV/NDJSON table (requires numpy)")
+        p_b.add_argument("--input", required=True, help="CSV (header row) or NDJSON file")
+        p_b.add_argument("--output", default=None, help="CSV/NDJSON path; omit to print columns as JSON")
+        p_b.add_argument("--format", default=None, choices=["csv", "ndjson"],
+                         help="Input format if not clear from the extension")
+        if name == "inverse-batch":
+            p_b.add_argument("--structural-fraction", type=float, default=0.08,
+                             help="Used when the table has no structural_fraction column")
+
     p_h = sub.add_parser("hohmann", help="Hohmann transfer between planets")
     p_h.add_argument("planet_from")
     p_h.add_argument("planet_to")
 
+    p_m = sub.add_parser("transfer-matrix", help="Hohmann table over all planet/moon pairs")
+    p_m.add_argument("--quantity", choices=TRANSFER_QUANTITIES, default=None,
+                     help="Only print this quantity (default: all)")
+
     p_g = sub.add_parser("gravity-loss", help="Estimate gravity/drag losses")
     p_g.add_argument("--twr", type=float, required=True)
     p_g.add_argument("--burn-time", type=float, required=True)
+    p_g.add_argument("--isp", type=float, default=None,
+                     help="Average first-stage Isp (s); enables the numerical integrator (300 s if only --method numerical)")
+    p_g.add_argument("--method", choices=["numerical", "heuristic"], default=None,
+                     help="Default: numerical when --isp is given, else heuristic")
 
     p_d = sub.add_parser("delta-v-budget", help="Full delta-v budget")
     p_d.add_argument("destination")
     p_d.add_argument("--reusable", action="store_true")
     p_d.add_argument("--margin", type=float, default=10)
 
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
     if args.command == "tsiolkovsky":
         result = tsiolkovsky(args.isp, args.mass_initial, args.mass_final)
     elif args.command == "inverse":
@@ -263,16 +465,36 @@ if __name__ == "__main__":
         if "error" in result:
             print(json.dumps(result, indent=2, ensure_ascii=False))
             sys.exit(1)
+    elif args.command in ("tsiolkovsky-batch", "inverse-batch"):
+        kind = "tsiolkovsky" if args.command == "tsiolkovsky-batch" else "inverse"
+        result = _run_batch(kind, args.input, args.output, args.format,
+                            getattr(args, "structural_fraction", 0.08))
+        if "error" in result:
+            print(json.dumps(result, indent=2, ensure_ascii=False))
+            sys.exit(1)
     elif args.command == "hohmann":
         result = hohmann_transfer(args.planet_from, args.planet_to)
         if "error" in result:
             print(json.dumps(result, indent=2, ensure_ascii=False))
             sys.exit(1)
+    elif args.command == "transfer-matrix":
+        matrix = transfer_matrix()
+        quantities = [args.quantity] if args.quantity else TRANSFER_QUANTITIES
+        result = {"bodies": matrix["bodies"], **{q: matrix[q] for q in quantities},
+                  "moon_notes": matrix["moon_notes"],
+                  "note": "Row = departure body, column = arrival body. Heliocentric delta-v only."}
     elif args.command == "gravity-loss":
-        result = gravity_loss(args.twr, args.burn_time)
+        result = gravity_loss(args.twr, args.burn_time, args.isp, args.method)
+        if "error" in result:
+            print(json.dumps(result, indent=2, ensure_ascii=False))
+            sys.exit(1)
     elif args.command == "delta-v-budget":
         result = delta_v_budget(args.destination, args.reusable, args.margin)
     else:
         parser.print_help()
         sys.exit(0)
     print(json.dumps(result, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()